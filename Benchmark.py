@@ -0,0 +1,199 @@
+import argparse
+import csv
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+import Store_metrics as metrics
+from Generate_data import generate_store
+from Store_data import BASE_DIR, DATA_DIR, DATASETS, dataset_path, read_dataset
+
+BENCHMARK_DIR = os.path.join(BASE_DIR, "cache", "benchmark")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Date column used by filter_by_date on each page
+DATE_FILTERS = {
+    'CJ': 'Event_Time',
+    'Customers_Dataset': 'Customer_Created_At',
+    'Orders_Dataset': 'Order_Created_At',
+    'AbandonedCheckouts': 'Order_Created_At',
+    'Products_Dataset': 'Product_Created_At',
+}
+
+
+def filter_middle_half(df, date_column):
+    # What filter_by_date does for an analyst picking the middle half of the available range
+    dates = pd.to_datetime(df[date_column], errors='coerce')
+    start_date, end_date = dates.quantile(0.25), dates.quantile(0.75)
+    return metrics.filter_date_range(df.assign(**{date_column: dates}), date_column, start_date, end_date)
+
+
+def session_time_buckets(df_cj):
+    starts = metrics.session_start_times(df_cj)
+    return (metrics.weekday_weekend_counts(starts), metrics.day_of_week_counts(starts),
+            metrics.hour_of_day_counts(starts), metrics.sessions_per_day(df_cj))
+
+
+def order_period_views(df_orders):
+    return metrics.fill_daily_counts(metrics.orders_per_day(df_orders), 'order_count', datetime.today().date())
+
+
+def bounce_rates(df_cj):
+    return metrics.bounce_rate_under(df_cj, 30), metrics.bounce_rate_by_event(df_cj)
+
+
+def store_sections(frames):
+    # (section, dataset it reads, function) for every dashboard section benchmarked on its own
+    sections = [
+        ('cj_sankey_transitions', 'CJ', lambda: metrics.cj_sankey_transitions(frames['CJ'])),
+        ('session_time_buckets', 'CJ', lambda: session_time_buckets(frames['CJ'])),
+        ('bounce_rates', 'CJ', lambda: bounce_rates(frames['CJ'])),
+        ('order_period_views', 'Orders_Dataset', lambda: order_period_views(frames['Orders_Dataset'])),
+        ('revenue_period_views', 'Orders_Dataset', lambda: metrics.revenue_per_period(frames['Orders_Dataset'])),
+        ('product_price_bins', 'Products_Dataset', lambda: metrics.price_range_counts(frames['Products_Dataset'])),
+        ('unsold_products', 'Products_Dataset',
+         lambda: metrics.unsold_products(frames['Orders_Dataset'], frames['Products_Dataset'])),
+    ]
+    for dataset, date_column in DATE_FILTERS.items():
+        sections.append((f'filter_by_date:{dataset}', dataset,
+                         lambda df=frames[dataset], column=date_column: filter_middle_half(df, column)))
+    for page in metrics.PAGE_TASKS:
+        sections.append((f'page:{page}', None, lambda page=page: metrics.compute_page_aggregates(page, frames)))
+    return sections
+
+
+def measure(func, repeat):
+    # Best wall time of `repeat` untraced runs, then one traced run for the peak memory
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(seconds), sum(seconds) / len(seconds), peak / 1024 ** 2
+
+
+def benchmark_store(store, data_dir, repeat=3):
+    results = []
+
+    def record(section, dataset, func, rows):
+        best, mean, peak_mb = measure(func, repeat)
+        results.append({'store': store, 'section': section, 'dataset': dataset or '', 'rows': rows,
+                        'best_seconds': round(best, 6), 'mean_seconds': round(mean, 6),
+                        'peak_memory_mb': round(peak_mb, 3)})
+        print(f"{store:>24} {section:<36} {rows:>10} rows {best:9.4f}s {peak_mb:9.1f} MB", flush=True)
+
+    frames = {}
+    for dataset, (_, encoding) in DATASETS.items():
+        path = dataset_path(store, dataset, data_dir)
+        if not os.path.exists(path):
+            frames[dataset] = None
+            continue
+        frames[dataset] = read_dataset(path, encoding=encoding)
+        record(f'load_data:{dataset}', dataset, lambda path=path, encoding=encoding: read_dataset(path, encoding),
+               len(frames[dataset]))
+        if frames[dataset].empty:
+            frames[dataset] = None
+
+    for section, dataset, func in store_sections(frames):
+        if dataset is not None and not metrics.available(frames[dataset]):
+            continue
+        if section.startswith('unsold') and not metrics.available(frames['Orders_Dataset']):
+            continue
+        record(section, dataset, func, len(frames[dataset]) if dataset else sum(
+            len(df) for df in frames.values() if df is not None))
+    return results
+
+
+def synthetic_store(rows, out_dir, seed):
+    # Generated stores are reused between runs, they are deterministic for a (rows, seed) pair
+    store = f"bench-{rows}-s{seed}"
+    if not all(os.path.exists(dataset_path(store, dataset, out_dir)) for dataset in DATASETS):
+        print(f"Generating {store} ...", flush=True)
+        generate_store(store, rows, out_dir, seed=seed)
+    return store
+
+
+def write_results(results, output):
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if output.endswith('.csv'):
+        with open(output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(output, 'w') as f:
+            json.dump({'created_at': datetime.now().isoformat(), 'python': sys.version.split()[0],
+                       'pandas': pd.__version__, 'results': results}, f, indent=2)
+
+
+def read_results(path):
+    if path.endswith('.csv'):
+        return pd.read_csv(path).to_dict('records')
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare_results(results, baseline, threshold):
+    # Sections that got slower than `threshold` x the baseline, matched on (store, section)
+    baseline_seconds = {(row['store'], row['section']): row['best_seconds'] for row in baseline}
+    regressions = []
+    for row in results:
+        before = baseline_seconds.get((row['store'], row['section']))
+        # Ignore sub-millisecond sections, their timings are mostly noise
+        if before and max(before, row['best_seconds']) > 1e-3 and row['best_seconds'] > before * threshold:
+            regressions.append((row['store'], row['section'], before, row['best_seconds']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory benchmark of every dashboard section.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help="CJ rows of the generated stores to benchmark")
+    parser.add_argument('--store', action='append', dest='stores', default=[],
+                        help="Also benchmark this existing store from --data-dir (repeatable)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder with the existing stores")
+    parser.add_argument('--synthetic-dir', default=os.path.join(BENCHMARK_DIR, "stores"),
+                        help="Folder the generated stores are written to and reused from")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the generated stores")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per section, the best one is kept")
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, f"results-{datetime.now():%Y%m%d-%H%M%S}.json"),
+                        help="Results file, .json or .csv")
+    parser.add_argument('--baseline', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown factor versus the baseline reported as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for store in args.stores:
+        results += benchmark_store(store, args.data_dir, args.repeat)
+    for rows in args.sizes:
+        store = synthetic_store(rows, args.synthetic_dir, args.seed)
+        results += benchmark_store(store, args.synthetic_dir, args.repeat)
+    if not results:
+        parser.error("nothing to benchmark")
+    write_results(results, args.output)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(results, read_results(args.baseline), args.threshold)
+        for store, section, before, after in regressions:
+            print(f"REGRESSION {store} {section}: {before:.4f}s -> {after:.4f}s ({after / before:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from Store_data import BASE_DIR
+
+# Page views per store, kept across restarts so the most used stores are warmed first
+USAGE_PATH = os.path.join(BASE_DIR, "cache", "store_usage.json")
+# Seconds between two checks of the store files for changes
+POLL_SECONDS = 30
+# A store is only warmed after this many seconds without a session rerunning the dashboard
+IDLE_SECONDS = 1.0
+USAGE_WRITE_SECONDS = 30
+
+
+class CacheWarmer:
+    # A background thread loading the datasets and computing the page aggregates of every store into the shared
+    # caches, most used stores first, while no session is rerunning the dashboard. Stores whose files change
+    # (their fingerprint) are warmed again. The thread has no Streamlit script context: warm_store must not draw.
+    # max_stores: how many stores the caches hold, only that many of the most used ones are warmed so a pass does
+    # not evict what it (or a session) just loaded
+    def __init__(self, warm_store, list_stores, fingerprint, usage_path=USAGE_PATH, poll_seconds=POLL_SECONDS,
+                 max_stores=None):
+        self.warm_store = warm_store
+        self.list_stores = list_stores
+        self.fingerprint = fingerprint
+        self.usage_path = usage_path
+        self.poll_seconds = poll_seconds
+        self.max_stores = max_stores
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.usage = self._read_usage()
+        self.usage_written = time.monotonic()
+        # Store -> {'state': 'queued' / 'warming' / 'warm' / 'failed', 'fingerprint', 'seconds', 'at'}
+        self.status = {}
+        self.current = None
+        self.foreground_runs = 0
+        self.last_foreground = 0.0
+        self.thread = None
+
+    def _read_usage(self):
+        try:
+            with open(self.usage_path) as f:
+                return {store: int(count) for store, count in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _write_usage(self):
+        os.makedirs(os.path.dirname(self.usage_path), exist_ok=True)
+        tmp_path = self.usage_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.usage, f)
+        os.replace(tmp_path, self.usage_path)
+        self.usage_written = time.monotonic()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+                self.thread.start()
+        return self
+
+    def record_use(self, store):
+        with self.lock:
+            self.usage[store] = self.usage.get(store, 0) + 1
+            if time.monotonic() - self.usage_written >= USAGE_WRITE_SECONDS:
+                try:
+                    self._write_usage()
+                except OSError:
+                    pass
+
+    @contextmanager
+    def foreground(self):
+        # Wraps a session's rerun, the warmer waits for it to finish before starting the next store
+        with self.lock:
+            self.foreground_runs += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.foreground_runs -= 1
+                self.last_foreground = time.monotonic()
+
+    def _wait_idle(self):
+        while True:
+            with self.lock:
+                busy = self.foreground_runs or time.monotonic() - self.last_foreground < IDLE_SECONDS
+            if not busy:
+                return
+            time.sleep(IDLE_SECONDS / 4)
+
+    def pending(self):
+        # Stores whose caches do not match their files, most used first; past max_stores the others are not
+        # warmed (nor reported)
+        stores = []
+        listed = self.list_stores()
+        with self.lock:
+            listed = sorted(listed, key=lambda store: (-self.usage.get(store, 0), store))[:self.max_stores]
+            for store in set(self.status) - set(listed):
+                del self.status[store]
+        for store in listed:
+            fingerprint = self.fingerprint(store)
+            with self.lock:
+                status = self.status.get(store)
+                if status is None or status['fingerprint'] != fingerprint:
+                    self.status[store] = {'state': 'queued', 'fingerprint': fingerprint, 'seconds': None,
+                                          'at': None}
+                    stores.append(store)
+                elif status['state'] == 'queued':
+                    stores.append(store)
+        return stores
+
+    def _run(self):
+        while True:
+            for store in self.pending():
+                self._wait_idle()
+                with self.lock:
+                    self.current = store
+                    self.status[store]['state'] = 'warming'
+                start = time.perf_counter()
+                try:
+                    self.warm_store(store)
+                    state = 'warm'
+                except Exception:
+                    state = 'failed'
+                with self.lock:
+                    self.current = None
+                    if store in self.status:
+                        self.status[store].update(state=state, seconds=time.perf_counter() - start, at=time.time())
+            self.wake.wait(self.poll_seconds)
+            self.wake.clear()
+
+    def progress(self):
+        # (stores warmed, stores known, store being warmed or None)
+        with self.lock:
+            done = sum(status['state'] in ('warm', 'failed') for status in self.status.values())
+            return done, len(self.status), self.current
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import pickle
+import types
+
+import pandas as pd
+
+from Store_data import BASE_DIR
+
+# Serialized chart specs ({'kind': 'vega-lite' | 'plotly', 'spec': ...}), one JSON file per key.
+# Least recently used files are removed once the folder grows past CHART_CACHE_MAX_BYTES.
+CHART_CACHE_DIR = os.path.join(BASE_DIR, "cache", "charts")
+CHART_CACHE_MAX_BYTES = 256 * 1024 ** 2
+# Part of every key: bump when the payload format or the spec settings change, older files are then never read
+CHART_CACHE_VERSION = 2
+
+# Source file path -> (modification time, digest), a builder's helpers change its charts without changing its code
+_source_digests = {}
+
+
+def _code_parts(code):
+    # Bytecode and constants, nested functions (lambdas) included, so a key changes when the chart code does
+    return code.co_code, tuple(_code_parts(const) if isinstance(const, types.CodeType) else const
+                               for const in code.co_consts)
+
+
+def chart_key(*parts):
+    # None when a part cannot be hashed reliably, such a chart is simply not cached
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (types.FunctionType, types.ModuleType, type)):
+            digest.update(f"{type(part).__name__}:{getattr(part, '__qualname__', part.__name__)}".encode())
+            continue
+        try:
+            digest.update(pickle.dumps(part, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return None
+    return digest.hexdigest()
+
+
+def _content_hash(value):
+    try:
+        return int(pd.util.hash_pandas_object(value, index=True).sum())
+    except TypeError:
+        # Unhashable cells (lists, dicts) are hashed by their text
+        return int(pd.util.hash_pandas_object(value.astype(str), index=True).sum())
+
+
+def _key_value(value):
+    # Frames are keyed by their contents: frames of the same shape from other filters or stores must not share specs
+    if isinstance(value, pd.DataFrame):
+        return 'DataFrame', value.shape, [str(col) for col in value.columns], _content_hash(value)
+    if isinstance(value, pd.Series):
+        return 'Series', value.shape, str(value.name), _content_hash(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_key_value(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _key_value(item) for key, item in value.items()}
+    return value
+
+
+def _source_digest(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _source_digests.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = _source_digests[path] = (mtime, hashlib.sha1(f.read()).hexdigest())
+    return cached[1]
+
+
+def closure_values(func, state=()):
+    # What a chart builder reads from the enclosing page (widget values, frames by contents) plus its own code and
+    # the file it is defined in, so cached specs do not outlive a deploy.
+    # state: the widget values a frame in the closure was derived with when they are not in the closure themselves
+    return [CHART_CACHE_VERSION, _source_digest(func.__code__.co_filename), _code_parts(func.__code__),
+            *(_key_value(cell.cell_contents) for cell in func.__closure__ or ()), *state]
+
+
+def chart_path(key, cache_dir=CHART_CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def read_chart(key, cache_dir=CHART_CACHE_DIR):
+    path = chart_path(key, cache_dir)
+    try:
+        with open(path) as f:
+            payload = json.load(f)
+        os.utime(path)  # the modification time is the LRU order
+    except (OSError, ValueError):
+        return None
+    return payload
+
+
+def write_chart(key, payload, cache_dir=CHART_CACHE_DIR, max_bytes=CHART_CACHE_MAX_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = chart_path(key, cache_dir) + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, chart_path(key, cache_dir))
+    evict_charts(cache_dir, max_bytes)
+
+
+def evict_charts(cache_dir=CHART_CACHE_DIR, max_bytes=CHART_CACHE_MAX_BYTES):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".json"):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass
+        total -= size
@@ -0,0 +1,252 @@
+import pandas as pd
+
+import Store_metrics as metrics
+from Perf_trace import section
+from Quantile_sketch import daily_sketches
+from Store_data import read_dataset_chunks
+
+CJ_CHUNK_ROWS = 200_000
+# CJ exports above this size are aggregated chunk by chunk, the dashboard then keeps only their last CJ_WINDOW_ROWS
+# rows in memory for the date filter and the tables
+CJ_STREAM_BYTES = 512 * 1024 ** 2
+CJ_WINDOW_ROWS = 200_000
+# Columns of the CJ export the Customer Journey aggregates read
+CJ_COLUMNS = ['Event', 'Customer_IP', 'Event_Time', 'Product_ID', 'Collection_Name', 'Search_Term', 'Time_On_Page',
+              'Product_Name', 'session']
+
+
+class ChunkAggregator:
+    # Keeps reduced tables of the chunks seen so far: each chunk's partial table is concatenated onto the
+    # table and reduced again (distinct rows, sums per key, ...)
+    def __init__(self):
+        self.rows = 0
+        self.tables = {}
+
+    def _fold(self, name, partial, reduce):
+        previous = self.tables.get(name)
+        self.tables[name] = reduce(partial if previous is None else pd.concat([previous, partial], ignore_index=True))
+
+
+class CjChunkAggregator(ChunkAggregator):
+    # Folds a CJ export chunk by chunk into the reduced tables the page aggregates need (one row per session, per
+    # distinct (event, IP), per product, ...), the Store_metrics functions then run on those tables.
+    # Memory grows with the number of sessions, visitors and products, not with the rows of the file.
+    def __init__(self, window_rows=0):
+        super().__init__()
+        self.window_rows = window_rows
+        self.search_terms = pd.Series(dtype='int64')
+        self.event_sketches = {}
+        self.window = None
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        time_on_page = pd.to_numeric(chunk['Time_On_Page'], errors='coerce')
+
+        self._fold('sessions', chunk[['session', 'Customer_IP', 'Time_On_Page', 'Event_Time']].assign(
+            Event_Time_Min=chunk['Event_Time']), _reduce_sessions)
+        self._fold('ips', pd.DataFrame({'Customer_IP': chunk['Customer_IP'], 'session': chunk['session'],
+                                        'Time_On_Page': time_on_page}), _reduce_ips)
+        self._fold('session_days', pd.DataFrame({
+            'Customer_IP': chunk['Customer_IP'], 'session': chunk['session'],
+            'Event_Time': pd.to_datetime(chunk['Event_Time'], errors='coerce', utc=True).dt.floor('D')
+        }).dropna(subset=['Event_Time']), _distinct)
+        self._fold('session_events', metrics.session_events(chunk).reset_index(),
+                   lambda df: df.groupby(['Customer_IP', 'session'], as_index=False, sort=False).max())
+        self._fold('event_ips', chunk[['Event', 'Customer_IP']].dropna(subset=['Event']), _distinct)
+        self._fold('product_ips', chunk[['Product_Name', 'Customer_IP']], _distinct)
+        self._fold('collection_ips', chunk[['Collection_Name', 'Customer_IP']], _distinct)
+        self._fold('cart_add_ips', chunk.loc[chunk['Event'] == 'Cart Add', ['Event', 'Product_Name', 'Customer_IP']],
+                   _distinct)
+        self._fold('last_pages', metrics.last_page_events(chunk)[['Customer_IP', 'session', 'Event', 'Time_On_Page']],
+                   lambda df: df.drop_duplicates(subset=['Customer_IP', 'session'], keep='last'))
+        self._fold('first_visits', chunk[['Event_Time', 'Event', 'Customer_IP']]
+                   .dropna(subset=['Event', 'Customer_IP'])
+                   .drop_duplicates(subset=['Customer_IP', 'Event']),
+                   lambda df: df.drop_duplicates(subset=['Customer_IP', 'Event']))
+
+        page_events = chunk['Event'].isin(metrics.PAGE_EVENTS)
+        self._fold('event_time', time_on_page[page_events].groupby(chunk['Event'][page_events]).agg(['sum', 'count'])
+                   .reset_index(), lambda df: df.groupby('Event', as_index=False)[['sum', 'count']].sum())
+        product_ids = chunk['Product_ID'].fillna('Unknown').astype(str).replace(".0", "", regex=True)
+        self._fold('product_time', time_on_page.groupby([product_ids, chunk['Product_Name']]).sum().reset_index(),
+                   lambda df: df.groupby(['Product_ID', 'Product_Name'], as_index=False)['Time_On_Page'].sum())
+        self._fold('collection_time', time_on_page.groupby(chunk['Collection_Name']).sum().reset_index(),
+                   lambda df: df.groupby('Collection_Name', as_index=False)['Time_On_Page'].sum())
+
+        self.search_terms = self.search_terms.add(metrics.search_term_counts(chunk), fill_value=0)
+        for key, sketch in daily_sketches(chunk, 'Event_Time', 'Time_On_Page', by='Event').items():
+            if key in self.event_sketches:
+                self.event_sketches[key].merge(sketch)
+            else:
+                self.event_sketches[key] = sketch
+
+        if self.window_rows:
+            window = chunk if self.window is None else pd.concat([self.window, chunk])
+            self.window = window.tail(self.window_rows)
+
+    def result(self):
+        # The aggregates of the Customer Journey page, with the keys of Store_metrics.cj_page_tasks
+        if not self.rows:
+            return {}
+        tables = self.tables
+        sessions = tables['sessions'].groupby(['session', 'Customer_IP'], as_index=False).agg(
+            Time_On_Page=('Time_On_Page', 'sum'), Event_Time=('Event_Time', 'first'),
+            Event_Time_Min=('Event_Time_Min', 'min'))
+        session_starts = metrics.session_start_times(sessions)
+        event_time = tables['event_time'].sort_values('Event')
+        duration_sketches = (daily_sketches(sessions.assign(Event_Time=sessions['Event_Time_Min']), 'Event_Time',
+                                            'Time_On_Page'), self.event_sketches)
+        search_terms = self.search_terms.astype('int64').sort_values(ascending=False, kind='stable')
+        search_terms.index.name = 'Search_Term'
+        return {
+            'kpis': metrics.cj_kpis(tables['ips']),
+            'session_weekday_weekend': metrics.weekday_weekend_counts(session_starts),
+            'session_day_of_week': metrics.day_of_week_counts(session_starts),
+            'session_hour_of_day': metrics.hour_of_day_counts(session_starts),
+            'sessions_per_day': metrics.sessions_per_day(tables['session_days']),
+            'duration_kpis': metrics.session_duration_kpis(sessions),
+            'duration_sketches': duration_sketches,
+            'top_sessions': metrics.top_sessions_by_time(sessions),
+            'max_sessions_per_ip': metrics.max_sessions_per_ip(tables['ips']),
+            'product_visitors': metrics.unique_visitors_by(tables['product_ips'], 'Product_Name'),
+            'collection_visitors': metrics.unique_visitors_by(tables['collection_ips'], 'Collection_Name'),
+            'cart_add_visitors': metrics.cart_add_visitors(tables['cart_add_ips']),
+            'search_terms': search_terms.rename('count'),
+            'time_per_event': (
+                pd.DataFrame({'Event': event_time['Event'], 'Time_On_Page': event_time['sum'] / event_time['count']}),
+                pd.DataFrame({'Event': event_time['Event'], 'Time_On_Page': event_time['sum']})),
+            'time_per_product': tables['product_time'].sort_values(by='Time_On_Page', ascending=False),
+            'time_per_collection': tables['collection_time'].sort_values(by='Time_On_Page', ascending=False),
+            'viewers_per_page': metrics.viewers_per_page(tables['event_ips']),
+            'bounce_rate_under_30': metrics.bounce_rate_under(tables['ips'], 30),
+            'bounce_rate_by_event': metrics.bounce_rate_by_event(tables['event_ips'],
+                                                                 last_session_df=tables['last_pages']),
+            'sankey_transitions': metrics.sankey_from_session_events(tables['session_events']),
+            'ip_time_spent': metrics.ip_time_spent(tables['first_visits']),
+        }
+
+
+class RevenueChunkAggregator(ChunkAggregator):
+    # Folds Orders chunks into revenue sums per creation hour and per referring site of the first line of every
+    # order, the only line the Revenue page aggregates read. Memory grows with the orders (their IDs), the hours
+    # and the sites, results are computed from the sums instead of the order lines.
+    def __init__(self):
+        super().__init__()
+        self.order_ids = set()
+        self.priced_orders = 0
+        # Ints until a float is added, like the sums of the columns they stand for
+        self.total_revenue = 0
+        self.total_refund = 0
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        firsts = chunk.drop_duplicates(subset='Order_ID', keep='first')
+        # Missing IDs as None, NaN is not equal to itself and would never be found in the set
+        order_ids = firsts['Order_ID'].astype(object).where(firsts['Order_ID'].notna(), None)
+        new = order_ids.map(lambda order_id: order_id not in self.order_ids).astype(bool)
+        firsts = firsts[new]
+        self.order_ids.update(order_ids[new])
+
+        price = firsts['Order_Total_Price']
+        self.priced_orders += int(price.notna().sum())
+        self.total_revenue += price.sum()
+        self.total_refund += firsts['Order_Refund_Amount'].sum()
+        created_at = pd.to_datetime(firsts['Order_Created_At'], errors='coerce', utc=True)
+        self._fold('hourly', pd.DataFrame({'Order_Created_At': created_at.dt.floor('h'), 'Order_Total_Price': price})
+                   .groupby('Order_Created_At', dropna=False, as_index=False).sum(),
+                   lambda df: df.groupby('Order_Created_At', dropna=False, as_index=False).sum())
+        self._fold('sites', firsts[['Order_Referring_Site', 'Order_Total_Price']]
+                   .groupby('Order_Referring_Site', as_index=False).sum(),
+                   lambda df: df.groupby('Order_Referring_Site', as_index=False).sum())
+
+    def result(self):
+        # The aggregates of the Revenue page, with the keys of Store_metrics.revenue_page_tasks; the Store_metrics
+        # functions run on one row per hour (or site) carrying the revenue summed into it
+        if not self.rows:
+            return {}
+        hourly = self.tables['hourly'].assign(Order_ID=lambda df: range(len(df)))
+        sites = self.tables['sites'].assign(Order_ID=lambda df: range(len(df)))
+        created_at, revenue = hourly['Order_Created_At'], hourly['Order_Total_Price']
+        return {
+            'kpis': {
+                'total_revenue': round(self.total_revenue, 2),
+                'average_revenue': round(self.total_revenue / self.priced_orders, 2) if self.priced_orders
+                else float('nan'),
+                'total_refund': self.total_refund,
+            },
+            'weekday_weekend': metrics.weekday_weekend_counts(created_at, revenue),
+            'day_of_week': metrics.day_of_week_counts(created_at, revenue),
+            'hour_of_day': metrics.hour_of_day_counts(created_at, revenue),
+            'per_period': metrics.revenue_per_period(hourly),
+            'referring_sites': metrics.revenue_by_referring_site(sites),
+        }
+
+
+class LiveDayAggregator(ChunkAggregator):
+    # Folds CJ chunks into the live counters of one (UTC) day, rows of other days are only counted as seen
+    def __init__(self, day):
+        super().__init__()
+        self.day = pd.Timestamp(day, tz='UTC')
+        self.events = 0
+        self.cart_adds = 0
+        self.last_event = None
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        times = pd.to_datetime(chunk['Event_Time'], errors='coerce', utc=True)
+        on_day = times.dt.floor('D') == self.day
+        if not on_day.any():
+            return
+        today, times = chunk[on_day], times[on_day]
+        self.events += len(today)
+        self.last_event = max(filter(None, [self.last_event, times.max()]))
+        self._fold('hour_sessions', pd.DataFrame({'hour': times.dt.hour + 1, 'Customer_IP': today['Customer_IP'],
+                                                  'session': today['session']}), _distinct)
+        self._fold('event_ips', today[['Event', 'Customer_IP']].dropna(subset=['Event']), _distinct)
+        cart_adds = today[today['Event'] == 'Cart Add']
+        self.cart_adds += len(cart_adds)
+        self._fold('cart_add_ips', cart_adds[['Customer_IP']], _distinct)
+
+    def result(self):
+        sessions = self.tables.get('hour_sessions')
+        if sessions is None:
+            return {'events': 0, 'last_event': None}
+        # Hours 1-24 like Store_metrics.hour_of_day_counts, a session active in two hours counts in both
+        per_hour = sessions.groupby('hour').size().reindex(range(1, 25), fill_value=0)
+        return {
+            'events': self.events,
+            'last_event': self.last_event,
+            'sessions': len(sessions[['Customer_IP', 'session']].drop_duplicates()),
+            'visitors': sessions['Customer_IP'].nunique(),
+            'sessions_per_hour': per_hour,
+            'viewers_per_page': metrics.viewers_per_page(self.tables['event_ips']),
+            'cart_adds': self.cart_adds,
+            'cart_add_visitors': len(self.tables['cart_add_ips']),
+        }
+
+
+def _distinct(df):
+    return df.drop_duplicates()
+
+
+def _reduce_sessions(df):
+    return df.groupby(['session', 'Customer_IP'], as_index=False, sort=False).agg(
+        Time_On_Page=('Time_On_Page', 'sum'), Event_Time=('Event_Time', 'first'),
+        Event_Time_Min=('Event_Time_Min', 'min'))
+
+
+def _reduce_ips(df):
+    return df.groupby('Customer_IP', as_index=False, sort=False).agg(session=('session', 'max'),
+                                                                    Time_On_Page=('Time_On_Page', 'sum'))
+
+
+def stream_cj_aggregates(file_path, chunk_rows=CJ_CHUNK_ROWS, window_rows=0, encoding='utf-8'):
+    # (Customer Journey page aggregates, the last window_rows rows) of a CJ export read chunk by chunk,
+    # at most about chunk_rows rows of it are in memory at once. Without a window only CJ_COLUMNS are read.
+    aggregator = CjChunkAggregator(window_rows)
+    with section("stream_cj_aggregates", kind='load') as record:
+        for chunk in read_dataset_chunks(file_path, encoding, chunk_rows, None if window_rows else CJ_COLUMNS):
+            aggregator.update(chunk)
+        if record is not None:
+            record['rows_in'] = aggregator.rows
+    return aggregator.result(), aggregator.window
@@ -0,0 +1,97 @@
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+from Perf_trace import frame_stats
+
+MAX_ENTRIES = 256
+MAX_BYTES = 256 * 1024 ** 2
+
+
+def value_bytes(value):
+    # Rough size of a cached value: shallow memory of frames, containers and plain objects walked down to their items
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return frame_stats(value)[1]
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(value_bytes(key) + value_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(value_bytes(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + value_bytes(vars(value))
+    return sys.getsizeof(value)
+
+
+class ComputationCache:
+    # Results shared by every session, computed once per key: a session asking for a key another session is
+    # computing waits for that result instead of computing it again (single flight). Errors are passed to the
+    # sessions waiting and not kept. The least recently used results are dropped past max_entries or max_bytes.
+    # Cached values are shared, callers must not modify them (frames: see Store_data.snapshot).
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Key -> (value, bytes), least recently used first
+        self.values = OrderedDict()
+        # Key -> Future of the computation running for it
+        self.running = {}
+        self.bytes = 0
+        self.counts = {'hits': 0, 'misses': 0, 'waits': 0, 'evictions': 0, 'errors': 0}
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.values:
+                self.values.move_to_end(key)
+                self.counts['hits'] += 1
+                return self.values[key][0]
+            future = self.running.get(key)
+            owner = future is None
+            if owner:
+                future = self.running[key] = Future()
+                self.counts['misses'] += 1
+            else:
+                self.counts['waits'] += 1
+        if not owner:
+            try:
+                return future.result()
+            except Exception:
+                raise
+            except BaseException:
+                # The computing session was stopped (a rerun), not failed: compute it here instead
+                return self.get(key, compute)
+        try:
+            value = compute()
+        except BaseException as error:
+            with self.lock:
+                del self.running[key]
+                self.counts['errors'] += 1
+            future.set_exception(error)
+            raise
+        size = value_bytes(value)
+        with self.lock:
+            del self.running[key]
+            if size <= self.max_bytes:
+                self.values[key] = (value, size)
+                self.bytes += size
+                self._evict()
+        future.set_result(value)
+        return value
+
+    def _evict(self):
+        while self.values and (len(self.values) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, size) = self.values.popitem(last=False)
+            self.bytes -= size
+            self.counts['evictions'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            requests = self.counts['hits'] + self.counts['misses'] + self.counts['waits']
+            return {**self.counts, 'entries': len(self.values), 'bytes': self.bytes,
+                    'hit_rate': (self.counts['hits'] + self.counts['waits']) / requests if requests else None}
@@ -0,0 +1,392 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Store_data import BASE_DIR, DATASETS, dataset_path
+
+OUTPUT_DIR = os.path.join(BASE_DIR, "cache", "synthetic")
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Journey events and the chance of moving to each next event, whatever is left over ends the session
+START_EVENTS = {'Home': 0.45, 'Collection': 0.30, 'Product': 0.20, 'Search': 0.05}
+EVENT_TRANSITIONS = {
+    'Home': {'Home': 0.10, 'Collection': 0.40, 'Product': 0.15, 'Search': 0.08, 'Cart': 0.05},
+    'Collection': {'Collection': 0.25, 'Product': 0.35, 'Home': 0.10, 'Search': 0.05, 'Cart': 0.03},
+    'Product': {'Product': 0.20, 'Cart Add': 0.20, 'Collection': 0.20, 'Home': 0.05, 'Search': 0.05},
+    'Search': {'Product': 0.45, 'Collection': 0.15, 'Search': 0.10, 'Home': 0.05},
+    'Cart Add': {'Cart': 0.45, 'Product': 0.25, 'Collection': 0.15},
+    'Cart': {'Cart Update': 0.10, 'Cart Remove': 0.05, 'Product': 0.10, 'Collection': 0.10},
+    'Cart Update': {'Cart': 0.60, 'Collection': 0.10},
+    'Cart Remove': {'Cart': 0.40, 'Collection': 0.20},
+}
+EVENTS = list(EVENT_TRANSITIONS)
+# Events without a page view, they carry no Time_On_Page
+ACTION_EVENTS = ['Cart Add', 'Cart Update', 'Cart Remove']
+MAX_SESSION_EVENTS = 60
+
+PRODUCT_TYPES = ['Gift', 'Food', 'Snacks', 'Chocolate', 'Home', 'Accessories', 'Beauty', 'General']
+ADJECTIVES = ['Classic', 'Organic', 'Roasted', 'Luxury', 'Mini', 'Festive', 'Handmade', 'Spiced', 'Premium', 'Salted',
+              'Red', 'Golden', 'Wooden', 'Glass', 'Merino']
+NOUNS = ['Cashews', 'Almonds', 'Gift Box', 'Tea Light Holder', 'Scarf', 'Brittle Bars', 'Quinoa', 'Basmati Rice',
+         'Mince Pies', 'Candle', 'Hamper', 'Truffles', 'Mug', 'Notebook', 'Soap']
+SIZES = ['250g', '500g', '1kg', '2kg', 'Small', 'Medium', 'Large', '10-pack']
+COLLECTIONS = ['all', 'gifts', 'best-sellers', 'new-arrivals', 'sale', 'nuts', 'chocolate', 'pre-packed-gift-boxes',
+               'home', 'accessories']
+FIRST_NAMES = ['Ana', 'Lorna', 'Stefania', 'Robert', 'Melanie', 'Neil', 'Priya', 'Johan', 'Maria', 'David', 'Aisha',
+               'Tom', 'Lerato', 'Vikram', 'Sofia']
+LAST_NAMES = ['Cini', 'Schembri', 'Camilleri', 'Duncombe', 'Van der Laan', 'Sharma', 'Naidoo', 'Smith', 'Borg',
+              'Mokoena', 'Patel', 'Rossi', 'Jones']
+LOCATIONS = [('Western Cape', 'South Africa'), ('Gauteng', 'South Africa'), ('', 'Malta'), ('Maharashtra', 'India'),
+             ('Delhi', 'India'), ('England', 'United Kingdom'), ('California', 'United States'), ('', '')]
+# (Order_Referring_Site, Order_Source_Name) pairs with their share of orders
+REFERRERS = [('', 'direct', 0.35), ('https://www.google.com/', 'Google', 0.25), ('http://instagram.com/', 'Instagram', 0.12),
+             ('http://m.facebook.com/', 'Facebook', 0.10), ('', 'email', 0.08), ('https://www.bing.com/', 'Bing', 0.04),
+             ('', 'an unknown source', 0.06)]
+CANCEL_REASONS = ['CUSTOMER', 'OTHER', 'INVENTORY', 'FRAUD', 'DECLINED']
+
+
+def unique_ids(rng, count, start):
+    # Sorted, unique Shopify-sized integer IDs with random gaps
+    return start + np.arange(count, dtype=np.int64) * 1000 + rng.integers(0, 1000, count)
+
+
+def popularity(rng, count, exponent=1.1):
+    # Zipf-like weights in random order: a few customers / products get most of the activity
+    weights = 1 / np.arange(1, count + 1) ** exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def random_times(rng, count, start, days):
+    seconds = rng.integers(0, days * 86400, count)
+    return pd.Timestamp(start, tz='UTC') + pd.to_timedelta(np.sort(seconds), unit='s')
+
+
+def pick(rng, values, count, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), count, p=p)]
+
+
+def ip_addresses(rng, count):
+    numbers = np.unique(rng.integers(16777216, 3758096383, int(count * 1.05) + 16))
+    numbers = rng.permutation(numbers)[:count]
+    octets = [pd.Series((numbers >> shift) & 255).astype(str) for shift in (24, 16, 8, 0)]
+    return (octets[0] + '.' + octets[1] + '.' + octets[2] + '.' + octets[3]).to_numpy()
+
+
+# Todo- Products / Customers----------------------------------------------
+def generate_products(rng, n_products, start, days):
+    product_ids = unique_ids(rng, n_products, 6000000000000)
+    titles = pd.Series(pick(rng, ADJECTIVES, n_products)) + ' ' + pick(rng, NOUNS, n_products) + ' (' + \
+        pick(rng, SIZES, n_products) + ')'
+    # Most products have a single "Default Title" variant, a few have many
+    variant_counts = np.minimum(rng.geometric(0.65, n_products), 10)
+    product_index = np.repeat(np.arange(n_products), variant_counts)
+    variant_number = pd.Series(product_index).groupby(product_index).cumcount().to_numpy()
+    single = variant_counts[product_index] == 1
+    base_price = np.round(rng.lognormal(np.log(30), 0.9, n_products), 2)
+    created_at = random_times(rng, n_products, start, days)[rng.permutation(n_products)]
+    published_at = pd.Series(created_at).where(rng.random(n_products) > 0.1).iloc[product_index].reset_index(drop=True)
+    variant_titles = np.where(single, 'Default Title', pd.Series(pick(rng, SIZES, len(product_index))).to_numpy())
+    return pd.DataFrame({
+        'Product_ID': product_ids[product_index],
+        'Product_Title': titles.to_numpy()[product_index],
+        'Product_Type': pick(rng, PRODUCT_TYPES, n_products)[product_index],
+        'Product_Published_At': published_at,
+        'Product_Variant_Id': unique_ids(rng, len(product_index), 40000000000000),
+        'Variant_Price': np.round(base_price[product_index] * (1 + 0.25 * variant_number), 2),
+        'Variant_Inventory_Quantity': rng.poisson(20, len(product_index)),
+        'Variant_Created_At': created_at[product_index],
+        'Product_Created_At': created_at[product_index],
+        'Body_Html': '<p>' + titles.to_numpy()[product_index] + '</p>',
+        'Variant_Title': variant_titles,
+        'Option_Names': np.where(single, 'Title', 'Size'),
+        'Option_Values': variant_titles,
+        'Image_Ids': unique_ids(rng, n_products, 70000000000000)[product_index],
+        'Image_Sources': 'https://cdn.example.com/products/' + pd.Series(product_ids[product_index]).astype(
+            str).to_numpy() + '.jpg',
+    })
+
+
+def generate_customer_ids(rng, n_customers):
+    customer_ids = unique_ids(rng, n_customers, 8000000000000)
+    names = pd.Series(pick(rng, FIRST_NAMES, n_customers)) + ' ' + pick(rng, LAST_NAMES, n_customers)
+    return customer_ids, names.to_numpy()
+
+
+def generate_customers(rng, customer_ids, names, orders, start, days):
+    # Order counts, spend and last order are taken from the generated orders so the files agree
+    per_order = orders.drop_duplicates('Order_ID')
+    stats = per_order.groupby('Customer_ID').agg(
+        Customer_Orders_Count=('Order_ID', 'nunique'),
+        Customer_Total_Spent=('Order_Total_Price', 'sum'),
+        Customer_Last_Order_ID=('Order_ID', 'last'),
+        First_Order=('Order_Created_At', 'min'),
+        Last_Order=('Order_Created_At', 'max'),
+    ).reindex(customer_ids)
+    n_customers = len(customer_ids)
+    signup = pd.Series(random_times(rng, n_customers, start, days)[rng.permutation(n_customers)], index=customer_ids)
+    created_at = stats['First_Order'].sub(pd.to_timedelta(rng.integers(0, 86400 * 30, n_customers), unit='s')) \
+        .fillna(signup)
+    locations = np.asarray(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), n_customers)]
+    return pd.DataFrame({
+        'Customer_ID': customer_ids,
+        'Customer_Created_At': created_at.reset_index(drop=True),
+        'Customer_Updated_At': stats['Last_Order'].fillna(created_at).reset_index(drop=True),
+        'Customer_Orders_Count': stats['Customer_Orders_Count'].fillna(0).astype(int).to_numpy(),
+        'Customer_Total_Spent': stats['Customer_Total_Spent'].fillna(0.0).round(2).to_numpy(),
+        'Customer_Last_Order_ID': stats['Customer_Last_Order_ID'].astype('Int64').reset_index(drop=True),
+        'Customer_Province': locations[:, 0],
+        'Customer_Country': locations[:, 1],
+        'Customer_Name': names,
+    })
+
+
+# Todo- Orders / Abandoned checkouts---------------------------------------
+def order_lines(rng, n_orders, extra_lines, products, customer_weights, start, days):
+    # One row per line item; returns the rows plus the index of the customer of each row
+    lines_per_order = 1 + rng.poisson(extra_lines, n_orders)
+    order_index = np.repeat(np.arange(n_orders), lines_per_order)
+    n_lines = len(order_index)
+    customer_index = rng.choice(len(customer_weights), n_orders, p=customer_weights)[order_index]
+    created_at = random_times(rng, n_orders, start, days)[order_index]
+    variant_index = rng.choice(len(products), n_lines, p=popularity(rng, len(products)))
+    variants = products.iloc[variant_index]
+    quantity = 1 + rng.poisson(0.3, n_lines)
+    line_total = pd.Series(variants['Variant_Price'].to_numpy() * quantity)
+    order_total = line_total.groupby(order_index).transform('sum').round(2).to_numpy()
+    return order_index, customer_index, created_at, variants, quantity, order_total
+
+
+def generate_orders(rng, n_lines, products, customer_ids, names, start, days):
+    n_orders = max(1, int(n_lines / 2.2))
+    order_index, customer_index, created_at, variants, quantity, order_total = order_lines(
+        rng, n_orders, 1.2, products, popularity(rng, len(customer_ids), 0.9), start, days)
+    order_ids = unique_ids(rng, n_orders, 5000000000000)
+    has_discount = (rng.random(n_orders) < 0.2)[order_index]
+    discount = np.where(has_discount, np.round(order_total * 0.1, 2), 0.0)
+    cancelled = (rng.random(n_orders) < 0.03)[order_index]
+    updated_at = created_at + pd.to_timedelta(rng.integers(60, 86400, n_orders)[order_index], unit='s')
+    referrers = rng.choice(len(REFERRERS), n_orders, p=[share for _, _, share in REFERRERS])[order_index]
+    customer_names = names[customer_index]
+    return pd.DataFrame({
+        'Order_ID': order_ids[order_index],
+        'Customer_ID': customer_ids[customer_index],
+        'Order_Created_At': created_at,
+        'Order_Updated_At': updated_at,
+        'Order_Cancelled_At': pd.Series(updated_at).where(cancelled),
+        'Order_Cancel_Reason': np.where(cancelled, pick(rng, CANCEL_REASONS, n_orders)[order_index], ''),
+        'Product_ID': variants['Product_ID'].to_numpy(),
+        'Product_Variant_Id': variants['Product_Variant_Id'].to_numpy(),
+        'Product_Quantity': quantity,
+        'Order_Total_Price': np.round(order_total - discount, 2),
+        'Currency': 'EUR',
+        'Product_Price': variants['Variant_Price'].to_numpy(),
+        'Order_Total_Discount': discount,
+        'Product_Discount': np.where(has_discount, np.round(variants['Variant_Price'].to_numpy() * 0.1, 2), 0.0),
+        'Order_Refund_Amount': np.where(cancelled, np.round(order_total - discount, 2), 0.0),
+        'Order_Referring_Site': np.asarray([site for site, _, _ in REFERRERS], dtype=object)[referrers],
+        'Order_Source_Name': np.asarray([source for _, source, _ in REFERRERS], dtype=object)[referrers],
+        'Product_Name': variants['Product_Title'].to_numpy(),
+        'Customer_Name': customer_names,
+        'Customer_Email': pd.Series(customer_names).str.lower().str.replace(' ', '.', regex=False).to_numpy() +
+        '@example.com',
+    })
+
+
+def generate_abandoned_checkouts(rng, n_lines, products, customer_ids, start, days):
+    n_checkouts = max(1, int(n_lines / 1.5))
+    order_index, customer_index, created_at, variants, quantity, order_total = order_lines(
+        rng, n_checkouts, 0.5, products, popularity(rng, len(customer_ids), 0.6), start, days)
+    referrers = rng.choice(len(REFERRERS), n_checkouts, p=[share for _, _, share in REFERRERS])[order_index]
+    return pd.DataFrame({
+        'Order_ID': unique_ids(rng, n_checkouts, 30000000000000)[order_index],
+        'Order_Created_At': created_at,
+        'Order_Updated_At': created_at + pd.to_timedelta(rng.integers(0, 7200, n_checkouts)[order_index], unit='s'),
+        'Order_Referring_Site': np.asarray([site for site, _, _ in REFERRERS], dtype=object)[referrers],
+        'Order_Total_Discount': 0.0,
+        'Order_Total_Price': order_total,
+        'Product_ID': variants['Product_ID'].to_numpy(),
+        'Product_Quantity': quantity,
+        'Variant_ID': variants['Product_Variant_Id'].to_numpy(),
+        'Currency': 'EUR',
+        'Product_Variant_Price': variants['Variant_Price'].to_numpy(),
+        'Customer_ID': customer_ids[customer_index],
+    })
+
+
+# Todo- Customer Journey---------------------------------------------------
+def transition_matrix():
+    # Row per event (plus the start state), cumulative probabilities over EVENTS + [end]
+    rows = [START_EVENTS] + [EVENT_TRANSITIONS[event] for event in EVENTS]
+    matrix = np.zeros((len(rows), len(EVENTS) + 1))
+    for i, row in enumerate(rows):
+        for event, probability in row.items():
+            matrix[i, EVENTS.index(event)] = probability
+        matrix[i, -1] = 1 - matrix[i, :-1].sum()
+    return np.cumsum(matrix, axis=1)
+
+
+def session_events(rng, n_sessions, cumulative):
+    # Walk every session of the chunk through the Markov chain at once; returns (session index, event index)
+    state = np.zeros(n_sessions, dtype=np.int64)  # 0 is the start state, events are 1..len(EVENTS)
+    active = np.arange(n_sessions)
+    sessions, events = [], []
+    for _ in range(MAX_SESSION_EVENTS):
+        draws = rng.random(len(active))
+        next_event = (draws[:, None] > cumulative[state[active]]).sum(axis=1)
+        keep = next_event < len(EVENTS)
+        active, next_event = active[keep], next_event[keep]
+        if not len(active):
+            break
+        sessions.append(active)
+        events.append(next_event)
+        state[active] = next_event + 1
+    sessions, events = np.concatenate(sessions), np.concatenate(events)
+    order = np.argsort(sessions, kind='stable')
+    return sessions[order], events[order]
+
+
+def generate_cj_chunk(rng, n_sessions, visitors, session_counter, products, customer_ids, names, chunk_start,
+                      chunk_seconds, cumulative):
+    visitor_index = rng.choice(len(visitors['ip']), n_sessions, p=visitors['weights'])
+    starts = np.sort(rng.integers(0, chunk_seconds, n_sessions))
+    # Sessions are numbered per IP in time order, carried over from the previous chunks
+    order_in_chunk = pd.Series(visitor_index).groupby(visitor_index).cumcount().to_numpy()
+    session_number = session_counter[visitor_index] + order_in_chunk + 1
+    np.add.at(session_counter, visitor_index, 1)
+
+    session_index, event_index = session_events(rng, n_sessions, cumulative)
+    n_events = len(session_index)
+    event_names = np.asarray(EVENTS, dtype=object)[event_index]
+    is_action = np.isin(event_names, ACTION_EVENTS)
+    time_on_page = np.where(is_action, np.nan, np.round(rng.lognormal(np.log(25), 1.3, n_events), 3))
+    # Event time = session start + time spent on the previous events of the session
+    elapsed = pd.Series(np.nan_to_num(time_on_page) + rng.uniform(0.5, 5, n_events)).groupby(
+        session_index).cumsum().to_numpy() - np.nan_to_num(time_on_page)
+    event_time = (chunk_start + pd.to_timedelta(starts[session_index] + elapsed, unit='s')).round('ms')
+
+    has_product = np.isin(event_names, ['Product', 'Cart Add', 'Cart Update', 'Cart Remove'])
+    variant_index = rng.choice(len(products), n_events, p=products.attrs['popularity'])
+    product_titles = products['Product_Title'].to_numpy()[variant_index]
+    is_customer = visitors['customer'][visitor_index][session_index]
+    customer_index = np.where(is_customer >= 0, is_customer, 0)
+    return pd.DataFrame({
+        'category': 'Engagement',
+        'Event': event_names,
+        'Customer_IP': visitors['ip'][visitor_index][session_index],
+        'Event_Time': event_time,
+        'Product_ID': np.where(has_product, products['Product_ID'].to_numpy()[variant_index].astype(float), np.nan),
+        'Quantity': np.where(np.isin(event_names, ['Cart Add', 'Cart Update']), 1 + rng.poisson(0.3, n_events),
+                             np.nan),
+        'Collection_Name': np.where(event_names == 'Collection', pick(rng, COLLECTIONS, n_events), None),
+        'Search_Term': np.where(event_names == 'Search', product_titles, None),
+        'Time_On_Page': time_on_page,
+        'Product_Name': np.where(event_names == 'Product', pd.Series(product_titles).str.lower().to_numpy(),
+                                 np.where(has_product, product_titles, None)),
+        'session': session_number[session_index],
+        'Customer_ID': np.where(is_customer >= 0, customer_ids[customer_index], np.nan),
+        'Customer_Name': np.where(is_customer >= 0, names[customer_index], None),
+    })
+
+
+def write_cj(rng, path, n_rows, products, customer_ids, names, start, days, chunk_rows):
+    cumulative = transition_matrix()
+    # Rough events per session from a pilot walk, used to size the visitor pool and the chunks
+    pilot_sessions, _ = session_events(rng, 2000, cumulative)
+    events_per_session = len(pilot_sessions) / 2000
+    n_sessions = max(1, int(n_rows / events_per_session))
+    n_visitors = max(1, int(n_sessions / 2.5))
+    # About a fifth of the visitors are logged in customers
+    logged_in = rng.random(n_visitors) < 0.2
+    visitors = {
+        'ip': ip_addresses(rng, n_visitors),
+        'weights': popularity(rng, n_visitors, 0.7),
+        'customer': np.where(logged_in, rng.integers(0, len(customer_ids), n_visitors), -1),
+    }
+    session_counter = np.zeros(n_visitors, dtype=np.int64)
+    products.attrs['popularity'] = popularity(rng, len(products))
+
+    n_chunks = max(1, int(np.ceil(n_rows / chunk_rows)))
+    chunk_seconds = days * 86400 // n_chunks
+    written = 0
+    for chunk in range(n_chunks):
+        sessions = int(np.ceil((n_rows - written) / events_per_session / (n_chunks - chunk)))
+        last = chunk == n_chunks - 1
+        if last:
+            # Sessions vary in length, the last chunk asks for more and is cut to the rows still missing
+            sessions = int(sessions * 1.1) + 10
+        chunk_start = pd.Timestamp(start, tz='UTC') + pd.Timedelta(seconds=chunk * chunk_seconds)
+        counter = session_counter.copy()
+        while True:
+            df = generate_cj_chunk(rng, max(1, sessions), visitors, session_counter, products, customer_ids, names,
+                                   chunk_start, chunk_seconds, cumulative)
+            if not last or len(df) >= n_rows - written:
+                break
+            # Still short: the session numbers go back to before this chunk and it is drawn again, twice as big
+            session_counter[:] = counter
+            sessions *= 2
+        if last or written + len(df) > n_rows:
+            df = df.iloc[:n_rows - written]
+        df.to_csv(path, mode='w' if chunk == 0 else 'a', header=chunk == 0, index=False)
+        written += len(df)
+    return written
+
+
+def generate_store(store, rows, out_dir=OUTPUT_DIR, seed=0, start='2024-01-01', days=365, chunk_rows=1_000_000,
+                   customers=None, products=None, orders=None, abandoned=None):
+    # rows is the CJ size; the other datasets scale with it unless given explicitly
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {
+        'Products_Dataset': products or int(np.clip(rows / 400, 50, 50000)),
+        'Customers_Dataset': customers or max(50, rows // 25),
+        'Orders_Dataset': orders or max(100, rows // 5),
+        'AbandonedCheckouts': abandoned or max(50, rows // 15),
+    }
+    df_products = generate_products(rng, counts['Products_Dataset'], start, days)
+    customer_ids, names = generate_customer_ids(rng, counts['Customers_Dataset'])
+    df_orders = generate_orders(rng, counts['Orders_Dataset'], df_products, customer_ids, names, start, days)
+    frames = {
+        'Products_Dataset': df_products,
+        'Orders_Dataset': df_orders,
+        'Customers_Dataset': generate_customers(rng, customer_ids, names, df_orders, start, days),
+        'AbandonedCheckouts': generate_abandoned_checkouts(rng, counts['AbandonedCheckouts'], df_products, customer_ids,
+                                                           start, days),
+    }
+    written = {}
+    for dataset, df in frames.items():
+        df.to_csv(dataset_path(store, dataset, out_dir), index=False, encoding=DATASETS[dataset][1],
+                  date_format=TIMESTAMP_FORMAT)
+        written[dataset] = len(df)
+    written['CJ'] = write_cj(rng, dataset_path(store, 'CJ', out_dir), rows, df_products, customer_ids, names, start,
+                             days, chunk_rows)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic store with the five dashboard datasets.")
+    parser.add_argument('--store', default='synthetic', help="Store name used as the file prefix")
+    parser.add_argument('--rows', type=int, default=100_000, help="Customer Journey rows (10k to 10M)")
+    parser.add_argument('--out-dir', default=OUTPUT_DIR, help="Folder the {store}_*.csv files are written to")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed, the same seed gives the same files")
+    parser.add_argument('--start', default='2024-01-01', help="First day of the generated activity")
+    parser.add_argument('--days', type=int, default=365, help="Number of days of activity")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="CJ rows generated and written at a time")
+    parser.add_argument('--customers', type=int, help="Customers (default rows / 25)")
+    parser.add_argument('--products', type=int, help="Products (default rows / 400, 50 to 50k)")
+    parser.add_argument('--orders', type=int, help="Order line items (default rows / 5)")
+    parser.add_argument('--abandoned', type=int, help="Abandoned checkout line items (default rows / 15)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = generate_store(args.store, args.rows, args.out_dir, args.seed, args.start, args.days, args.chunk_rows,
+                             args.customers, args.products, args.orders, args.abandoned)
+    for dataset, count in written.items():
+        print(f"{dataset_path(args.store, dataset, args.out_dir)}: {count} rows")
+    print(f"Generated {args.store} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
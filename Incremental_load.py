@@ -0,0 +1,140 @@
+import hashlib
+import io
+import os
+import threading
+
+import pandas as pd
+
+from Perf_trace import section
+from Store_data import parse_date_columns, read_dataset
+
+# Bytes at the start of a file compared on every refresh, a rewritten export changes them
+HEAD_BYTES = 64 * 1024
+
+
+class AppendableCsv:
+    # A CSV export read once, then extended with only the rows appended to it since: the bytes after the last
+    # complete line read are parsed and concatenated onto the frame. A file that got smaller, whose first bytes
+    # changed or whose appended rows do not fit the columns read so far is read again from the start.
+    def __init__(self, file_path, encoding='utf-8', parse_dates=True, arrow=False):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.parse_dates = parse_dates
+        self.arrow = arrow
+        self.lock = threading.Lock()
+        self.df = None
+        self.rows = 0
+        self.offset = 0
+        self.stat = None
+        self.header = b''
+        self.head_length = 0
+        self.head_digest = None
+        # Incremented on every full read, aggregates folded from an older generation are started over
+        self.generation = 0
+        self.status = None
+
+    def _head_digest(self, f):
+        f.seek(0)
+        return hashlib.sha1(f.read(self.head_length)).hexdigest()
+
+    def _load(self):
+        while True:
+            before = os.stat(self.file_path)
+            df = read_dataset(self.file_path, self.encoding, self.parse_dates, self.arrow)
+            after = os.stat(self.file_path)
+            if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+                break
+        with open(self.file_path, 'rb') as f:
+            self.header = f.readline()
+            self.head_length = min(after.st_size, HEAD_BYTES)
+            self.head_digest = self._head_digest(f)
+            f.seek(max(after.st_size - 1, 0))
+            # A last line without its newline may still be being written, the next change reloads the file
+            complete = f.read(1) in (b'\n', b'')
+        self.df, self.rows, self.stat = df, len(df), after
+        self.offset = after.st_size if complete else -1
+        self.generation += 1
+        self.status = 'loaded'
+
+    def _parse_tail(self, data):
+        tail = pd.read_csv(io.BytesIO(self.header + data), encoding=self.encoding)
+        if self.parse_dates:
+            tail = parse_date_columns(tail)
+        if list(tail.columns) != list(self.df.columns):
+            return None
+        for col in tail.columns:
+            cached, appended = self.df[col], tail[col]
+            if cached.dtype == appended.dtype:
+                continue
+            # A date column left empty reads as float NaN, typed like the frame's so the concat keeps its dates
+            if pd.api.types.is_datetime64_any_dtype(cached) and appended.isna().all():
+                tail[col] = pd.Series(pd.NaT, index=tail.index, dtype=cached.dtype)
+                continue
+            # Dates after a column that was empty so far (or of another unit or zone): a full read types it
+            if pd.api.types.is_datetime64_any_dtype(cached) or pd.api.types.is_datetime64_any_dtype(appended):
+                return None
+            # Text in a column that so far only held numbers (or the reverse): a full read would type it differently
+            if (pd.api.types.is_numeric_dtype(cached) != pd.api.types.is_numeric_dtype(appended)
+                    and cached.notna().any() and appended.notna().any()):
+                return None
+            if isinstance(cached.dtype, pd.StringDtype) and not pd.api.types.is_numeric_dtype(appended):
+                tail[col] = appended.astype(cached.dtype)
+        return tail
+
+    def refresh(self):
+        # (current frame, generation it belongs to)
+        with self.lock:
+            stat = os.stat(self.file_path)
+            if self.stat is not None and (stat.st_size, stat.st_mtime_ns) == (self.stat.st_size,
+                                                                               self.stat.st_mtime_ns):
+                self.status = 'unchanged'
+                return self.df, self.generation
+            if self.df is None or self.offset < 0 or stat.st_size <= self.offset:
+                self._load()
+                return self.df, self.generation
+            with open(self.file_path, 'rb') as f:
+                if self._head_digest(f) != self.head_digest:
+                    tail = None
+                else:
+                    f.seek(self.offset)
+                    data = f.read(stat.st_size - self.offset)
+                    data = data[:data.rfind(b'\n') + 1]
+                    if not data:
+                        # Only part of a line so far, read again once it is complete
+                        self.status = 'unchanged'
+                        return self.df, self.generation
+                    with section(f"append:{os.path.basename(self.file_path)}", kind='load') as record:
+                        tail = self._parse_tail(data)
+                        if record is not None and tail is not None:
+                            record['rows_in'] = len(tail)
+            if tail is None:
+                self._load()
+                return self.df, self.generation
+            self.df = pd.concat([self.df, tail], ignore_index=True)
+            self.rows += len(tail)
+            self.offset += len(data)
+            self.stat = stat
+            self.status = 'appended'
+            return self.df, self.generation
+
+
+class IncrementalAggregates:
+    # Page aggregates kept up to date with an AppendableCsv: the rows appended to it are folded into the
+    # aggregator (CjChunkAggregator, RevenueChunkAggregator), a full read of the file starts a new one
+    def __init__(self, make_aggregator):
+        self.make_aggregator = make_aggregator
+        self.lock = threading.Lock()
+        self.generation = None
+        self.aggregator = None
+        self.result = None
+
+    def update(self, df, generation):
+        with self.lock:
+            if generation != self.generation or len(df) < self.aggregator.rows:
+                self.aggregator = self.make_aggregator()
+                self.generation = generation
+                self.result = None
+            if len(df) > self.aggregator.rows or self.result is None:
+                self.aggregator.update(df.iloc[self.aggregator.rows:])
+                self.result = self.aggregator.result()
+            return self.result
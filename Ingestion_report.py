@@ -0,0 +1,141 @@
+import argparse
+import math
+import os
+import time
+
+import pandas as pd
+
+import Store_metrics as metrics
+from Quantile_sketch import QuantileSketch
+from Store_data import ARROW_INGESTION, DATA_DIR, DATASETS, dataset_path, read_dataset
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ENGINES = {'object': False, 'arrow': True}
+
+
+def best_seconds(func, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def _comparable(column):
+    # The values a chart reads, whatever the text storage: categories and Arrow strings as objects, NaN / <NA> as None
+    column = column.astype(object)
+    return column.where(column.notna(), None)
+
+
+def aggregate_differences(expected, actual, path='aggregates'):
+    # Paths of the aggregates that differ between the two ingestion paths (dtypes of equal values aside)
+    if isinstance(expected, dict):
+        if set(expected) != set(actual):
+            return [path]
+        return [diff for key in expected for diff in aggregate_differences(expected[key], actual[key], f"{path}.{key}")]
+    if isinstance(expected, (tuple, list)):
+        if len(expected) != len(actual):
+            return [path]
+        return [diff for i, (a, b) in enumerate(zip(expected, actual))
+                for diff in aggregate_differences(a, b, f"{path}[{i}]")]
+    if isinstance(expected, QuantileSketch):
+        same = expected.count == actual.count and expected.quantiles() == actual.quantiles()
+        return [] if same else [path]
+    if isinstance(expected, (pd.DataFrame, pd.Series)):
+        if type(expected) is not type(actual):
+            return [path]
+        if isinstance(expected, pd.Series):
+            expected, actual = expected.to_frame(), actual.to_frame()
+        try:
+            pd.testing.assert_frame_equal(expected.apply(_comparable), actual.apply(_comparable), check_dtype=False,
+                                          check_index_type=False, check_column_type=False, check_names=False)
+        except AssertionError:
+            return [path]
+        return []
+    if isinstance(expected, float) and isinstance(actual, float):
+        same = math.isclose(expected, actual, rel_tol=1e-9) or (math.isnan(expected) and math.isnan(actual))
+        return [] if same else [path]
+    try:
+        return [] if expected == actual else [path]
+    except ValueError:
+        return [path]
+
+
+def compare_ingestion(store, data_dir=DATA_DIR, repeat=3):
+    # Per dataset and engine: load time, deep memory and the pandas -> Arrow conversion Streamlit does on display;
+    # per page and engine: the time to compute its aggregates from those frames and whether they (the chart inputs)
+    # match the object path ones
+    engines = {name: arrow for name, arrow in ENGINES.items() if ARROW_INGESTION or not arrow}
+    rows = []
+    frames = {name: {} for name in engines}
+    for dataset, (_, encoding) in DATASETS.items():
+        path = dataset_path(store, dataset, data_dir)
+        if not os.path.exists(path):
+            continue
+        for name, arrow in engines.items():
+            load_seconds = best_seconds(lambda: read_dataset(path, encoding=encoding, arrow=arrow), repeat)
+            df = read_dataset(path, encoding=encoding, arrow=arrow)
+            frames[name][dataset] = None if df.empty else df
+            rows.append({'item': dataset, 'engine': name, 'rows': len(df), 'seconds': load_seconds,
+                         'MB': df.memory_usage(deep=True).sum() / 1024 ** 2,
+                         'to_arrow_seconds': best_seconds(lambda: pa.Table.from_pandas(df), repeat) if pa else None,
+                         'string_columns': sum(pd.api.types.is_string_dtype(df[col]) for col in df.columns)})
+    for page in metrics.PAGE_TASKS:
+        expected = None
+        for name in engines:
+            store_frames = {dataset: frames[name].get(dataset) for dataset in DATASETS}
+            seconds = best_seconds(lambda: metrics.compute_page_aggregates(page, store_frames), repeat)
+            aggregates = metrics.compute_page_aggregates(page, store_frames)
+            if expected is None:
+                expected = aggregates
+            rows.append({'item': f"page:{page}", 'engine': name, 'seconds': seconds,
+                         'differences': aggregate_differences(expected, aggregates, page)})
+    return pd.DataFrame(rows, columns=['item', 'engine', 'rows', 'seconds', 'MB', 'to_arrow_seconds',
+                                       'string_columns', 'differences'])
+
+
+def comparison_table(report):
+    # One row per item with both engines side by side and the arrow / object ratios
+    values = ['seconds', 'MB', 'to_arrow_seconds']
+    table = report.pivot(index='item', columns='engine', values=values)
+    table = table.reindex(report['item'].drop_duplicates())
+    columns = []
+    for value in values:
+        columns += [(value, engine) for engine in ENGINES if (value, engine) in table.columns]
+    table = table[columns]
+    table.columns = [f"{value}:{engine}" for value, engine in columns]
+    if 'arrow' in set(report['engine']):
+        for value in values:
+            table[f"{value}:ratio"] = table[f"{value}:arrow"] / table[f"{value}:object"]
+    return table.dropna(axis=1, how='all').round(4).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Object vs Arrow string ingestion: load time, memory and "
+                                                 "aggregate time per dataset and page.")
+    parser.add_argument('store', help="Store name")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder with the {store}_*.csv exports")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement, the best one is kept")
+    args = parser.parse_args()
+
+    if not ARROW_INGESTION:
+        print("pyarrow is not installed, only the object path is measured")
+    report = compare_ingestion(args.store, args.data_dir, args.repeat)
+    print(comparison_table(report).to_string(index=False))
+    datasets = report[~report['item'].str.startswith('page:')]
+    print("\nTotal:")
+    print(datasets.groupby('engine', sort=False)[['seconds', 'MB']].sum().round(3).to_string())
+    differences = [diff for diffs in report['differences'].dropna() for diff in diffs]
+    if differences:
+        print("\nAggregates differing from the object path:", ", ".join(differences))
+    elif 'arrow' in set(report['engine']):
+        print("\nAggregates of every page match the object path")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from Perf_trace import section
+
+# Module name -> seconds its deferred import took in this process
+import_times = {}
+_import_lock = threading.Lock()
+
+
+class LazyModule:
+    # Stands in for a module until an attribute is first read, so a heavy library only loads with the first
+    # section drawing with it (and not at all when that section is served from a cache)
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+
+    def _load(self):
+        with _import_lock:
+            if self._module is None:
+                already_loaded = self._name in sys.modules
+                start = time.perf_counter()
+                with section(f"import:{self._name}", kind='import'):
+                    module = importlib.import_module(self._name)
+                if not already_loaded:
+                    import_times[self._name] = time.perf_counter() - start
+                if self._on_load is not None:
+                    # Process-wide settings of the module, applied once before any caller uses it
+                    self._on_load(module)
+                self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{' (loaded)' if self._module else ''}>"
+
+
+def lazy_import(name, on_load=None):
+    return LazyModule(name, on_load)
+
+
+def import_report(module='Store_selection', python=sys.executable):
+    # Parses `python -X importtime -c "import <module>"` run in a fresh interpreter, like a new server worker
+    result = subprocess.run([python, '-X', 'importtime', '-c', f"import {module}"], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({'module': name.strip(), 'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                     'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return pd.DataFrame(rows, columns=['module', 'depth', 'self_ms', 'cumulative_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time per module of a fresh interpreter.")
+    parser.add_argument('module', nargs='?', default='Store_selection', help="Module to import")
+    parser.add_argument('--top', type=int, default=20, help="Number of modules listed")
+    parser.add_argument('--depth', type=int, default=1, help="Deepest nesting level listed (0 = top level)")
+    args = parser.parse_args()
+
+    report = import_report(args.module)
+    listed = report[report['depth'] <= args.depth].sort_values('cumulative_ms', ascending=False).head(args.top)
+    print(listed.to_string(index=False))
+    total = report.loc[report['module'] == args.module, 'cumulative_ms']
+    print(f"\nimport {args.module}: {total.iloc[0] if len(total) else report['self_ms'].sum():.1f} ms, "
+          f"{len(report)} modules")
+    deferred = [name for name in ('altair', 'wordcloud', 'matplotlib') if not (report['module'] == name).any()]
+    if deferred:
+        print(f"Not imported at startup: {', '.join(deferred)}")
+
+
+if __name__ == '__main__':
+    main()
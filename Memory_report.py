@@ -0,0 +1,109 @@
+import argparse
+
+import pandas as pd
+
+import Store_metrics as metrics
+from Store_data import DATA_DIR, load_store
+
+try:
+    import pyarrow  # noqa: F401  optional, only used to estimate Arrow string storage
+    ARROW_STRING = 'string[pyarrow]'
+except ImportError:
+    ARROW_STRING = None
+
+# A suggestion is only flagged when it would save at least this share of the column
+MIN_SAVING = 0.2
+REPORT_COLUMNS = ['frame', 'column', 'dtype', 'rows', 'bytes', 'unique', 'suggestion', 'suggested_bytes']
+
+
+def column_memory(df, frame_name):
+    # One row per column (and the index) with its deep memory and, for object columns, a cheaper storage
+    rows = [{'frame': frame_name, 'column': '(index)', 'dtype': str(df.index.dtype), 'rows': len(df),
+             'bytes': int(df.index.memory_usage(deep=True)), 'unique': None, 'suggestion': '',
+             'suggested_bytes': None}]
+    for column, size in df.memory_usage(deep=True, index=False).items():
+        row = {'frame': frame_name, 'column': column, 'dtype': str(df[column].dtype), 'rows': len(df),
+               'bytes': int(size), 'unique': None, 'suggestion': '', 'suggested_bytes': None}
+        if df[column].dtype == 'object':
+            row.update(object_column_suggestion(df[column]))
+        rows.append(row)
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def object_column_suggestion(series):
+    # Low cardinality -> category, otherwise Arrow strings (when pyarrow is installed)
+    size = series.memory_usage(deep=True, index=False)
+    unique = series.nunique(dropna=True)
+    if len(series) and unique / len(series) <= 0.5:
+        suggestion = 'category'
+    elif ARROW_STRING:
+        suggestion = ARROW_STRING
+    else:
+        return {'unique': unique}
+    try:
+        suggested_bytes = int(series.astype(suggestion).memory_usage(deep=True, index=False))
+    except (TypeError, ValueError):
+        return {'unique': unique}
+    if suggested_bytes > size * (1 - MIN_SAVING):
+        return {'unique': unique, 'suggested_bytes': suggested_bytes}
+    return {'unique': unique, 'suggestion': suggestion, 'suggested_bytes': suggested_bytes}
+
+
+def derived_frames(frames):
+    # The large intermediate frames the pages build from the loaded datasets
+    df_cj, df_orders, df_products = frames['CJ'], frames['Orders_Dataset'], frames['Products_Dataset']
+    derived = {}
+    if metrics.available(df_cj):
+        derived['ip_time_spent (CJ filtered_df)'] = metrics.ip_time_spent(df_cj)
+    if metrics.available(df_orders):
+        derived['unique_orders (Revenue df_unique_orders)'] = metrics.unique_orders(df_orders)
+        if metrics.available(df_products):
+            derived['unsold_products'] = metrics.unsold_products(df_orders, df_products)
+    return derived
+
+
+def memory_report(frames, include_derived=True):
+    named = {f"df:{name}": df for name, df in frames.items() if metrics.available(df)}
+    if include_derived:
+        named.update({f"derived:{name}": df for name, df in derived_frames(frames).items()})
+    if not named:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat([column_memory(df, name) for name, df in named.items()], ignore_index=True)
+
+
+def memory_summary(report):
+    # Per frame totals, with what the flagged columns would save
+    report = report.assign(saving=(report['bytes'] - report['suggested_bytes']).where(report['suggestion'] != '', 0))
+    summary = report.groupby('frame', sort=False).agg(rows=('rows', 'max'), bytes=('bytes', 'sum'),
+                                                      flagged_columns=('suggestion', lambda s: int((s != '').sum())),
+                                                      possible_saving=('saving', 'sum'))
+    summary['MB'] = (summary['bytes'] / 1024 ** 2).round(2)
+    return summary.reset_index()
+
+
+def flagged_columns(report):
+    flagged = report[report['suggestion'] != ''].copy()
+    flagged['saving'] = flagged['bytes'] - flagged['suggested_bytes']
+    return flagged.sort_values('saving', ascending=False).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint per column of a store's datasets.")
+    parser.add_argument('store', help="Store name")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder with the {store}_*.csv exports")
+    parser.add_argument('--no-derived', action='store_true', help="Only the loaded datasets")
+    args = parser.parse_args()
+
+    report = memory_report(load_store(args.store, args.data_dir), include_derived=not args.no_derived)
+    summary = memory_summary(report)
+    print(summary.to_string(index=False))
+    print(f"\nTotal: {summary['bytes'].sum() / 1024 ** 2:.2f} MB")
+    flagged = flagged_columns(report)
+    if not flagged.empty:
+        print("\nObject columns worth converting:")
+        print(flagged[['frame', 'column', 'rows', 'unique', 'bytes', 'suggestion', 'suggested_bytes']]
+              .to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
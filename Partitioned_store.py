@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from Perf_trace import section
+from Store_data import BASE_DIR, DATA_DIR, DATASETS, dataset_path, get_store_names, read_dataset_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, the stores are then always read from the CSV exports
+    pa = pq = None
+PARTITIONING = pq is not None
+
+# store=<store>/dataset=<dataset>/month=<YYYY-MM>/part-<n>.parquet, plus a manifest.json per dataset
+PARTITION_DIR = os.path.join(BASE_DIR, "cache", "partitions")
+# Dataset -> the date column its rows are split into months on
+PARTITIONED_DATASETS = {'CJ': 'Event_Time', 'Orders_Dataset': 'Order_Created_At',
+                        'AbandonedCheckouts': 'Order_Created_At'}
+# Partition of the rows without a (parsable) date, only read when no date range is given
+UNDATED = 'none'
+CHUNK_ROWS = 200_000
+# Sessions asking for the same missing partitions wait on one writer
+_write_lock = threading.Lock()
+
+
+def partition_path(store, dataset, partition_dir=PARTITION_DIR):
+    return os.path.join(partition_dir, f"store={store}", f"dataset={dataset}")
+
+
+def source_stat(store, dataset, data_dir=DATA_DIR):
+    stat = os.stat(dataset_path(store, dataset, data_dir))
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_manifest(store, dataset, partition_dir=PARTITION_DIR):
+    try:
+        with open(os.path.join(partition_path(store, dataset, partition_dir), "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def partitions_fresh(store, dataset, data_dir=DATA_DIR, partition_dir=PARTITION_DIR):
+    manifest = read_manifest(store, dataset, partition_dir)
+    try:
+        return manifest is not None and manifest['source'] == source_stat(store, dataset, data_dir)
+    except OSError:
+        return False
+
+
+def _write_parquet(df, path):
+    # The index (the row number in the export) is kept, reads put the rows of several months back in file order
+    try:
+        df.to_parquet(path, index=True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # A text column with some numbers in it: stored as text, like the CSV it came from
+        mixed = [col for col in df.columns if df[col].dtype == 'object']
+        df.assign(**{col: df[col].where(df[col].isna(), df[col].astype(str)) for col in mixed}).to_parquet(
+            path, index=True)
+
+
+def write_partitions(store, dataset, data_dir=DATA_DIR, partition_dir=PARTITION_DIR, chunk_rows=CHUNK_ROWS):
+    # Splits the export into one folder per month of its date column, read and written chunk by chunk. Written
+    # next to the current partitions and swapped in at the end, so readers never see a half written dataset.
+    date_column = PARTITIONED_DATASETS[dataset]
+    path = partition_path(store, dataset, partition_dir)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    stat = source_stat(store, dataset, data_dir)
+    months = {}
+    with section(f"write_partitions:{store}:{dataset}", kind='load'):
+        chunks = read_dataset_chunks(dataset_path(store, dataset, data_dir), DATASETS[dataset][1], chunk_rows)
+        for i, chunk in enumerate(chunks):
+            dates = chunk[date_column]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates, errors='coerce', utc=True)
+            keys = dates.dt.strftime('%Y-%m').fillna(UNDATED)
+            for month, part in chunk.groupby(keys, sort=False):
+                month_dir = os.path.join(tmp_path, f"month={month}")
+                os.makedirs(month_dir, exist_ok=True)
+                _write_parquet(part, os.path.join(month_dir, f"part-{i:05d}.parquet"))
+                entry = months.setdefault(month, {'rows': 0, 'min': None, 'max': None})
+                entry['rows'] += len(part)
+                if month != UNDATED:
+                    part_dates = dates[part.index]
+                    entry['min'] = min(filter(None, [entry['min'], part_dates.min().isoformat()]))
+                    entry['max'] = max(filter(None, [entry['max'], part_dates.max().isoformat()]))
+    manifest = {'store': store, 'dataset': dataset, 'date_column': date_column, 'source': stat,
+                'months': dict(sorted(months.items()))}
+    os.makedirs(tmp_path, exist_ok=True)
+    with open(os.path.join(tmp_path, "manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def ensure_partitions(store, dataset, data_dir=DATA_DIR, partition_dir=PARTITION_DIR):
+    # The manifest of the dataset's partitions, (re)written when the export changed since
+    with _write_lock:
+        if partitions_fresh(store, dataset, data_dir, partition_dir):
+            return read_manifest(store, dataset, partition_dir)
+        return write_partitions(store, dataset, data_dir, partition_dir)
+
+
+def months_in_range(manifest, start=None, end=None):
+    # Partitions that can hold rows between start and end (UTC timestamps, either may be None)
+    if start is None and end is None:
+        return list(manifest['months'])
+    first = start.strftime('%Y-%m') if start is not None else None
+    last = end.strftime('%Y-%m') if end is not None else None
+    return [month for month in manifest['months'] if month != UNDATED
+            and (first is None or month >= first) and (last is None or month <= last)]
+
+
+def date_bounds(manifest):
+    # (first, last) date column value of the dataset, None when no row has a date
+    dated = [entry for month, entry in manifest['months'].items() if month != UNDATED]
+    if not dated:
+        return None
+    return pd.Timestamp(min(entry['min'] for entry in dated)), pd.Timestamp(max(entry['max'] for entry in dated))
+
+
+def read_partitions(store, dataset, start=None, end=None, partition_dir=PARTITION_DIR, columns=None, arrow=False):
+    # Rows of the dataset between start and end, only the parquet files of the months in that range are opened.
+    # Text columns come back as object, or as Arrow strings with arrow=True (as Store_data.read_arrow_csv).
+    manifest = read_manifest(store, dataset, partition_dir)
+    if manifest is None:
+        return None
+    path = partition_path(store, dataset, partition_dir)
+    files = []
+    for month in months_in_range(manifest, start, end):
+        month_dir = os.path.join(path, f"month={month}")
+        files += [os.path.join(month_dir, file) for file in sorted(os.listdir(month_dir))]
+    types_mapper = {pa.string(): pd.StringDtype('pyarrow'),
+                    pa.large_string(): pd.StringDtype('pyarrow')}.get if arrow else None
+    with section(f"read_partitions:{store}:{dataset}", kind='load') as record:
+        frames = [pq.read_table(file, columns=columns, use_pandas_metadata=True).to_pandas(types_mapper=types_mapper) for file in files]
+        df = pd.concat(frames).sort_index().reset_index(drop=True) if frames else pd.DataFrame()
+        if frames and (start is not None or end is not None):
+            dates = df[manifest['date_column']]
+            keep = pd.Series(True, index=df.index)
+            if start is not None:
+                keep &= dates >= start
+            if end is not None:
+                keep &= dates <= end
+            df = df[keep].reset_index(drop=True)
+        if record is not None:
+            record['files'] = len(files)
+            record['rows_out'] = len(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the month partitions of the CJ, Orders and Abandoned "
+                                                 "checkouts exports.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder with the {store}_*.csv exports")
+    parser.add_argument('--partition-dir', default=PARTITION_DIR, help="Folder the partitions are written to")
+    parser.add_argument('--store', action='append', dest='stores', help="Only partition this store (repeatable)")
+    parser.add_argument('--force', action='store_true', help="Rewrite partitions that are up to date")
+    args = parser.parse_args()
+
+    if not PARTITIONING:
+        parser.error("pyarrow is not installed")
+    for store in sorted(args.stores or get_store_names(args.data_dir)):
+        for dataset in PARTITIONED_DATASETS:
+            if not os.path.exists(dataset_path(store, dataset, args.data_dir)):
+                continue
+            start = time.perf_counter()
+            if args.force or not partitions_fresh(store, dataset, args.data_dir, args.partition_dir):
+                manifest, status = write_partitions(store, dataset, args.data_dir, args.partition_dir), 'written'
+            else:
+                manifest, status = read_manifest(store, dataset, args.partition_dir), 'fresh'
+            rows = sum(entry['rows'] for entry in manifest['months'].values())
+            print(f"{store} {dataset}: {status}, {len(manifest['months'])} months, {rows} rows "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
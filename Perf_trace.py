@@ -0,0 +1,141 @@
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+# Timings of the current script run, kept per thread (Streamlit runs every session in its own thread).
+# Nothing is recorded until start_run() is called, so headless callers pay only a getattr per section.
+_local = threading.local()
+
+
+def frame_stats(*values):
+    # (rows, bytes) of the DataFrames / Series among values; shallow memory so it stays cheap on big frames
+    rows, size = None, 0
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            rows = (rows or 0) + len(value)
+            size += int(value.memory_usage(index=True).sum() if isinstance(value, pd.DataFrame)
+                        else value.memory_usage(index=True))
+    return rows, size
+
+
+def start_run():
+    _local.records = []
+    _local.lap = None
+    return _local.records
+
+
+def stop_run():
+    close_lap()
+    records = run_records()
+    _local.records = None
+    return records
+
+
+def run_records():
+    return getattr(_local, 'records', None) or []
+
+
+@contextmanager
+def section(name, *inputs, kind='compute'):
+    # Times the block; yields the record (None when tracing is off) so callers can add the output
+    records = getattr(_local, 'records', None)
+    if records is None:
+        yield None
+        return
+    rows_in, bytes_in = frame_stats(*inputs)
+    record = {'section': name, 'kind': kind, 'seconds': 0.0, 'rows_in': rows_in, 'rows_out': None,
+              'bytes': bytes_in}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - start
+        records.append(record)
+
+
+def record_output(record, *outputs):
+    if record is not None:
+        # Aggregates returning (top, least) style tuples count both frames
+        rows_out, bytes_out = frame_stats(*[value for output in outputs
+                                            for value in (output if isinstance(output, tuple) else (output,))])
+        record['rows_out'] = rows_out
+        record['bytes'] += bytes_out
+    return outputs[0] if len(outputs) == 1 else outputs
+
+
+def traced(name=None, kind='compute'):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name or func.__name__, *args, kind=kind) as record:
+                return record_output(record, func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def lap(name):
+    # Closes the running lap and starts the next one; used to time page sections without re-indenting them
+    records = getattr(_local, 'records', None)
+    if records is None:
+        return
+    close_lap()
+    _local.lap = {'section': name, 'kind': 'section', 'seconds': 0.0, 'rows_in': None, 'rows_out': None,
+                  'bytes': 0, 'start': time.perf_counter()}
+
+
+def close_lap():
+    open_lap = getattr(_local, 'lap', None)
+    if open_lap is not None:
+        open_lap['seconds'] = time.perf_counter() - open_lap.pop('start')
+        run_records().append(open_lap)
+        _local.lap = None
+
+
+def slowest(records, limit=15):
+    df = pd.DataFrame(records, columns=['section', 'kind', 'seconds', 'rows_in', 'rows_out', 'bytes'])
+    return df.sort_values('seconds', ascending=False).head(limit).reset_index(drop=True)
+
+
+def hotspots(stats, limit=30):
+    # Flat top-N table of a pstats.Stats, most own time first
+    rows = []
+    for (filename, line, function), (_, calls, own_time, cumulative_time, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({function})", 'calls': calls,
+                     'tottime': round(own_time, 6), 'cumtime': round(cumulative_time, 6)})
+    df = pd.DataFrame(rows, columns=['function', 'calls', 'tottime', 'cumtime'])
+    return df.sort_values('tottime', ascending=False).head(limit).reset_index(drop=True)
+
+
+def profile_call(func, out_dir, label, limit=30, keep=None):
+    # Runs func under cProfile; writes <timestamp>-<label>.pstats plus a .csv of the hotspots to out_dir,
+    # removing the oldest profiles past the last keep
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+    os.makedirs(out_dir, exist_ok=True)
+    base_name = f"{datetime.now():%Y%m%d-%H%M%S}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', label)}"
+    pstats_path = os.path.join(out_dir, base_name + ".pstats")
+    profiler.dump_stats(pstats_path)
+    hotspot_table = hotspots(pstats.Stats(profiler), limit)
+    hotspot_table.to_csv(os.path.join(out_dir, base_name + ".csv"), index=False)
+    if keep is not None:
+        profiles = sorted((os.path.join(out_dir, file) for file in os.listdir(out_dir) if file.endswith(".pstats")),
+                          key=os.path.getmtime)
+        for old_path in profiles[:-keep]:
+            for path in (old_path, old_path[:-len(".pstats")] + ".csv"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    return pstats_path, hotspot_table
@@ -0,0 +1,109 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from Chunked_aggregates import stream_cj_aggregates
+from Store_data import BASE_DIR, DATA_DIR, dataset_path, get_store_names, load_store, store_fingerprint
+from Store_metrics import compute_store_aggregates
+
+CACHE_DIR = os.path.join(BASE_DIR, "cache", "aggregates")
+# The modules computing the aggregates; cache files written by another version of them are computed again
+AGGREGATE_MODULES = ['Store_metrics.py', 'Chunked_aggregates.py', 'Quantile_sketch.py', 'Precompute_aggregates.py']
+
+
+def code_version(base_dir=BASE_DIR):
+    digest = hashlib.sha1()
+    for name in AGGREGATE_MODULES:
+        with open(os.path.join(base_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+AGGREGATES_VERSION = code_version()
+
+
+def cache_path(store, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{store}.pkl")
+
+
+def write_cached_aggregates(store, fingerprint, aggregates, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    payload = {'store': store, 'fingerprint': fingerprint, 'version': AGGREGATES_VERSION,
+               'created_at': datetime.now().isoformat(), 'aggregates': aggregates}
+    # Write to a temp file first so the dashboard never reads a half written cache
+    tmp_path = cache_path(store, cache_dir) + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path(store, cache_dir))
+
+
+def read_cached_aggregates(store, fingerprint, cache_dir=CACHE_DIR):
+    # Returns None when there is no cache, or the store files or the aggregation code changed after it was written
+    try:
+        with open(cache_path(store, cache_dir), 'rb') as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if payload.get('fingerprint') != fingerprint or payload.get('version') != AGGREGATES_VERSION:
+        return None
+    return payload['aggregates']
+
+
+def precompute_store(store, data_dir=DATA_DIR, cache_dir=CACHE_DIR, force=False, cj_chunk_rows=None):
+    # (store, 'fresh' / 'written' / 'failed: <error>', seconds); a store failing does not stop the others
+    start = time.perf_counter()
+    try:
+        fingerprint = store_fingerprint(store, data_dir)
+        if not force and read_cached_aggregates(store, fingerprint, cache_dir) is not None:
+            return store, 'fresh', time.perf_counter() - start
+        if cj_chunk_rows:
+            # The CJ export is folded chunk by chunk instead of being loaded whole
+            aggregates = compute_store_aggregates(load_store(store, data_dir, skip=('CJ',)))
+            cj_path = dataset_path(store, 'CJ', data_dir)
+            if os.path.exists(cj_path):
+                aggregates['Customer Journey'] = stream_cj_aggregates(cj_path, cj_chunk_rows)[0]
+        else:
+            aggregates = compute_store_aggregates(load_store(store, data_dir))
+        write_cached_aggregates(store, fingerprint, aggregates, cache_dir)
+    except Exception as error:
+        return store, f"failed: {type(error).__name__}: {error}", time.perf_counter() - start
+    return store, 'written', time.perf_counter() - start
+
+
+def _precompute_store_args(args):
+    return precompute_store(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute dashboard page aggregates for every store.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder with the {store}_*.csv exports")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Folder the aggregate cache files are written to")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="Worker processes in the pool")
+    parser.add_argument('--store', action='append', dest='stores', help="Only precompute this store (repeatable)")
+    parser.add_argument('--force', action='store_true', help="Recompute even when the cache is up to date")
+    parser.add_argument('--cj-chunk-rows', type=int, help="Read the CJ exports this many rows at a time "
+                                                          "(for files larger than the memory of a worker)")
+    args = parser.parse_args()
+
+    stores = sorted(args.stores or get_store_names(args.data_dir))
+    jobs = [(store, args.data_dir, args.cache_dir, args.force, args.cj_chunk_rows) for store in stores]
+    start = time.perf_counter()
+    failed = []
+    with Pool(processes=max(1, min(args.processes, len(jobs) or 1))) as pool:
+        for store, status, seconds in pool.imap_unordered(_precompute_store_args, jobs):
+            print(f"{store}: {status} in {seconds:.2f}s")
+            if status.startswith('failed'):
+                failed.append(store)
+    print(f"Precomputed {len(stores) - len(failed)} stores in {time.perf_counter() - start:.2f}s -> {args.cache_dir}")
+    if failed:
+        print(f"Failed: {', '.join(sorted(failed))}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
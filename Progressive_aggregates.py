@@ -0,0 +1,52 @@
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from Store_data import snapshot
+
+# One pool per worker count, shared by every session of the server
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def executor(workers):
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aggregates")
+        return _executors[workers]
+
+
+class StreamingAggregates(Mapping):
+    # The page aggregates as they become ready: reading a key waits for (or computes) only that aggregate,
+    # so a page draws every section above it while the rest are still being computed.
+    # With workers the tasks are submitted to the pool in their listed order, without they run on first read.
+    def __init__(self, tasks, workers=0):
+        self.tasks = tasks
+        self.futures = {}
+        self.lock = threading.Lock()
+        if workers:
+            pool = executor(workers)
+            for key, task in tasks.items():
+                self.futures[key] = pool.submit(task)
+
+    def __getitem__(self, key):
+        task = self.tasks[key]
+        with self.lock:
+            future = self.futures.get(key)
+            run_here = future is None
+            if run_here:
+                future = self.futures[key] = Future()
+        if run_here:
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(task())
+            except Exception as exc:
+                future.set_exception(exc)
+        # The pages change some of the frames they get, with copy-on-write a snapshot keeps that off the shared one
+        return snapshot(future.result())
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __len__(self):
+        return len(self.tasks)
@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Todo- Mergeable quantile sketch (log-bucketed, relative error guarantee)-------------------------
+class QuantileSketch:
+    """Log-bucketed quantile sketch; sketches with the same accuracy merge by adding bucket counts."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = {}
+        # Buckets of the magnitudes of negative values, kept apart so they sort below zero
+        self.negative_counts = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def bucket_indices(self, values):
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    def add_many(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype=float)
+        if values.size == 0:
+            return self
+        # Anything within a millisecond of zero goes to the zero bucket
+        positive, negative = values[values > 1e-3], -values[values < -1e-3]
+        self.zero_count += int(values.size - positive.size - negative.size)
+        if positive.size:
+            keys, key_counts = np.unique(self.bucket_indices(positive), return_counts=True)
+            self.add_bucket_counts(keys, key_counts)
+        if negative.size:
+            keys, key_counts = np.unique(self.bucket_indices(negative), return_counts=True)
+            self.add_bucket_counts(keys, key_counts, self.negative_counts)
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def add_bucket_counts(self, keys, key_counts, counts=None):
+        counts = self.counts if counts is None else counts
+        for key, key_count in zip(keys.tolist(), key_counts.tolist()):
+            counts[key] = counts.get(key, 0) + key_count
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, key_count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + key_count
+        for key, key_count in other.negative_counts.items():
+            self.negative_counts[key] = self.negative_counts.get(key, 0) + key_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        # The extremes are kept exactly
+        if rank <= 0:
+            return self.min
+        if rank >= self.count - 1:
+            return self.max
+        seen = 0
+        # Largest magnitudes first: the most negative values
+        for key in sorted(self.negative_counts, reverse=True):
+            seen += self.negative_counts[key]
+            if seen > rank:
+                return min(max(-self.bucket_value(key), self.min), self.max)
+        seen += self.zero_count
+        if seen > rank:
+            return min(max(0.0, self.min), self.max)
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                return min(max(self.bucket_value(key), self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs=(0.5, 0.9, 0.99)):
+        return {q: self.quantile(q) for q in qs}
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def histogram(self, max_bins=30):
+        # Adjacent log buckets are combined so that the chart never has more than max_bins bars
+        rows = []
+        keys = sorted(self.counts)
+        negative_keys = sorted(self.negative_counts, reverse=True)
+        group_size = max(1, math.ceil((len(keys) + len(negative_keys)) / max_bins))
+        for start in range(0, len(negative_keys), group_size):
+            group = negative_keys[start:start + group_size]
+            rows.append((-self.gamma ** group[0], -self.gamma ** (group[-1] - 1),
+                         sum(self.negative_counts[key] for key in group)))
+        if self.zero_count:
+            rows.append((0.0, 0.0, self.zero_count))
+        for start in range(0, len(keys), group_size):
+            group = keys[start:start + group_size]
+            rows.append((self.gamma ** (group[0] - 1), self.gamma ** group[-1],
+                         sum(self.counts[key] for key in group)))
+        return pd.DataFrame(rows, columns=['Lower', 'Upper', 'Count'])
+
+
+def merge_sketches(sketches, relative_accuracy=0.01):
+    merged = QuantileSketch(relative_accuracy)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def daily_sketches(df, date_column, value_column, by=None, relative_accuracy=0.01):
+    # One sketch per day (or per (day, by) pair) built from a single vectorized bucket pass
+    columns = [date_column, value_column] + ([by] if by else [])
+    data = df[columns].copy()
+    data[value_column] = pd.to_numeric(data[value_column], errors='coerce')
+    data = data.dropna(subset=[date_column, value_column])
+    if data.empty:
+        return {}
+    data['day'] = pd.to_datetime(data[date_column], errors='coerce', utc=True).dt.date
+    data = data.dropna(subset=['day'])
+    group_keys = ['day'] + ([by] if by else [])
+
+    template = QuantileSketch(relative_accuracy)
+    values = data[value_column].to_numpy(dtype=float)
+    data['bucket'] = -1
+    nonzero = np.abs(values) > 1e-3
+    data.loc[nonzero, 'bucket'] = template.bucket_indices(np.abs(values[nonzero]))
+    data['is_zero'] = ~nonzero
+    data['negative'] = values < 0
+
+    sketches = {}
+    stats = data.groupby(group_keys, observed=True)[value_column].agg(['count', 'sum', 'min', 'max'])
+    zero_counts = data.groupby(group_keys, observed=True)['is_zero'].sum()
+    bucket_counts = data[nonzero].groupby(group_keys + ['negative', 'bucket'], observed=True).size()
+    for key, row in stats.iterrows():
+        sketch = QuantileSketch(relative_accuracy)
+        sketch.count = int(row['count'])
+        sketch.total = float(row['sum'])
+        sketch.min = float(row['min'])
+        sketch.max = float(row['max'])
+        sketch.zero_count = int(zero_counts.loc[key])
+        sketches[key] = sketch
+    for (*key, negative, bucket), bucket_count in bucket_counts.items():
+        sketch = sketches[key[0] if not by else tuple(key)]
+        (sketch.negative_counts if negative else sketch.counts)[bucket] = int(bucket_count)
+    return sketches
+
+
+def sketches_in_range(sketches, start_date, end_date, by_value=None):
+    selected = []
+    for key, sketch in sketches.items():
+        day, group = (key, None) if not isinstance(key, tuple) else key
+        if start_date <= day <= end_date and (by_value is None or group == by_value):
+            selected.append(sketch)
+    return selected
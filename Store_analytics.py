@@ -0,0 +1,108 @@
+from datetime import datetime
+from functools import lru_cache
+
+import Store_metrics as metrics
+from Store_data import DATA_DIR, load_store, snapshot, store_fingerprint
+
+# Headless, store-keyed metrics API (no Streamlit), e.g.
+#   orders_per_period('dyori', 'month'), cj_sankey('dyori'), bounce_rate_by_event('dyori')
+FREQUENCIES = ('day', 'month', 'quarter', 'year')
+
+
+@lru_cache(maxsize=8)
+def _load_store(store, data_dir, fingerprint):
+    return load_store(store, data_dir)
+
+
+def store_frames(store, data_dir=DATA_DIR):
+    # Frames are shared between calls (reloaded when a file of the store changes), callers get snapshots of them
+    return snapshot(_load_store(store, data_dir, store_fingerprint(store, data_dir)))
+
+
+def store_frame(store, dataset, data_dir=DATA_DIR):
+    df = store_frames(store, data_dir)[dataset]
+    if not metrics.available(df):
+        raise ValueError(f"No {dataset} data for store {store}")
+    return df
+
+
+def _per_period(per_day, value_column, freq, end_date):
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {FREQUENCIES}, got {freq!r}")
+    per_day, per_month, per_quarter, per_year = metrics.fill_daily_counts(
+        per_day, value_column, end_date or datetime.today().date())
+    return {'day': per_day, 'month': per_month, 'quarter': per_quarter, 'year': per_year}[freq]
+
+
+# Todo- Pages---------------------------------------------------------------
+def page_aggregates(store, page, data_dir=DATA_DIR):
+    return metrics.compute_page_aggregates(page, store_frames(store, data_dir))
+
+
+def store_aggregates(store, data_dir=DATA_DIR):
+    return metrics.compute_store_aggregates(store_frames(store, data_dir))
+
+
+# Todo- Customer Journey----------------------------------------------------
+def cj_sankey(store, data_dir=DATA_DIR):
+    return metrics.cj_sankey_transitions(store_frame(store, 'CJ', data_dir))
+
+
+def cj_kpis(store, data_dir=DATA_DIR):
+    return metrics.cj_kpis(store_frame(store, 'CJ', data_dir))
+
+
+def sessions_per_period(store, freq='day', end_date=None, data_dir=DATA_DIR):
+    per_day = metrics.sessions_per_day(store_frame(store, 'CJ', data_dir))
+    return _per_period(per_day, 'session', freq, end_date)
+
+
+def bounce_rate_by_event(store, seconds=10, data_dir=DATA_DIR):
+    return metrics.bounce_rate_by_event(store_frame(store, 'CJ', data_dir), seconds)
+
+
+def time_per_event(store, data_dir=DATA_DIR):
+    return metrics.time_per_event(store_frame(store, 'CJ', data_dir))
+
+
+# Todo- Customers-----------------------------------------------------------
+def customer_kpis(store, data_dir=DATA_DIR):
+    frames = store_frames(store, data_dir)
+    return metrics.customer_kpis(frames['Customers_Dataset'], frames['Orders_Dataset'])
+
+
+# Todo- Orders / Abandoned checkouts-----------------------------------------
+def order_kpis(store, data_dir=DATA_DIR):
+    return metrics.order_kpis(store_frame(store, 'Orders_Dataset', data_dir))
+
+
+def orders_per_period(store, freq='day', end_date=None, data_dir=DATA_DIR):
+    per_day = metrics.orders_per_day(store_frame(store, 'Orders_Dataset', data_dir))
+    return _per_period(per_day, 'order_count', freq, end_date)
+
+
+def abandoned_per_period(store, freq='day', end_date=None, data_dir=DATA_DIR):
+    per_day = metrics.orders_per_day(store_frame(store, 'AbandonedCheckouts', data_dir))
+    return _per_period(per_day, 'order_count', freq, end_date)
+
+
+# Todo- Products------------------------------------------------------------
+def product_kpis(store, data_dir=DATA_DIR):
+    frames = store_frames(store, data_dir)
+    return metrics.product_kpis(frames['Orders_Dataset'], frames['Products_Dataset'])
+
+
+def unsold_products(store, data_dir=DATA_DIR):
+    return metrics.unsold_products(store_frame(store, 'Orders_Dataset', data_dir),
+                                   store_frame(store, 'Products_Dataset', data_dir))
+
+
+# Todo- Revenue-------------------------------------------------------------
+def revenue_kpis(store, data_dir=DATA_DIR):
+    return metrics.revenue_kpis(store_frame(store, 'Orders_Dataset', data_dir))
+
+
+def revenue_per_period(store, freq='day', data_dir=DATA_DIR):
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {FREQUENCIES}, got {freq!r}")
+    return metrics.revenue_per_period(store_frame(store, 'Orders_Dataset', data_dir))[freq]
@@ -0,0 +1,141 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional, only the Arrow ingestion path needs it
+    pa = pa_csv = None
+ARROW_INGESTION = pa is not None
+
+# Frames loaded here are shared read-only snapshots: with copy-on-write, a frame derived from one (a filter, a
+# column selection, a shallow copy) never writes through to it and only copies data when it is written to
+pd.set_option('mode.copy_on_write', True)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# Dataset name -> (file name pattern, encoding)
+DATASETS = {
+    'AbandonedCheckouts': ("{store}_AbandonedCheckouts.csv", 'utf-8'),
+    'CJ': ("{store}_CJ.csv", 'utf-8'),
+    'Customers_Dataset': ("{store}_Customers_Dataset.csv", 'utf-8'),
+    'Orders_Dataset': ("{store}_Orders_Dataset.csv", 'utf-8'),
+    'Products_Dataset': ("{store}_Products_Dataset.csv", 'latin1'),
+}
+
+DATE_COLUMNS = ['Order_Created_At', 'Order_Updated_At', 'Event_Time', 'Customer_Created_At', 'Customer_Updated_At',
+                'Variant_Created_At', 'Product_Created_At']
+
+
+def get_store_names(data_dir):
+    files = os.listdir(data_dir)
+    store_names = set()  # Using set to avoid duplicates
+    for file in files:
+        store_name = file.split('_')[0]
+        store_names.add(store_name)
+    return list(store_names)
+
+
+def dataset_path(store, dataset, data_dir=DATA_DIR):
+    return os.path.join(data_dir, DATASETS[dataset][0].format(store=store))
+
+
+def read_dataset(file_path, encoding='utf-8', parse_dates=True, arrow=False):
+    # Raises UnicodeDecodeError so that callers decide how to report it
+    df = read_arrow_csv(file_path, encoding, parse_dates) if arrow and ARROW_INGESTION else None
+    if df is None:
+        df = pd.read_csv(file_path, encoding=encoding, parse_dates=False)
+    return parse_date_columns(df) if parse_dates else df
+
+
+def parse_date_columns(df):
+    for col in df.columns:
+        if col in DATE_COLUMNS and (df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col])):
+            df[col] = pd.to_datetime(df[col], errors='coerce', utc=True)
+    return df
+
+
+def read_dataset_chunks(file_path, encoding='utf-8', chunk_rows=100_000, columns=None):
+    # The file as frames of at most chunk_rows rows (dates parsed), only `columns` of it when given
+    usecols = None if columns is None else lambda column: column in columns
+    with pd.read_csv(file_path, encoding=encoding, chunksize=chunk_rows, usecols=usecols) as reader:
+        for chunk in reader:
+            yield parse_date_columns(chunk)
+
+
+def read_arrow_csv(file_path, encoding='utf-8', parse_dates=True):
+    # The pyarrow CSV reader (multi-threaded) with text kept as Arrow strings (string[pyarrow]) instead of Python
+    # objects, so Streamlit sends them to the browser without converting them again. Numbers get the dtypes of the
+    # default reader and only DATE_COLUMNS become timestamps (ns, UTC), other columns pyarrow would read as
+    # timestamps keep their text. None when pyarrow cannot parse the file, the caller then reads it the default way.
+    read_options = pa_csv.ReadOptions(encoding=encoding)
+    try:
+        with pa_csv.open_csv(file_path, read_options=read_options) as reader:
+            inferred = reader.schema  # from the first block only
+        as_text = {field.name: pa.string() for field in inferred
+                   if pa.types.is_timestamp(field.type) and not (parse_dates and field.name in DATE_COLUMNS)}
+        table = pa_csv.read_csv(file_path, read_options=read_options,
+                                convert_options=pa_csv.ConvertOptions(column_types=as_text, strings_can_be_null=True))
+    except UnicodeDecodeError:
+        raise
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):  # empty columns, NaN like the default reader
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        elif pa.types.is_timestamp(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.timestamp('ns', tz=field.type.tz or 'UTC')))
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype('pyarrow'),
+                                         pa.large_string(): pd.StringDtype('pyarrow')}.get)
+
+
+def load_store(store, data_dir=DATA_DIR, arrow=False, skip=()):
+    frames = {dataset: None for dataset in skip}
+    for dataset, (_, encoding) in DATASETS.items():
+        if dataset in skip:
+            continue
+        try:
+            df = read_dataset(dataset_path(store, dataset, data_dir), encoding=encoding, arrow=arrow)
+            frames[dataset] = None if df.empty else df
+        except Exception:
+            frames[dataset] = None
+    return frames
+
+
+def snapshot(value):
+    # A page's own view of a shared frame (or of a dict/tuple/list of them), O(columns) instead of a deep copy
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(snapshot(item) for item in value)
+    return value
+
+
+def store_fingerprint(store, data_dir=DATA_DIR):
+    # (dataset, size, mtime) for every file of the store; changes whenever an export is rewritten
+    fingerprint = []
+    for dataset in DATASETS:
+        try:
+            stat = os.stat(dataset_path(store, dataset, data_dir))
+            fingerprint.append((dataset, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            fingerprint.append((dataset, None, None))
+    return tuple(fingerprint)
+
+
+def write_csv_chunks(df, path, chunk_rows=100_000, order=None):
+    # Written chunk by chunk to a temp file so a big export never holds the whole CSV text in memory; rows in
+    # the order of the positions in `order` when given (without a sorted copy of df)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows] if order is None else df.iloc[order[start:start + chunk_rows]]
+            chunk.to_csv(f, header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,742 @@
+import threading
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import Store_data  # noqa: F401  turns on copy-on-write, the functions below add columns to frames they select
+from Perf_trace import record_output, section
+from Quantile_sketch import daily_sketches
+
+WEEK_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+JOURNEY_EVENTS = ['Home', 'Collection', 'Search', 'Product', 'Cart', 'Cart Add', 'Cart Remove', 'Cart Update']
+PAGE_EVENTS = ['Cart', 'Home', 'Product', 'Collection']
+# Categories kept by the bar charts without a Top N slider, the rest are summed into one "Other" bar
+CATEGORY_TOP_K = {'Customer_Province': 25, 'Customer_Country': 25}
+
+
+def available(df):
+    return df is not None and not df.empty
+
+
+def top_k_with_other(df, category_column, value_column, k):
+    # The k largest categories, largest first, plus one "Other (n more)" row summing the long tail
+    ranked = df.sort_values(value_column, ascending=False, kind='stable').reset_index(drop=True)
+    if len(ranked) <= k:
+        return ranked
+    other = pd.DataFrame({category_column: [f"Other ({len(ranked) - k} more)"],
+                          value_column: [ranked[value_column].iloc[k:].sum()]})
+    return pd.concat([ranked[[category_column, value_column]].head(k), other], ignore_index=True)
+
+
+def filter_date_range(df, date_column, start_date, end_date):
+    dates = df[date_column]
+    return df[(dates >= start_date) & (dates <= end_date)]
+
+
+def sort_order(df, sort_column, ascending=True):
+    # Positions of df's rows ordered by sort_column, missing values last
+    return df[sort_column].reset_index(drop=True).sort_values(ascending=ascending, kind='stable',
+                                                              na_position='last').index
+
+
+def table_page(df, page, page_size, sort_column=None, ascending=True):
+    # Rows of one (1-based) page of df ordered by sort_column; only that page's rows are copied
+    start = (page - 1) * page_size
+    if sort_column is None:
+        return df.iloc[start:start + page_size]
+    return df.iloc[sort_order(df, sort_column, ascending)[start:start + page_size]]
+
+
+# Todo- Shared time buckets (weekday/weekend, days of week, hours of day)---------------------------
+def weekday_weekend_counts(timestamps, values=None):
+    # NaT timestamps fall into "Weekday", the same as the original per-page lambdas
+    is_weekend = timestamps.dt.dayofweek >= 5
+    if values is None:
+        counts = [int((~is_weekend).sum()), int(is_weekend.sum())]
+    else:
+        counts = [values[~is_weekend].sum(), values[is_weekend].sum()]
+    total = sum(counts)
+    return pd.DataFrame({
+        'Category': ['Weekday', 'Weekend'],
+        'Count': counts,
+        'Percentage': [(count / total) * 100 if total > 0 else 0 for count in counts]
+    })
+
+
+def day_of_week_counts(timestamps, values=None):
+    days = timestamps.dt.dayofweek.map(dict(enumerate(WEEK_DAYS)))
+    if values is None:
+        day_count = days.value_counts()
+    else:
+        day_count = values.groupby(days).sum()
+    return day_count.reindex(WEEK_DAYS, fill_value=0)
+
+
+def hour_of_day_counts(timestamps, values=None):
+    hours = timestamps.dt.hour + 1  # Shift hours to 1-24 range
+    if values is None:
+        hour_count = hours.value_counts().sort_index()
+    else:
+        hour_count = values.groupby(hours).sum()
+    return hour_count.reindex(range(1, 25), fill_value=0)
+
+
+def first_order_times(df):
+    df_ = df.groupby('Order_ID').agg({'Order_Created_At': 'first'}).reset_index()
+    df_['Order_Created_At'] = pd.to_datetime(df_['Order_Created_At'], errors='coerce', utc=True)
+    return df_
+
+
+def unique_orders(df_orders):
+    df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
+    df_unique_orders['Order_Created_At'] = pd.to_datetime(df_unique_orders['Order_Created_At'], errors='coerce',
+                                                          utc=True)
+    return df_unique_orders
+
+
+def orders_per_day(df):
+    df_ = first_order_times(df)
+    df_['day'] = df_['Order_Created_At'].dt.date
+    return df_.groupby('day').size().reset_index(name='order_count')
+
+
+def period_labels(dates, freq):
+    # 'YYYY-MM' (freq 'M') or 'YYYYQn' (freq 'Q') label of each date. Tz-aware dates are bucketed on their wall
+    # time: to_period would drop the zone the same way, with a warning on every call
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.to_period(freq).astype(str)
+
+
+def fill_daily_counts(per_day, value_column, end_date):
+    # Reindex a per-day count frame to every date up to end_date and add month/quarter/year columns
+    start_date = per_day['day'].min()
+    full_date_range = pd.date_range(start=start_date, end=end_date)
+    per_day = per_day.set_index('day').reindex(full_date_range, fill_value=0).reset_index()
+    per_day = per_day.rename(columns={'index': 'day'})
+    per_day['month'] = period_labels(per_day['day'], 'M')
+    per_day['quarter'] = period_labels(per_day['day'], 'Q')
+    per_day['year'] = per_day['day'].dt.year
+    per_month = per_day.groupby('month')[value_column].sum().reset_index()
+    per_month['month'] = pd.to_datetime(per_month['month'], format='%Y-%m')
+    per_month = per_month.sort_values(by='month')
+    per_quarter = per_day.groupby('quarter')[value_column].sum().reset_index()
+    per_year = per_day.groupby('year')[value_column].sum().reset_index()
+    return per_day, per_month, per_quarter, per_year
+
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from each bucket in between,
+    # the point forming the largest triangle with the previous pick and the next bucket's average
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    picked = 0
+    for bucket in range(threshold - 2):
+        start, end = int(bucket * every) + 1, int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[picked] - avg_x) * (y[start:end] - y[picked]) -
+                       (x[picked] - x[start:end]) * (avg_y - y[picked]))
+        picked = start + int(areas.argmax())
+        indices[bucket + 1] = picked
+    return indices
+
+
+def downsample_lttb(df, x_column, y_column, threshold):
+    # Rows of a time series (sorted on x_column) thinned to at most threshold points, keeping its shape
+    if len(df) <= threshold:
+        return df
+    x = df[x_column]
+    if not pd.api.types.is_numeric_dtype(x):
+        x = pd.to_datetime(x).astype('int64')
+    x = x.to_numpy(dtype=float)
+    y = np.nan_to_num(pd.to_numeric(df[y_column], errors='coerce').to_numpy(dtype=float))
+    return df.iloc[lttb_indices(x, y, threshold)]
+
+
+# Todo- Customer Data page------------------------------------------------------------------------
+def repeat_customer_summary(df_orders):
+    customer_summary = df_orders.groupby("Order_ID").agg(
+        Total_Spending=("Order_Total_Price", 'first'),
+        Customer_Name=("Customer_Name", "first")
+    ).reset_index()
+    customer_summary1 = customer_summary.groupby("Customer_Name").agg(
+        Orders_Placed=("Order_ID", "nunique"),
+        Total_Spending=("Total_Spending", 'sum'),
+    ).reset_index()
+    customer_summary1 = customer_summary1[customer_summary1['Orders_Placed'] >= 2]
+    return customer_summary1.reset_index(drop=True)
+
+
+def customer_kpis(df_customers, df_orders):
+    kpis = {'listed_customers': None, 'paying_customers': None, 'repeat_customers': None}
+    if available(df_customers):
+        kpis['listed_customers'] = df_customers['Customer_ID'].nunique()
+    if available(df_orders):
+        kpis['paying_customers'] = df_orders['Customer_ID'].nunique()
+        if 'Customer_Name' in df_orders.columns and 'Order_Total_Price' in df_orders.columns:
+            kpis['repeat_customers'] = repeat_customer_summary(df_orders).shape[0]
+    return kpis
+
+
+def customer_spend_ranking(df_orders, limit=50):
+    order_df = df_orders.drop_duplicates("Order_ID")
+    order_data = order_df.groupby('Customer_Name')['Order_Total_Price'].sum().reset_index()
+    order_data = order_data.dropna(subset=['Customer_Name'])
+    return order_data.nlargest(limit, 'Order_Total_Price'), order_data.nsmallest(limit, 'Order_Total_Price')
+
+
+def customers_by_region(df_customers, region_column):
+    region_data = df_customers.groupby(region_column)["Customer_ID"].nunique().reset_index()
+    region_data = region_data.rename(columns={"Customer_ID": "Unique_Customers"})
+    return top_k_with_other(region_data, region_column, "Unique_Customers", CATEGORY_TOP_K[region_column])
+
+
+# Todo- Customer Journey page---------------------------------------------------------------------
+def session_events(df_cj):
+    # One row per (customer IP, session) with a True column for every JOURNEY_EVENTS event it visited
+    visited = pd.DataFrame({event: df_cj['Event'] == event for event in JOURNEY_EVENTS})
+    return visited.groupby([df_cj['Customer_IP'], df_cj['session']]).max()
+
+
+def sankey_from_session_events(visited):
+    # Sessions visiting the same events (in JOURNEY_EVENTS order) follow the same path, so each distinct set of
+    # events is expanded into its links once and weighted by its number of sessions
+    masks = sum(visited[event].astype('int64') * (1 << i) for i, event in enumerate(JOURNEY_EVENTS))
+    transitions = []
+    for mask, sessions in masks[masks > 0].value_counts().items():
+        events = [event for i, event in enumerate(JOURNEY_EVENTS) if mask & (1 << i)]
+        levels = [f"{event}_{i}" for i, event in enumerate(events)]
+
+        for i in range(len(levels)):
+            if i < len(levels) - 1:
+                transitions.append((levels[i], levels[i + 1], sessions))
+
+            drop_off = f"Drop-off_{i}"
+            transitions.append((levels[i], drop_off, sessions))
+
+    transition_counts = pd.DataFrame(transitions, columns=['Source', 'Target', 'Count'])
+    return transition_counts.groupby(['Source', 'Target'])['Count'].sum().reset_index()
+
+
+def cj_sankey_transitions(df_cj):
+    return sankey_from_session_events(session_events(df_cj))
+
+
+def sankey_step(node):
+    # "Product_2" and "Drop-off_2" are both on step 2
+    return int(node.rsplit('_', 1)[1])
+
+
+def _sum_links(links):
+    return links.groupby(['Source', 'Target'], as_index=False)['Count'].sum()
+
+
+def prune_sankey(transitions, max_depth=len(JOURNEY_EVENTS), min_flow=1, max_nodes=60, max_links=200):
+    # Keeps the Sankey small enough for the browser: steps past max_depth end in one "More steps" node,
+    # links under min_flow and links into nodes outside the max_nodes busiest go to their step's "Other"
+    # node, and only the max_links largest links are kept
+    links = transitions[['Source', 'Target', 'Count']]
+    links = links[links['Source'].map(sankey_step) < max_depth]
+    if links.empty:
+        return links.reset_index(drop=True)
+    other = 'Other_' + (links['Source'].map(sankey_step) + 1).astype(str)
+    drop_off = links['Target'].str.startswith('Drop-off_')
+    deeper = ~drop_off & (links['Target'].map(sankey_step) >= max_depth)
+    links.loc[deeper, 'Target'] = f"More steps_{max_depth}"
+    links['Target'] = links['Target'].where(drop_off | (links['Count'] >= min_flow), other)
+    links = _sum_links(links)
+
+    flow = pd.concat([links.groupby('Source')['Count'].sum(), links.groupby('Target')['Count'].sum()])
+    busiest = set(flow.groupby(level=0).max().nlargest(max_nodes).index)
+    links = links[links['Source'].isin(busiest)]
+    other = 'Other_' + (links['Source'].map(sankey_step) + 1).astype(str)
+    links['Target'] = links['Target'].where(links['Target'].isin(busiest) | links['Target'].str.startswith('Other_'),
+                                            other)
+    links = _sum_links(links)
+    return links.nlargest(max_links, 'Count').sort_values(['Source', 'Target']).reset_index(drop=True)
+
+
+def ip_time_spent(df_cj):
+    # Seconds between consecutive first-visits of each event per customer IP, busiest IPs first
+    filtered_df = (
+        df_cj[['Event_Time', 'Event', 'Customer_IP']]
+        .dropna(subset=['Event', 'Customer_IP'])
+        .drop_duplicates(subset=['Customer_IP', 'Event'])  # Remove duplicate events per session
+    )
+    filtered_df = filtered_df.sort_values(by=['Customer_IP', 'Event_Time'])
+    filtered_df['Time_Spent'] = (
+        filtered_df.groupby(['Customer_IP'])['Event_Time']
+        .diff()
+        .dt.total_seconds()
+    )
+    filtered_df['Time_Spent'] = filtered_df['Time_Spent'].fillna(0)
+    ip_time_spent_total = filtered_df.groupby('Customer_IP')['Time_Spent'].sum().reset_index()
+    ip_time_spent_total = ip_time_spent_total.sort_values(by='Time_Spent', ascending=False)
+    filtered_df['Customer_IP'] = pd.Categorical(filtered_df['Customer_IP'],
+                                                categories=ip_time_spent_total['Customer_IP'], ordered=True)
+    return filtered_df.sort_values(by=['Customer_IP', 'Time_Spent'], ascending=[True, False])
+
+
+def cj_kpis(df_cj):
+    max_session_df = df_cj.loc[df_cj.groupby('Customer_IP')['session'].idxmax()]
+    return {
+        'total_viewers': df_cj['Customer_IP'].nunique(),
+        'repeat_viewers': max_session_df[max_session_df['session'] >= 2].shape[0],
+        'total_sessions': max_session_df['session'].sum(),
+    }
+
+
+def session_start_times(df_cj):
+    df_temp = df_cj[['Customer_IP', 'session', 'Event_Time']]
+    df_temp["Event_Time"] = pd.to_datetime(df_temp["Event_Time"], errors='coerce', utc=True)
+    df_temp = df_temp.dropna(subset=["Event_Time"])
+    return df_temp.groupby(["Customer_IP", "session"])["Event_Time"].first()
+
+
+def sessions_per_day(df_cj):
+    df_temp = df_cj[['Customer_IP', 'session']]
+    df_temp['day'] = pd.to_datetime(df_cj['Event_Time'], errors='coerce', utc=True).dt.date
+    df_temp['session'] = pd.to_numeric(df_temp['session'], errors='coerce')
+    session_count_per_customer = df_temp.groupby(['Customer_IP', 'day'])['session'].nunique().reset_index()
+    return session_count_per_customer.groupby('day')['session'].sum().reset_index()
+
+
+def session_duration_kpis(df_cj):
+    groupby_session = df_cj.groupby(['session', 'Customer_IP']).agg(
+        Time_On_Page=('Time_On_Page', 'sum')
+    ).reset_index()
+    kpis = {'total_duration': None, 'average_duration': None, 'average_sessions_per_customer': None}
+    if not groupby_session.empty:
+        kpis['total_duration'] = groupby_session['Time_On_Page'].sum()
+        kpis['average_duration'] = groupby_session['Time_On_Page'].mean()
+    session_count_per_customer = df_cj.groupby('Customer_IP')['session'].max().reset_index()
+    if not session_count_per_customer.empty:
+        kpis['average_sessions_per_customer'] = round(session_count_per_customer['session'].mean(), 2)
+    return kpis
+
+
+def duration_sketches(df_cj):
+    # Per-day sketches of session durations and of time on page per event
+    sessions = df_cj.groupby(['session', 'Customer_IP']).agg(
+        Time_On_Page=('Time_On_Page', 'sum'),
+        Event_Time=('Event_Time', 'min')
+    ).reset_index()
+    session_sketches = daily_sketches(sessions, 'Event_Time', 'Time_On_Page')
+    event_sketches = daily_sketches(df_cj, 'Event_Time', 'Time_On_Page', by='Event')
+    return session_sketches, event_sketches
+
+
+def top_sessions_by_time(df_cj, limit=10):
+    groupby_session = df_cj.groupby(['session', 'Customer_IP']).agg(
+        Time_On_Page=('Time_On_Page', 'sum'),
+        Event_time=('Event_Time', 'first')
+    ).reset_index()
+    groupby_session['Event_time'] = groupby_session['Event_time'].dt.date
+    return groupby_session.nlargest(limit, 'Time_On_Page').drop(columns=['session'])
+
+
+def max_sessions_per_ip(df_cj):
+    return df_cj.groupby('Customer_IP')['session'].max().reset_index()
+
+
+def unique_visitors_by(df_cj, column):
+    grouped = df_cj.groupby(column)['Customer_IP'].nunique().reset_index()
+    grouped = grouped.rename(columns={'Customer_IP': 'Unique_Visitors'})
+    return grouped.sort_values('Unique_Visitors', ascending=False)
+
+
+def cart_add_visitors(df_cj):
+    df_cart_add = df_cj[df_cj['Event'] == 'Cart Add']
+    return (
+        df_cart_add.groupby('Product_Name')['Customer_IP']
+        .nunique()
+        .reset_index()
+        .rename(columns={'Customer_IP': 'Unique_Visitors'})
+    )
+
+
+def search_term_counts(df_cj):
+    return df_cj['Search_Term'].dropna().astype(str).value_counts()
+
+
+def time_per_event(df_cj):
+    # (average, total) seconds on page for each of the main page events
+    time_on_page = pd.to_numeric(df_cj['Time_On_Page'], errors='coerce')
+    page_events = df_cj['Event'].isin(PAGE_EVENTS)
+    grouped = time_on_page[page_events].groupby(df_cj['Event'][page_events])
+    return grouped.mean().reset_index(), grouped.sum().reset_index()
+
+
+def time_spent_per_product(df_cj):
+    product_ids = df_cj['Product_ID'].fillna('Unknown').astype(str).replace(".0", "", regex=True)
+    time_on_page = pd.to_numeric(df_cj['Time_On_Page'], errors='coerce')
+    time_spent = time_on_page.groupby([product_ids, df_cj['Product_Name']]).sum().reset_index()
+    return time_spent.sort_values(by='Time_On_Page', ascending=False)
+
+
+def time_spent_per_collection(df_cj):
+    time_on_page = pd.to_numeric(df_cj['Time_On_Page'], errors='coerce')
+    time_spent = time_on_page.groupby(df_cj['Collection_Name']).sum().reset_index()
+    return time_spent.sort_values(by='Time_On_Page', ascending=False)
+
+
+def viewers_per_page(df_cj):
+    filtered_df = df_cj[df_cj['Event'].isin(PAGE_EVENTS)]
+    viewer_counts = filtered_df.groupby("Event")["Customer_IP"].nunique().reset_index()
+    viewer_counts.columns = ["Event", "Total Viewers"]
+    return viewer_counts
+
+
+def bounce_rate_under(df_cj, seconds=30):
+    time_on_page = pd.to_numeric(df_cj['Time_On_Page'], errors='coerce')
+    customer_time = time_on_page.groupby(df_cj['Customer_IP']).sum().reset_index()
+    if customer_time.empty:
+        return None
+    total_customers = customer_time['Customer_IP'].nunique()
+    customers_under = customer_time[customer_time['Time_On_Page'] < seconds]['Customer_IP'].nunique()
+    percentage = (customers_under / total_customers) * 100 if total_customers > 0 else 0
+    return round(percentage, 2)
+
+
+def last_page_events(df_cj):
+    # The last page event of every (customer IP, session)
+    filtered_df = df_cj[df_cj['Event'].isin(PAGE_EVENTS)]
+    filtered_df = filtered_df.sort_values(by=['Customer_IP', 'session'], ascending=True)
+    return filtered_df.drop_duplicates(subset=['Customer_IP', 'session'], keep='last')
+
+
+def bounce_rate_by_event(df_cj, seconds=10, last_session_df=None):
+    # Share of viewers of each page whose last event of a session on it lasted less than `seconds`;
+    # df_cj only needs its Event and Customer_IP columns when last_session_df is given
+    if last_session_df is None:
+        last_session_df = last_page_events(df_cj)
+    bounce_df = last_session_df[pd.to_numeric(last_session_df['Time_On_Page'], errors='coerce') < seconds]
+    bounce_rates = {}
+    for event in PAGE_EVENTS:
+        total_event_count = df_cj[df_cj['Event'] == event]['Customer_IP'].nunique()
+        bounce_event_count = bounce_df[bounce_df['Event'] == event]['Customer_IP'].nunique()
+        bounce_rates[event] = (bounce_event_count / total_event_count) * 100 if total_event_count > 0 else 0
+    bounce_rate_df = pd.DataFrame(list(bounce_rates.items()), columns=['Event', 'Bounce Rate'])
+    bounce_rate_df['Bounce Rate'] = bounce_rate_df['Bounce Rate'].round(2)
+    return bounce_rate_df[bounce_rate_df['Bounce Rate'] > 0]
+
+
+# Todo- Order Data / Abandoned Checkouts page------------------------------------------------------
+def order_kpis(df_orders):
+    orders_per_customer = df_orders.groupby('Customer_ID')['Order_ID'].nunique()
+    order_data = df_orders.groupby('Order_ID').agg({'Order_Total_Price': 'first'}).reset_index()
+    return {
+        'unique_orders': df_orders['Order_ID'].nunique(),
+        'average_orders_per_customer': round(orders_per_customer.mean(), 2),
+        'total_canceled_orders': df_orders[df_orders['Order_Cancelled_At'].notna()].shape[0],
+        'max_orders': orders_per_customer.max(),
+        'average_order_value': round(order_data['Order_Total_Price'].mean(), 2),
+    }
+
+
+def order_value_ranking(df_orders, limit=50):
+    order_data = df_orders.groupby('Customer_Name').agg(
+        {'Order_ID': 'first', 'Order_Total_Price': 'first'}).reset_index()
+    order_data = order_data.dropna(subset=['Order_ID'])
+    return order_data.nlargest(limit, 'Order_Total_Price'), order_data.nsmallest(limit, 'Order_Total_Price')
+
+
+def orders_by_referring_site(df_orders):
+    df_unique_orders = df_orders.drop_duplicates(subset="Order_ID", keep="first")
+    total_orders_by_site = df_unique_orders.groupby("Order_Referring_Site")["Order_ID"].count().reset_index()
+    total_orders_by_site.columns = ["Referring Site", "Total Orders"]
+    return total_orders_by_site
+
+
+def abandoned_kpis(df_abandoned_checkouts):
+    abandoned_orders_per_customer = df_abandoned_checkouts.groupby('Customer_ID')['Order_ID'].nunique()
+    return {
+        'abandoned_orders': df_abandoned_checkouts['Order_ID'].nunique(),
+        'average_abandoned_orders': abandoned_orders_per_customer.mean(),
+        'most_abandoned_orders': abandoned_orders_per_customer.max(),
+    }
+
+
+def abandoned_by_referring_site(df_abandoned_checkouts):
+    df_sites = pd.DataFrame({
+        'Order_Referring_Site': df_abandoned_checkouts['Order_Referring_Site'].fillna('Unknown'),
+        'Order_ID': df_abandoned_checkouts['Order_ID'].astype(str),
+    })
+    referring_sites = df_sites.groupby('Order_Referring_Site')['Order_ID'].nunique().reset_index()
+    referring_sites = referring_sites.rename(columns={'Order_ID': 'Total_Abandoned_Orders'})
+    return referring_sites.sort_values('Total_Abandoned_Orders', ascending=False)
+
+
+# Todo- Products page-----------------------------------------------------------------------------
+def published_products(df_products):
+    return df_products.dropna(subset=['Product_Published_At'])
+
+
+def product_kpis(df_orders, df_products):
+    customer_product_counts = df_orders.groupby('Customer_ID')['Product_ID'].nunique()
+    return {
+        'average_products_per_customer': round(customer_product_counts.mean(), 2),
+        'total_product_count': published_products(df_products)['Product_ID'].nunique(),
+    }
+
+
+def product_type_counts(df_products):
+    # Missing types are NaN with object text and <NA> with Arrow strings, both filled before the cast
+    product_types = published_products(df_products)['Product_Type'].fillna("No Type").replace(
+        {"": "No Type"}).astype(str)
+    product_counts = published_products(df_products)['Product_ID'].groupby(product_types).nunique().reset_index()
+    product_counts.columns = ['Product_Type', 'Count']
+    return product_counts
+
+
+def most_sold_products(df_orders):
+    product_sales = df_orders.groupby('Product_Name')['Product_Quantity'].sum().reset_index()
+    return product_sales.sort_values(by='Product_Quantity', ascending=False)
+
+
+def product_price_ranking(df_products):
+    grouped = published_products(df_products).groupby(["Product_ID", "Product_Title"])
+    most_priced = (
+        grouped.agg({"Variant_Price": "max"})
+        .reset_index()
+        .sort_values(by="Variant_Price", ascending=False)
+    )
+    least_priced = grouped.agg({"Variant_Price": "min"}).reset_index()
+    return most_priced, least_priced
+
+
+def unsold_products(df_orders, df_products):
+    df_products_cleaned = published_products(df_products)
+    sold_product_ids = df_orders['Product_ID'].unique()
+    unsold = df_products_cleaned[~df_products_cleaned['Product_ID'].isin(sold_product_ids)]
+    unsold_grouped = unsold.groupby(['Product_ID', 'Product_Title', 'Product_Published_At'], as_index=False).first()
+    unsold_grouped['Product_ID'] = unsold_grouped['Product_ID'].astype(str).replace(",", "", regex=True)
+    unsold_grouped['Product_Published_At'] = pd.to_datetime(
+        unsold_grouped['Product_Published_At'].str.split("T").str[0])
+    unsold_grouped = unsold_grouped.sort_values(by='Product_Published_At', ascending=True)
+    unsold_grouped['Product_Published_At'] = unsold_grouped['Product_Published_At'].dt.date
+    return unsold_grouped[['Product_ID', 'Product_Title', 'Product_Published_At']]
+
+
+def price_range_counts(df_products):
+    # Product counts in dynamic price bins (Freedman-Diaconis bin width); returns (counts, ordered labels)
+    prices = published_products(df_products)['Variant_Price']
+    min_price = prices.min()
+    max_price = prices.max()
+    price_range = max_price - min_price
+    iqr = prices.quantile(0.75) - prices.quantile(0.25)
+    n = len(prices)
+    if iqr > 0 and n > 1:
+        bin_width = 2 * iqr / (n ** (1 / 3))  # Dynamic bin width
+    else:
+        bin_width = price_range / 5  # Fallback: divide into 5 bins if data is uniform
+    num_bins = max(1, int(price_range / bin_width))  # Ensure at least 1 bin
+    price_bins = pd.cut(prices, bins=num_bins)
+    # Adjust bin edges if any lower bounds are negative
+    bin_edges = price_bins.cat.categories
+    if bin_edges[0].left < 0:
+        bin_edges = pd.IntervalIndex(
+            [pd.Interval(max(0, interval.left), interval.right) for interval in bin_edges])
+        price_bins = pd.cut(prices, bins=bin_edges)
+    price_labels = [f"{max(0, round(bin.left, 2))} - {round(bin.right, 2)}" for bin in
+                    price_bins.cat.categories]
+    price_ranges = pd.cut(prices, bins=num_bins, labels=price_labels, include_lowest=True)
+    counts = price_ranges.value_counts().reset_index()
+    counts.columns = ['Price_Range', 'Count']
+    return counts, price_labels
+
+
+# Todo- Revenue page------------------------------------------------------------------------------
+def revenue_kpis(df_orders):
+    df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
+    return {
+        'total_revenue': round(df_unique_orders['Order_Total_Price'].sum(), 2),
+        'average_revenue': round(df_unique_orders['Order_Total_Price'].mean(), 2),
+        'total_refund': df_unique_orders['Order_Refund_Amount'].sum(),
+    }
+
+
+def revenue_per_period(df_orders):
+    df_unique_orders = unique_orders(df_orders)
+    created_at = df_unique_orders['Order_Created_At']
+    df_unique_orders['day'] = created_at.dt.date
+    df_unique_orders['month'] = period_labels(created_at, 'M')
+    df_unique_orders['quarter'] = period_labels(created_at, 'Q')
+    df_unique_orders['year'] = created_at.dt.year
+    return {
+        period: df_unique_orders.groupby(period)['Order_Total_Price'].sum().reset_index()
+        for period in ['day', 'month', 'quarter', 'year']
+    }
+
+
+def revenue_by_referring_site(df_orders):
+    df_unique_orders = df_orders.drop_duplicates(subset="Order_ID", keep="first")
+    total_revenue_by_site = df_unique_orders.groupby("Order_Referring_Site")["Order_Total_Price"].sum().reset_index()
+    total_revenue_by_site.columns = ["Referring Site", "Total Revenue"]
+    return total_revenue_by_site
+
+
+# Todo- Page aggregates: everything a page needs, computed once per store--------------------------
+def _safe(func, *args):
+    # A failing aggregate becomes None so the page shows its "unavailable" fallback for that section
+    with section(func.__name__, *args) as record:
+        try:
+            return record_output(record, func(*args))
+        except Exception:
+            return None
+
+
+def order_created_at(df):
+    return first_order_times(df)['Order_Created_At']
+
+
+def column(df, name):
+    return df[name]
+
+
+def _shared(task):
+    # An intermediate several tasks of a page read, computed once by whichever task (or thread) needs it first
+    lock, result = threading.Lock(), []
+
+    def value():
+        with lock:
+            if not result:
+                result.append(task())
+        return result[0]
+    return value
+
+
+# Each page's tasks are listed in the order the page needs them; the progressive mode of the
+# dashboard computes them in that order, so the KPI cards come first
+def customer_page_tasks(frames):
+    df_customers, df_orders = frames['Customers_Dataset'], frames['Orders_Dataset']
+    tasks = {'kpis': partial(_safe, customer_kpis, df_customers, df_orders)}
+    if available(df_orders):
+        tasks['spend_ranking'] = partial(_safe, customer_spend_ranking, df_orders)
+        tasks['repeat_summary'] = partial(_safe, repeat_customer_summary, df_orders)
+    if available(df_customers):
+        tasks['province'] = partial(_safe, customers_by_region, df_customers, "Customer_Province")
+        tasks['country'] = partial(_safe, customers_by_region, df_customers, "Customer_Country")
+    return tasks
+
+
+def cj_page_tasks(frames):
+    df_cj = frames['CJ']
+    if not available(df_cj):
+        return {}
+    session_starts = _shared(partial(_safe, session_start_times, df_cj))
+    return {
+        'kpis': partial(_safe, cj_kpis, df_cj),
+        'session_weekday_weekend': lambda: _safe(weekday_weekend_counts, session_starts()),
+        'session_day_of_week': lambda: _safe(day_of_week_counts, session_starts()),
+        'session_hour_of_day': lambda: _safe(hour_of_day_counts, session_starts()),
+        'sessions_per_day': partial(_safe, sessions_per_day, df_cj),
+        'duration_kpis': partial(_safe, session_duration_kpis, df_cj),
+        'duration_sketches': partial(_safe, duration_sketches, df_cj),
+        'top_sessions': partial(_safe, top_sessions_by_time, df_cj),
+        'max_sessions_per_ip': partial(_safe, max_sessions_per_ip, df_cj),
+        'product_visitors': partial(_safe, unique_visitors_by, df_cj, 'Product_Name'),
+        'collection_visitors': partial(_safe, unique_visitors_by, df_cj, 'Collection_Name'),
+        'cart_add_visitors': partial(_safe, cart_add_visitors, df_cj),
+        'search_terms': partial(_safe, search_term_counts, df_cj),
+        'time_per_event': partial(_safe, time_per_event, df_cj),
+        'time_per_product': partial(_safe, time_spent_per_product, df_cj),
+        'time_per_collection': partial(_safe, time_spent_per_collection, df_cj),
+        'viewers_per_page': partial(_safe, viewers_per_page, df_cj),
+        'bounce_rate_under_30': partial(_safe, bounce_rate_under, df_cj, 30),
+        'bounce_rate_by_event': partial(_safe, bounce_rate_by_event, df_cj),
+        # The journey flow sits first on the page but is drawn last, after everything above
+        'sankey_transitions': partial(_safe, cj_sankey_transitions, df_cj),
+        'ip_time_spent': partial(_safe, ip_time_spent, df_cj),
+    }
+
+
+def order_page_tasks(frames):
+    df_orders = frames['Orders_Dataset']
+    if not available(df_orders):
+        return {}
+    created_at = _shared(partial(_safe, order_created_at, df_orders))
+    return {
+        'kpis': partial(_safe, order_kpis, df_orders),
+        'weekday_weekend': lambda: _safe(weekday_weekend_counts, created_at()),
+        'day_of_week': lambda: _safe(day_of_week_counts, created_at()),
+        'hour_of_day': lambda: _safe(hour_of_day_counts, created_at()),
+        'orders_per_day': partial(_safe, orders_per_day, df_orders),
+        'value_ranking': partial(_safe, order_value_ranking, df_orders),
+        'referring_sites': partial(_safe, orders_by_referring_site, df_orders),
+    }
+
+
+def abandoned_page_tasks(frames):
+    df_abandoned_checkouts = frames['AbandonedCheckouts']
+    if not available(df_abandoned_checkouts):
+        return {}
+    created_at = _shared(partial(_safe, order_created_at, df_abandoned_checkouts))
+    return {
+        'kpis': partial(_safe, abandoned_kpis, df_abandoned_checkouts),
+        'weekday_weekend': lambda: _safe(weekday_weekend_counts, created_at()),
+        'day_of_week': lambda: _safe(day_of_week_counts, created_at()),
+        'hour_of_day': lambda: _safe(hour_of_day_counts, created_at()),
+        'orders_per_day': partial(_safe, orders_per_day, df_abandoned_checkouts),
+        'referring_sites': partial(_safe, abandoned_by_referring_site, df_abandoned_checkouts),
+    }
+
+
+def product_page_tasks(frames):
+    df_orders, df_products = frames['Orders_Dataset'], frames['Products_Dataset']
+    tasks = {}
+    if available(df_orders):
+        tasks['kpis'] = partial(_safe, product_kpis, df_orders, df_products)
+        tasks['most_sold'] = partial(_safe, most_sold_products, df_orders)
+    if available(df_products):
+        tasks['type_counts'] = partial(_safe, product_type_counts, df_products)
+        tasks['price_ranking'] = partial(_safe, product_price_ranking, df_products)
+        tasks['price_ranges'] = partial(_safe, price_range_counts, df_products)
+        if available(df_orders):
+            tasks['unsold'] = partial(_safe, unsold_products, df_orders, df_products)
+    return tasks
+
+
+def revenue_page_tasks(frames):
+    df_orders = frames['Orders_Dataset']
+    if not available(df_orders):
+        return {}
+    df_unique_orders = _shared(partial(_safe, unique_orders, df_orders))
+    created_at = _shared(lambda: _safe(column, df_unique_orders(), 'Order_Created_At'))
+    revenue = _shared(lambda: _safe(column, df_unique_orders(), 'Order_Total_Price'))
+    return {
+        'kpis': partial(_safe, revenue_kpis, df_orders),
+        'weekday_weekend': lambda: _safe(weekday_weekend_counts, created_at(), revenue()),
+        'day_of_week': lambda: _safe(day_of_week_counts, created_at(), revenue()),
+        'hour_of_day': lambda: _safe(hour_of_day_counts, created_at(), revenue()),
+        'per_period': partial(_safe, revenue_per_period, df_orders),
+        'referring_sites': partial(_safe, revenue_by_referring_site, df_orders),
+    }
+
+
+PAGE_TASKS = {
+    'Customer Journey': cj_page_tasks,
+    'Customer Data': customer_page_tasks,
+    'Order Data': order_page_tasks,
+    'Abandoned Checkouts': abandoned_page_tasks,
+    'Products': product_page_tasks,
+    'Revenue': revenue_page_tasks,
+}
+
+
+def page_tasks(page, frames):
+    return PAGE_TASKS[page](frames)
+
+
+def compute_page_aggregates(page, frames):
+    return {key: task() for key, task in page_tasks(page, frames).items()}
+
+
+def compute_store_aggregates(frames):
+    return {page: compute_page_aggregates(page, frames) for page in PAGE_TASKS}
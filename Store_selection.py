@@ -1,12 +1,41 @@
-from PIL import Image
 import streamlit as st
 import pandas as pd
-import altair as alt
 from datetime import datetime
-from wordcloud import WordCloud
-import io
+import functools
+import hashlib
+import json
 import os
-import plotly.graph_objects as go
+from Quantile_sketch import merge_sketches, sketches_in_range
+from Chart_cache import chart_key, closure_values, read_chart, write_chart
+from Store_data import (ARROW_INGESTION, DATASETS, dataset_path, get_store_names, snapshot, store_fingerprint,
+                        write_csv_chunks)
+from Store_metrics import (JOURNEY_EVENTS, PAGE_TASKS, cj_sankey_transitions, compute_page_aggregates,
+                           downsample_lttb, fill_daily_counts, filter_date_range, page_tasks, prune_sankey, sort_order,
+                           table_page, top_k_with_other)
+from Precompute_aggregates import read_cached_aggregates
+from Memory_report import flagged_columns, memory_report, memory_summary
+from Progressive_aggregates import StreamingAggregates
+from Word_cloud import wordcloud_png
+from Chunked_aggregates import (CJ_STREAM_BYTES, CJ_WINDOW_ROWS, CjChunkAggregator, LiveDayAggregator,
+                                RevenueChunkAggregator, stream_cj_aggregates)
+from Incremental_load import AppendableCsv, IncrementalAggregates
+from Partitioned_store import PARTITIONED_DATASETS, PARTITIONING, date_bounds, ensure_partitions, read_partitions
+from Perf_trace import close_lap, lap, profile_call, record_output, section, slowest, start_run, stop_run
+from Lazy_import import lazy_import
+from Cache_warmer import CacheWarmer
+from Computation_cache import ComputationCache
+
+def configure_altair(altair):
+    # Chart specs keep their data inline (dates as ISO strings, as a cached spec has them) and no Altair theme, the
+    # Streamlit theme is applied when they are drawn. Set once: both settings are global to the process, builds in
+    # concurrent sessions must not switch them
+    altair.theme.enable('none')
+    altair.data_transformers.enable('default', max_rows=None)
+
+
+# Imported when a chart is first built, a page drawn from cached chart specs never loads them
+alt = lazy_import('altair', on_load=configure_altair)
+go = lazy_import('plotly.graph_objects')
 
 
 def add_tooltip_css():
@@ -53,25 +82,6 @@ def render_tooltip(info_text: str, icon: str = "ℹ️") -> str:
     """
 
 
-st.set_page_config(
-    page_title="QQQeApps:Dashboard",
-    page_icon="🔧",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.markdown(
-    """
-    <style>
-    .css-1d3912d {  /* This selector targets the Streamlit's dark theme toggle button */
-        background-color: #000;
-        color: white;
-    }
-    </style>
-    """, unsafe_allow_html=True
-)
-
-
 def add_custom_css():
     st.markdown(
         """
@@ -99,110 +109,461 @@ def add_custom_css():
     )
 
 
+# Stores whose exports the shared caches below hold at once. The cache warmer fills them for the most used stores
+# only, leaving room for one more a session opens, so it never evicts what it or a session just loaded
+CACHED_STORES = 5
+WARMED_STORES = CACHED_STORES - 1
+
+
+@st.cache_resource(show_spinner=False, max_entries=len(DATASETS) * CACHED_STORES)
+def shared_csv(file_path, encoding, parse_dates, arrow):
+    # One per export, shared by every session and rerun and never written to; a rerun after the export job
+    # appended rows parses only those rows
+    return AppendableCsv(file_path, encoding, parse_dates, arrow)
+
+
 def load_data(file_path, encoding='utf-8', parse_dates=True):
     try:
-        df = pd.read_csv(file_path, encoding=encoding, parse_dates=False)
+        with section(f"load_data:{os.path.basename(file_path)}", kind='load') as record:
+            df, _ = shared_csv(file_path, encoding, parse_dates, bool(st.session_state.get('arrow_ingestion'))).refresh()
+            return record_output(record, snapshot(df))
     except UnicodeDecodeError:
         st.error(f"Error reading file {file_path} with encoding {encoding}. Trying alternative encoding...")
         return None
 
-    if parse_dates:
-        date_columns = ['Order_Created_At', 'Order_Updated_At', 'Event_Time', 'Customer_Created_At',
-                        'Customer_Updated_At',
-                        'Order_Created_At', 'Order_Updated_At', 'Variant_Created_At', 'Product_Created_At']
-        for col in df.columns:
-            if col in date_columns and df[col].dtype == 'object':
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce', utc=True)
-                except Exception as e:
-                    st.error(f"Error parsing column '{col}': {e}")
-    return df
-
-st.sidebar.markdown(
-    """
-    <h1 style='text-align: center;
-               font-size: 40px;
-               font-family: Arial, sans-serif;
-               background: linear-gradient(to right, white, navy);
-               -webkit-background-clip: text;
-               -webkit-text-fill-color: transparent;'>
-        QQQe Dashboard
-    </h1>
-    """,
-    unsafe_allow_html=True
-)
 
-def get_store_names(data_dir):
-    files = os.listdir(data_dir)
-    store_names = set()  # Using set to avoid duplicates
-    for file in files:
-        store_name = file.split('_')[0]
-        store_names.add(store_name)
-    return list(store_names)
+@st.cache_resource(show_spinner=False, max_entries=CACHED_STORES)
+def load_streamed_cj(file_path, modified):
+    # (Customer Journey aggregates over every row, last CJ_WINDOW_ROWS rows) of a CJ export too large to load
+    return stream_cj_aggregates(file_path, window_rows=CJ_WINDOW_ROWS)
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 data_dir = os.path.join(BASE_DIR, "data")
-store_names = get_store_names(data_dir)
-store_select = st.sidebar.selectbox('Select Store', store_names)
-
-if store_select:
-    data_files = {
-        'AbandonedCheckouts': f"{store_select}_AbandonedCheckouts.csv",
-        'CJ': f"{store_select}_CJ.csv",
-        'Customers_Dataset': f"{store_select}_Customers_Dataset.csv",
-        'Orders_Dataset': f"{store_select}_Orders_Dataset.csv",
-        'Products_Dataset': f"{store_select}_Products_Dataset.csv"
-    }
-    try:
-        df_abandoned_checkouts = load_data(os.path.join(data_dir, data_files['AbandonedCheckouts']))
-        if df_abandoned_checkouts is not None and df_abandoned_checkouts.empty:
-            df_abandoned_checkouts = None
-    except:
-        df_abandoned_checkouts = None
 
-    try:
-        df_cj = load_data(os.path.join(data_dir, data_files['CJ']))
-        if df_cj is not None and df_cj.empty:
-            df_cj = None
-    except:
-        df_cj = None
+# Month partitioned dataset -> the pages drawing its date filter. Only those load a date range of it, the other
+# pages reading the dataset (Customer Data and Products read the orders) always get all of its rows
+DATE_FILTER_PAGES = {'CJ': ('Customer Journey',), 'Orders_Dataset': ('Order Data', 'Revenue'),
+                     'AbandonedCheckouts': ('Abandoned Checkouts',)}
 
-    try:
-        df_customers = load_data(os.path.join(data_dir, data_files['Customers_Dataset']))
-        if df_customers is not None and df_customers.empty:
-            df_customers = None
-    except:
-        df_customers = None
 
-    try:
-        df_orders = load_data(os.path.join(data_dir, data_files['Orders_Dataset']))
-        if df_orders is not None and df_orders.empty:
-            df_orders = None
-    except:
-        df_orders = None
+def date_filter_key(dataset):
+    return f"{store_select}:{dataset}:date"
+
+
+def selected_date_range(dataset):
+    # (start, end) UTC timestamps of the sidebar date filter of the dataset's pages, None while it covers all of its
+    # dates or another page is selected; read from the widgets' state of the previous rerun, before the page draws
+    # them again (the page selectbox state is already this rerun's)
+    if st.session_state.get('page', 'Customer Journey') not in DATE_FILTER_PAGES.get(dataset, ()):
+        return None
+    key = date_filter_key(dataset)
+    start, end, bounds = (st.session_state.get(f"{key}_{name}") for name in ('start', 'end', 'bounds'))
+    if not (start and end and bounds) or (start <= bounds[0] and end >= bounds[1]):
+        return None
+    return pd.to_datetime(start).tz_localize('UTC'), pd.to_datetime(end).tz_localize('UTC')
+
+
+def date_ranges():
+    # Month partitioned datasets loaded for a part of their dates only -> that (start, end)
+    ranges = {dataset: selected_date_range(dataset) for dataset in PARTITIONED_DATASETS}
+    return {dataset: selected for dataset, selected in ranges.items() if selected is not None}
+
+
+def data_fingerprint():
+    # The files of the selected store plus the date ranges loaded, the key of everything computed from the frames
+    return store_fingerprint(store_select, data_dir) + tuple(
+        ('dates', dataset, str(start), str(end)) for dataset, (start, end) in sorted(date_ranges().items()))
 
-    try:
-        df_products = load_data(os.path.join(data_dir, data_files['Products_Dataset']), encoding='latin1')
-        if df_products is not None and df_products.empty:
-            df_products = None
-    except:
-        df_products = None
 
+@st.cache_resource(show_spinner=False, max_entries=25)
+def load_shared_range(store, dataset, start, end, arrow, modified):
+    # (rows between start and end, (first, last) date of the dataset); only the month partitions of the range are
+    # read, they are written from the export on first use
+    manifest = ensure_partitions(store, dataset, data_dir)
+    return read_partitions(store, dataset, start, end, arrow=arrow), date_bounds(manifest)
 
-def filter_by_date(df, date_column, label_prefix=""):
-    df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
-    min_date = df[date_column].min().date()
-    max_date = df[date_column].max().date()
+
+# Dataset -> (first, last) date of its whole export when only a date range of it is loaded, see filter_by_date
+full_date_bounds = {}
+
+
+def load_dataset(dataset, file_path, encoding='utf-8'):
+    # The rows in the sidebar date range of a month partitioned dataset (reading only the months of that range when
+    # pyarrow is installed), the whole export otherwise
+    selected = selected_date_range(dataset) if dataset in PARTITIONED_DATASETS else None
+    if selected is None:
+        return load_data(file_path, encoding)
+    with section(f"load_range:{os.path.basename(file_path)}", kind='load') as record:
+        date_column = PARTITIONED_DATASETS[dataset]
+        if PARTITIONING:
+            stat = os.stat(file_path)
+            df, full_date_bounds[dataset] = load_shared_range(store_select, dataset, *selected,
+                                                              bool(st.session_state.get('arrow_ingestion')),
+                                                              (stat.st_size, stat.st_mtime_ns))
+        else:
+            df = load_data(file_path, encoding)
+            if df is None:
+                return None
+            full_date_bounds[dataset] = (df[date_column].min(), df[date_column].max())
+            df = filter_date_range(df, date_column, *selected)
+        return record_output(record, snapshot(df))
+
+# Set by main() for the selected store, the pages read them as globals
+store_select = None
+store_frames = {}
+df_abandoned_checkouts = df_cj = df_customers = df_orders = df_products = None
+# Customer Journey aggregates of a streamed CJ export, df_cj then only holds its last rows
+cj_streamed_aggregates = None
+
+
+def filter_by_date(df, date_column, label_prefix="", dataset=None):
+    # (rows of df in the sidebar date range, (date column, start, end) of that range or None). The range picked for
+    # a month partitioned dataset is also what the next rerun loads of it (load_dataset), the page's cards and charts
+    # then cover that range
+    if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df = df.assign(**{date_column: pd.to_datetime(df[date_column], errors='coerce')})
+    keys = {}
+    if dataset in PARTITIONED_DATASETS:
+        key = date_filter_key(dataset)
+        first, last = full_date_bounds.get(dataset) or (df[date_column].min(), df[date_column].max())
+        min_date, max_date = first.date(), last.date()
+        st.session_state[f"{key}_bounds"] = (min_date, max_date)
+        keys = {'start': f"{key}_start", 'end': f"{key}_end"}
+        if dataset in full_date_bounds:
+            st.sidebar.caption("Only this date range is loaded, the cards and charts cover it")
+    else:
+        min_date = df[date_column].min().date()
+        max_date = df[date_column].max().date()
     start_date = st.sidebar.date_input(f'{label_prefix}Start Date', min_value=min_date, max_value=max_date,
-                                       value=min_date)
-    end_date = st.sidebar.date_input(f'{label_prefix}End Date', min_value=min_date, max_value=max_date, value=max_date)
+                                       value=min_date, key=keys.get('start'))
+    end_date = st.sidebar.date_input(f'{label_prefix}End Date', min_value=min_date, max_value=max_date, value=max_date,
+                                     key=keys.get('end'))
     if start_date and end_date:
         start_date = pd.to_datetime(start_date).tz_localize('UTC')
         end_date = pd.to_datetime(end_date).tz_localize('UTC')
-        filtered_data = df[(df[date_column] >= start_date) & (df[date_column] <= end_date)]
-        return filtered_data
-    return df
+        return filter_date_range(df, date_column, start_date, end_date), (date_column, str(start_date), str(end_date))
+    return df, None
+
+
+PREVIEW_PAGE_SIZES = [50, 100, 500, 1000]
+EXPORT_DIR = os.path.join(BASE_DIR, "cache", "exports")
+EXPORTS_KEPT = 20
+
+
+def export_csv(df, name, date_range=None, sort_column=None, ascending=True):
+    # Files are named after the store files, date range, sort and rows they hold, so preparing the same export
+    # again reuses the file and a refreshed export gets a new one
+    signature = (f"{store_select}|{name}|{data_fingerprint()}|{date_range}|{sort_column}|{ascending}|{len(df)}|"
+                 f"{list(df.columns)}|{df.index[:1].tolist()}|{df.index[-1:].tolist()}")
+    path = os.path.join(EXPORT_DIR, f"{store_select}-{name}-{hashlib.md5(signature.encode()).hexdigest()[:12]}.csv")
+    if not os.path.exists(path):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        write_csv_chunks(df, path, order=None if sort_column is None else sort_order(df, sort_column, ascending))
+        exports = sorted((os.path.join(EXPORT_DIR, file) for file in os.listdir(EXPORT_DIR)), key=os.path.getmtime)
+        for old_path in exports[:-EXPORTS_KEPT]:
+            os.remove(old_path)
+    return path
+
+
+def fragment(func=None, *, run_every=None):
+    # st.fragment whose reruns count as foreground activity for the cache warmer, like full reruns
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with cache_warmer().foreground():
+                return func(*args, **kwargs)
+        return st.fragment(run, run_every=run_every)
+    return decorate if func is None else decorate(func)
+
+
+@fragment
+def show_paginated_table(df, key, columns=None, prepare_page=None, date_range=None):
+    # Sorts and slices on the server and sends only the visible page to the browser
+    sort_col, order_col, size_col, page_col = st.columns(4)
+    sort_column = sort_col.selectbox("Sort by", ['(none)'] + list(df.columns), key=f"{key}_sort")
+    ascending = order_col.radio("Order", ['Ascending', 'Descending'], horizontal=True, key=f"{key}_order") == 'Ascending'
+    page_size = size_col.selectbox("Rows per page", PREVIEW_PAGE_SIZES, index=1, key=f"{key}_page_size")
+    pages = max(1, -(-len(df) // page_size))
+    # The date filter can shrink the table below the page that was open
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = page_col.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                                 key=f"{key}_page")
+
+    sort_column = None if sort_column == '(none)' else sort_column
+    window = table_page(df, page, page_size, sort_column, ascending)
+    if prepare_page is not None:
+        window = prepare_page(window)
+    st.dataframe(window if columns is None else window[columns], use_container_width=True)
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {min(first_row + 1, len(df)):,}-{first_row + len(window):,} of {len(df):,}")
+
+    if st.button("Prepare full CSV", key=f"{key}_prepare"):
+        # Rows in the table's sort order
+        path = export_csv(df, key, date_range, sort_column, ascending)
+        with open(path, 'rb') as f:
+            st.download_button(f"Download full CSV ({len(df):,} rows)", f, file_name=f"{store_select}_{key}.csv",
+                               mime="text/csv", key=f"{key}_download")
+
+
+# Points each per-day chart may embed in its Vega spec; longer series are downsampled with LTTB
+CHART_POINT_BUDGETS = {
+    'Sessions per Day': 500,
+    'Orders per Day': 500,
+    'Abandoned Orders per Day': 500,
+    'Revenue per Day': 500,
+}
+# The point marks on top of a line are only drawn up to this many points
+POINT_LAYER_MAX = 200
+
+
+def chart_series(df, x_column, y_column, chart):
+    plot_df = downsample_lttb(df, x_column, y_column, CHART_POINT_BUDGETS[chart])
+    if len(plot_df) < len(df):
+        st.caption(f"{len(plot_df):,} of {len(df):,} days shown, downsampled keeping the peaks and dips")
+    return plot_df
+
+
+def with_points(line_chart, points, plot_df):
+    return line_chart + points if len(plot_df) <= POINT_LAYER_MAX else line_chart
+
+
+# Defaults of the "Flow limits" of the customer journey Sankey
+SANKEY_LIMITS = {'max_depth': len(JOURNEY_EVENTS), 'min_flow': 1, 'max_nodes': 60, 'max_links': 200}
+
+
+def sankey_figure(transition_counts):
+    unique_events = list(set(transition_counts['Source']).union(set(transition_counts['Target'])))
+    node_indices = {event: i for i, event in enumerate(unique_events)}
+
+    source = [node_indices[src] for src in transition_counts['Source']]
+    target = [node_indices[tgt] for tgt in transition_counts['Target']]
+    value = transition_counts['Count'].tolist()
+
+    return go.Figure(go.Sankey(
+        node=dict(
+            pad=20,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=unique_events,
+            color=["#ff9259", "#66b3ff", "#99ff99", "#ffcc99"] * (len(unique_events) // 4 + 1)
+        ),
+        link=dict(
+            source=source,
+            target=target,
+            value=value,
+            color=["rgba(30, 144, 255, 0.4)" for _ in value]
+        )
+    ))
+
+
+@st.cache_resource(show_spinner=False)
+def computation_cache():
+    # Results shared by the sessions of this server, sessions asking for one being computed wait for it
+    return ComputationCache()
+
+
+def chart_payload(build):
+    chart = build()
+    if isinstance(chart, alt.TopLevelMixin):
+        # See configure_altair for the theme and data settings of the spec
+        return {'kind': 'vega-lite', 'spec': json.loads(json.dumps(chart.to_dict(), default=str))}
+    return {'kind': 'plotly', 'spec': json.loads(chart.to_json())}
+
+
+def cached_chart_payload(key, build):
+    payload = read_chart(key)
+    if payload is None:
+        payload = chart_payload(build)
+        write_chart(key, payload)
+    return payload
+
+
+def show_chart(name, build, use_container_width=False, state=()):
+    # The chart spec is kept on disk per store files, chart and the values build reads, a chart seen before
+    # (also by another session or before a restart) is drawn from it without building the chart again.
+    # Sessions drawing the same chart at once build it once, recent specs are also kept in memory.
+    key = chart_key(store_select, data_fingerprint(), name, *closure_values(build, state))
+    with section(f"chart:{name}"):
+        if key:
+            payload = computation_cache().get(('chart', key), lambda: cached_chart_payload(key, build))
+        else:
+            payload = chart_payload(build)
+        if payload['kind'] == 'plotly':
+            st.plotly_chart(payload['spec'], use_container_width=use_container_width)
+        else:
+            st.vega_lite_chart(payload['spec'], use_container_width=use_container_width)
+
+
+@st.cache_resource(show_spinner=False, max_entries=25)
+def precomputed_aggregates(store, fingerprint):
+    # The cache written by Precompute_aggregates.py, None when it does not match the files on disk
+    return read_cached_aggregates(store, fingerprint)
+
+
+# Every date range loaded adds entries, the least recently used ones are dropped past this many
+@st.cache_resource(show_spinner=False, max_entries=120)
+def load_page_aggregates(store, page, fingerprint, _frames):
+    # Use the cache written by Precompute_aggregates.py when it matches the files on disk,
+    # otherwise compute only the aggregates of the page being shown
+    aggregates = precomputed_aggregates(store, fingerprint)
+    if aggregates is not None:
+        return aggregates[page]
+    return compute_page_aggregates(page, _frames)
+
+
+@st.cache_resource(max_entries=12, show_spinner=False)
+def streaming_page_aggregates(store, page, fingerprint, workers, _frames):
+    # Shared by the reruns and sessions showing this page, a rerun picks up the aggregates already computed
+    aggregates = precomputed_aggregates(store, fingerprint)
+    if aggregates is not None:
+        return StreamingAggregates({key: lambda value=value: value for key, value in aggregates[page].items()})
+    return StreamingAggregates(page_tasks(page, _frames), workers)
+
+
+# Pages whose aggregates are folded from the rows of one export, appended rows are folded in on the next rerun
+INCREMENTAL_PAGES = {'Customer Journey': ('CJ', CjChunkAggregator), 'Revenue': ('Orders_Dataset', RevenueChunkAggregator)}
+
+
+@st.cache_resource(show_spinner=False, max_entries=25)
+def incremental_aggregates(file_path, page, arrow):
+    return IncrementalAggregates(INCREMENTAL_PAGES[page][1])
+
+
+def incremental_dataset(page, frames, ranges=()):
+    # The export whose appended rows are folded into the page's aggregates, None when they are computed whole
+    dataset = INCREMENTAL_PAGES.get(page, (None,))[0]
+    return dataset if dataset and frames.get(dataset) is not None and dataset not in ranges else None
+
+
+def shared_page_aggregates(store, page, frames, fingerprint, arrow=False, ranges=()):
+    # The page's aggregates from the caches shared by every session, computed into them on a miss. The
+    # precomputed cache is used while it matches the files, once the export grew the appended rows are folded in.
+    precomputed = precomputed_aggregates(store, fingerprint)
+    if precomputed is not None:
+        return precomputed[page]
+    dataset = incremental_dataset(page, frames, ranges)
+    if dataset:
+        file_path = dataset_path(store, dataset, data_dir)
+        df, generation = shared_csv(file_path, DATASETS[dataset][1], True, arrow).refresh()
+        return incremental_aggregates(file_path, page, arrow).update(df, generation)
+    return load_page_aggregates(store, page, fingerprint, frames)
+
+
+def page_aggregates(page):
+    fingerprint = data_fingerprint()
+    with section(f"aggregates:{page}"):
+        if page == 'Customer Journey' and cj_streamed_aggregates is not None:
+            aggregates = snapshot(cj_streamed_aggregates)
+            if st.session_state.get('progressive'):
+                return StreamingAggregates({key: lambda value=value: value for key, value in aggregates.items()})
+            return aggregates
+        if st.session_state.get('progressive'):
+            # Computed afresh per file change (no appended rows folded in), the sections draw as they finish
+            return streaming_page_aggregates(store_select, page, fingerprint,
+                                             st.session_state.get('progressive_workers', 0), store_frames)
+        return snapshot(shared_page_aggregates(store_select, page, store_frames, fingerprint,
+                                               bool(st.session_state.get('arrow_ingestion')), date_ranges()))
+
+
+def warm_store(store):
+    # Loads every export of the store and computes every page's aggregates into the shared caches, with the
+    # default sidebar settings; run by the cache warmer in the background. Draws nothing: the thread has no script
+    # context, and the cache_resource functions it calls (no spinner) do not need one
+    frames, streamed = {}, False
+    for dataset, (_, encoding) in DATASETS.items():
+        file_path = dataset_path(store, dataset, data_dir)
+        if not os.path.exists(file_path):
+            frames[dataset] = None
+            continue
+        stat = os.stat(file_path)
+        if dataset == 'CJ' and stat.st_size > CJ_STREAM_BYTES:
+            _, df = load_streamed_cj(file_path, (stat.st_size, stat.st_mtime_ns))
+            streamed = True
+        else:
+            df, _ = shared_csv(file_path, encoding, True, False).refresh()
+        frames[dataset] = None if df.empty else df
+    fingerprint = store_fingerprint(store, data_dir)
+    for page in PAGE_TASKS:
+        if not (page == 'Customer Journey' and streamed):
+            shared_page_aggregates(store, page, frames, fingerprint)
+
+
+@st.cache_resource(show_spinner=False)
+def cache_warmer():
+    return CacheWarmer(warm_store, lambda: get_store_names(data_dir), lambda store: store_fingerprint(store, data_dir),
+                       max_stores=WARMED_STORES).start()
+
+
+# A plain st.fragment: its reruns must not keep the warmer it reports on waiting
+@st.fragment(run_every=3)
+def show_warming_progress(warmer):
+    done, total, current = warmer.progress()
+    if current is not None or done < total:
+        st.progress(done / total if total else 0.0,
+                    text=f"Warming caches: {done}/{total} stores" + (f" ({current})" if current else ""))
+    else:
+        st.caption(f"Caches warm for {total} stores")
+
+
+# Seconds between two refreshes of the live customer journey section
+LIVE_INTERVALS = [5, 10, 30, 60]
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def live_day_aggregates(file_path, day, arrow):
+    return IncrementalAggregates(lambda: LiveDayAggregator(day))
+
+
+def show_live_cj_activity(file_path, arrow):
+    # Reruns on its own timer: parses the rows appended to the CJ export and folds today's into the live counters,
+    # the rest of the page and its aggregates over the whole history are not recomputed
+    try:
+        day = pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%d')
+        df, generation = shared_csv(file_path, 'utf-8', True, arrow).refresh()
+        live = live_day_aggregates(file_path, day, arrow).update(df, generation)
+        last_event = live['last_event'].strftime('%H:%M:%S') if live['last_event'] is not None else "-"
+        st.markdown(f"<h1 style='display: inline-block;'>Today ({day} UTC)</h1>", unsafe_allow_html=True)
+        st.caption(f"Updated {datetime.now():%H:%M:%S}, last event at {last_event} UTC")
+        if not live['events']:
+            st.markdown("No customer journey events today yet.")
+            return
+        cards = [("Events today", live['events']), ("Sessions today", live['sessions']),
+                 ("Viewers today", live['visitors']),
+                 ("Cart adds today", f"{live['cart_adds']} ({live['cart_add_visitors']} viewers)")]
+        for col, (label, value) in zip(st.columns(len(cards)), cards):
+            with col:
+                st.markdown(
+                    f"""
+                        <div class="card">
+                            <p>{label}</p>
+                            <h1>{value}</h1>
+                        </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+        # Drawn directly, not through show_chart: every refresh has new counts and would only fill the chart cache
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            st.markdown("<h3 style='text-align: center;'>Sessions per Hour Today</h3>", unsafe_allow_html=True)
+            per_hour = live['sessions_per_hour'].rename_axis('Hour').reset_index(name='Sessions')
+            st.altair_chart(alt.Chart(per_hour).mark_bar().encode(
+                x=alt.X('Hour:O', title='Hour of Day (UTC)'),
+                y=alt.Y('Sessions:Q', title='Sessions'),
+                tooltip=['Hour', 'Sessions']
+            ), use_container_width=True)
+        with chart_col2:
+            st.markdown("<h3 style='text-align: center;'>Viewers On Each Page Today</h3>", unsafe_allow_html=True)
+            st.altair_chart(alt.Chart(live['viewers_per_page']).mark_bar().encode(
+                x=alt.X('Event:N', title='Page', sort='-y'),
+                y=alt.Y('Total Viewers:Q', title='Viewers'),
+                tooltip=['Event', 'Total Viewers']
+            ), use_container_width=True)
+    except:
+        st.markdown(
+            f"<h3 style='font-size: 30px; color: red; text-align: center;'><b>Live data is unavailable</b></h3>",
+            unsafe_allow_html=True)
 
 
 def show_customer_data_page():
@@ -222,7 +583,9 @@ def show_customer_data_page():
                 unsafe_allow_html=True
             )
         add_custom_css()
+        aggregates = page_aggregates('Customer Data')
         # Todo- Card Creation for the above
+        lap("Card Creation for the above")
         col1, col2, col3 = st.columns(3)
         if df_customers is not None and not df_customers.empty:
             with col1:
@@ -235,7 +598,7 @@ def show_customer_data_page():
                         </div>
                     """, unsafe_allow_html=True)
                 else:
-                    total_listed_customers = df_customers['Customer_ID'].nunique()
+                    total_listed_customers = aggregates['kpis']['listed_customers']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(f"Total number of listed customers: {total_listed_customers}")
                     st.markdown(
@@ -261,7 +624,7 @@ def show_customer_data_page():
                         </div>
                     """, unsafe_allow_html=True)
                 else:
-                    total_paying_customers = df_orders['Customer_ID'].nunique()
+                    total_paying_customers = aggregates['kpis']['paying_customers']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         f"Total number of customers who made a payment: {total_paying_customers}")
@@ -288,16 +651,7 @@ def show_customer_data_page():
                         </div>
                     """, unsafe_allow_html=True)
                 else:
-                    customer_summary = df_orders.groupby("Order_ID").agg(
-                        Total_Spending=("Order_Total_Price", 'first'),
-                        Customer_Name=("Customer_Name", 'first')
-                    ).reset_index()
-                    customer_summary1 = customer_summary.groupby("Customer_Name").agg(
-                        Orders_Placed=("Order_ID", "nunique"),
-                        Total_Spending=("Total_Spending", 'sum'),
-                    ).reset_index()
-                    customer_summary1 = customer_summary1[customer_summary1['Orders_Placed'] >= 2]
-                    repeat_customers = customer_summary1.shape[0]
+                    repeat_customers = aggregates['kpis']['repeat_customers']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         f"Number of repeat customers who placed two or more orders: {repeat_customers}")
@@ -341,8 +695,8 @@ def show_customer_data_page():
             st.markdown(f"<h1 style='display: inline-block;'>Preview Filtered Customer Data {tooltip_html}</h1>",
                         unsafe_allow_html=True)
             st.subheader("Customer Data")
-            filtered_customers = filter_by_date(df_customers, 'Customer_Created_At')
-            st.dataframe(filtered_customers, use_container_width=True)
+            filtered_customers, date_range = filter_by_date(df_customers, 'Customer_Created_At')
+            show_paginated_table(filtered_customers, 'filtered_customers', date_range=date_range)
         else:
             st.title("Preview of customer data filtered by the selected date range.")
             st.markdown("""
@@ -353,13 +707,10 @@ def show_customer_data_page():
                             """, unsafe_allow_html=True)
 
         # Todo- Customer Name Top 5 and Least 5 with Price Spends----------------------------------------
+        lap("Customer Name Top 5 and Least 5 with Price Spends")
         chart_col1, chart_col2 = st.columns(2)
         if df_orders is not None and not df_orders.empty:
-            order_df = df_orders.drop_duplicates("Order_ID")
-            order_data = order_df.groupby('Customer_Name')['Order_Total_Price'].sum().reset_index()
-            order_data = order_data.dropna(subset=['Customer_Name'])
-            top_5_customers = order_data.nlargest(50, 'Order_Total_Price')
-            least_5_customers = order_data.nsmallest(50, 'Order_Total_Price')
+            top_5_customers, least_5_customers = aggregates['spend_ranking']
             with chart_col1:
                 if df_orders is None or df_orders.empty:
                     st.title("Highest Valued Customers")
@@ -378,38 +729,43 @@ def show_customer_data_page():
                         f"<h1 style='display: inline-block;'>Highest Valued Customers {tooltip_html}</h1>",
                         unsafe_allow_html=True
                     )
-                    top_n = st.slider("Select Top N Customers to Display", min_value=1, max_value=50, value=5)
+                    @fragment
+                    def top_customers_chart():
+                        top_n = st.slider("Select Top N Customers to Display", min_value=1, max_value=50, value=5)
 
-                    top_5_customers_filtered = top_5_customers.nlargest(top_n, 'Order_Total_Price')
-                    st.markdown("<h3 style='text-align: center;'>Top N Customers by Total Order Price</h3>",
-                                unsafe_allow_html=True)
+                        top_5_customers_filtered = top_5_customers.nlargest(top_n, 'Order_Total_Price')
+                        st.markdown("<h3 style='text-align: center;'>Top N Customers by Total Order Price</h3>",
+                                    unsafe_allow_html=True)
 
-                    chart = alt.Chart(top_5_customers_filtered).mark_bar().encode(
-                        x=alt.X('Customer_Name:O', title='Customer Name',
-                                sort=top_5_customers_filtered['Order_Total_Price'].tolist()),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),
-                        color=alt.Color('Order_Total_Price:Q', legend=None),
-                        tooltip=['Customer_Name:N', 'Order_Total_Price:Q']
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Customers by Total Order Price"
-                    )
-                    text = chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust the vertical position of the text
-                        fontSize=12
-                    ).encode(
-                        text='Order_Total_Price:Q'
-                    )
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=0,  # Horizontal x-axis labels
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                        def build():
+                            chart = alt.Chart(top_5_customers_filtered).mark_bar().encode(
+                                x=alt.X('Customer_Name:O', title='Customer Name',
+                                        sort=top_5_customers_filtered['Order_Total_Price'].tolist()),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),
+                                color=alt.Color('Order_Total_Price:Q', legend=None),
+                                tooltip=['Customer_Name:N', 'Order_Total_Price:Q']
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Customers by Total Order Price"
+                            )
+                            text = chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,  # Adjust the vertical position of the text
+                                fontSize=12
+                            ).encode(
+                                text='Order_Total_Price:Q'
+                            )
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=0,  # Horizontal x-axis labels
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('top_customers_chart:final_chart', build, use_container_width=True)
+                    top_customers_chart()
             # Column 2: Least Customers
             with chart_col2:
                 if df_orders is None or df_orders.empty:
@@ -429,37 +785,42 @@ def show_customer_data_page():
                         f"<h1 style='display: inline-block;'>Least Valued Customers {tooltip_html}</h1>",
                         unsafe_allow_html=True
                     )
-                    top_n = st.slider("Select Least N Customers to Display", min_value=1, max_value=50, value=5)
-                    least_5_customers_filtered = least_5_customers.nsmallest(top_n, 'Order_Total_Price')
-                    st.markdown("<h3 style='text-align: center;'>Least N Customers by Total Order Price</h3>",
-                                unsafe_allow_html=True)
+                    @fragment
+                    def least_customers_chart():
+                        top_n = st.slider("Select Least N Customers to Display", min_value=1, max_value=50, value=5)
+                        least_5_customers_filtered = least_5_customers.nsmallest(top_n, 'Order_Total_Price')
+                        st.markdown("<h3 style='text-align: center;'>Least N Customers by Total Order Price</h3>",
+                                    unsafe_allow_html=True)
 
-                    chart = alt.Chart(least_5_customers_filtered).mark_bar().encode(
-                        x=alt.X('Customer_Name:O', title='Customer Name',
-                                sort=least_5_customers_filtered['Order_Total_Price'].tolist()),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),
-                        color=alt.Color('Order_Total_Price:Q', legend=None),
-                        tooltip=['Customer_Name:N', 'Order_Total_Price:Q']
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Least N Customers by Total Order Price"
-                    )
-                    text = chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust the vertical position of the text
-                        fontSize=12
-                    ).encode(
-                        text='Order_Total_Price:Q'
-                    )
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=0,  # Horizontal x-axis labels
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                        def build():
+                            chart = alt.Chart(least_5_customers_filtered).mark_bar().encode(
+                                x=alt.X('Customer_Name:O', title='Customer Name',
+                                        sort=least_5_customers_filtered['Order_Total_Price'].tolist()),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),
+                                color=alt.Color('Order_Total_Price:Q', legend=None),
+                                tooltip=['Customer_Name:N', 'Order_Total_Price:Q']
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Least N Customers by Total Order Price"
+                            )
+                            text = chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,  # Adjust the vertical position of the text
+                                fontSize=12
+                            ).encode(
+                                text='Order_Total_Price:Q'
+                            )
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=0,  # Horizontal x-axis labels
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('least_customers_chart:final_chart', build, use_container_width=True)
+                    least_customers_chart()
         else:
             with chart_col1:
                 st.title("Highest Valued Customers")
@@ -477,19 +838,10 @@ def show_customer_data_page():
                 """, unsafe_allow_html=True)
 
         # Todo- Customer Summary Table with Total Spend- Unique Customer Names----------------------------------------
+        lap("Customer Summary Table with Total Spend- Unique Customer Names")
         if df_orders is not None and not df_orders.empty:
-            customer_summary = df_orders.groupby("Order_ID").agg(
-                Total_Spending=("Order_Total_Price", 'first'),
-                Customer_Name=("Customer_Name", "first")
-            ).reset_index()
-            # Aggregating Data by Customer
-            customer_summary1 = customer_summary.groupby("Customer_Name").agg(
-                Orders_Placed=("Order_ID", "nunique"),
-                Total_Spending=("Total_Spending", 'sum'),
-            ).reset_index()
-            # Filter Customers with at least 2 orders
-            customer_summary1 = customer_summary1[customer_summary1['Orders_Placed'] >= 2]
-            customer_summary1 = customer_summary1.reset_index(drop=True)
+            # Customers with at least 2 orders
+            customer_summary1 = aggregates['repeat_summary']
             if not customer_summary1.empty:
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
@@ -516,12 +868,11 @@ def show_customer_data_page():
             """, unsafe_allow_html=True)
 
         # Todo Bar Graph for Customer Province Data and Country Data with Unique Count-----------------------------
+        lap("Bar Graph for Customer Province Data and Country Data with Unique Count")
         chart_col1, chart_col2 = st.columns(2)
         if df_customers is not None and not df_customers.empty:
-            province_data = df_customers.groupby("Customer_Province")["Customer_ID"].nunique().reset_index()
-            province_data = province_data.rename(columns={"Customer_ID": "Unique_Customers"})
-            country_data = df_customers.groupby("Customer_Country")["Customer_ID"].nunique().reset_index()
-            country_data = country_data.rename(columns={"Customer_ID": "Unique_Customers"})
+            province_data = aggregates['province']
+            country_data = aggregates['country']
             with chart_col1:
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
@@ -531,27 +882,29 @@ def show_customer_data_page():
                 st.markdown("<h3 style='text-align: center;'>Unique Customers by Province</h3>", unsafe_allow_html=True)
                 # Check if province data is not empty
                 if df_customers is not None and not df_customers.empty and not province_data.empty:
-                    province_chart = alt.Chart(province_data).mark_bar().encode(
-                        x=alt.X("Customer_Province:O", title="Customer Province", sort="-y"),
-                        y=alt.Y("Unique_Customers:Q", title="Number of Unique Customers"),
-                        color=alt.Color("Customer_Province:N", legend=None),
-                        tooltip=["Customer_Province", "Unique_Customers"]
-                    ).properties(width=350, height=300)
-                    province_chart_text = province_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,
-                        fontSize=12
-                    ).encode(
-                        text='Unique_Customers:Q'
-                    )
-                    province_chart = province_chart + province_chart_text
-                    province_chart = province_chart.configure_axis(
-                        labelAngle=90,
-                        labelFontSize=14,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(province_chart, use_container_width=True)
+                    def build():
+                        province_chart = alt.Chart(province_data).mark_bar().encode(
+                            x=alt.X("Customer_Province:O", title="Customer Province", sort=None),  # "Other" stays last
+                            y=alt.Y("Unique_Customers:Q", title="Number of Unique Customers"),
+                            color=alt.Color("Customer_Province:N", legend=None),
+                            tooltip=["Customer_Province", "Unique_Customers"]
+                        ).properties(width=350, height=300)
+                        province_chart_text = province_chart.mark_text(
+                            align='center',
+                            baseline='middle',
+                            dy=-10,
+                            fontSize=12
+                        ).encode(
+                            text='Unique_Customers:Q'
+                        )
+                        province_chart = province_chart + province_chart_text
+                        province_chart = province_chart.configure_axis(
+                            labelAngle=90,
+                            labelFontSize=14,
+                            titleFontSize=16
+                        )
+                        return province_chart
+                    show_chart('show_customer_data_page:province_chart', build, use_container_width=True)
                 else:
                     # st.title("Unique Customers by Province")
                     st.markdown("""
@@ -570,28 +923,30 @@ def show_customer_data_page():
                 st.markdown("<h3 style='text-align: center;'>Unique Customers by Country</h3>", unsafe_allow_html=True)
 
                 if df_customers is not None and not df_customers.empty and not country_data.empty:
-                    country_chart = alt.Chart(country_data).mark_bar().encode(
-                        x=alt.X("Customer_Country:O", title="Customer Country", sort="-y"),
-                        y=alt.Y("Unique_Customers:Q", title="Number of Unique Customers"),
-                        color=alt.Color("Unique_Customers:Q", legend=None),
-                        tooltip=["Customer_Country", "Unique_Customers"]
-                    ).properties(width=350, height=300)
-
-                    country_chart_text = country_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,
-                        fontSize=12
-                    ).encode(
-                        text='Unique_Customers:Q'
-                    )
-                    country_chart = country_chart + country_chart_text
-                    country_chart = country_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=14,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(country_chart, use_container_width=True)
+                    def build():
+                        country_chart = alt.Chart(country_data).mark_bar().encode(
+                            x=alt.X("Customer_Country:O", title="Customer Country", sort=None),
+                            y=alt.Y("Unique_Customers:Q", title="Number of Unique Customers"),
+                            color=alt.Color("Unique_Customers:Q", legend=None),
+                            tooltip=["Customer_Country", "Unique_Customers"]
+                        ).properties(width=350, height=300)
+
+                        country_chart_text = country_chart.mark_text(
+                            align='center',
+                            baseline='middle',
+                            dy=-10,
+                            fontSize=12
+                        ).encode(
+                            text='Unique_Customers:Q'
+                        )
+                        country_chart = country_chart + country_chart_text
+                        country_chart = country_chart.configure_axis(
+                            labelAngle=0,
+                            labelFontSize=14,
+                            titleFontSize=16
+                        )
+                        return country_chart
+                    show_chart('show_customer_data_page:country_chart', build, use_container_width=True)
                 else:
                     # st.title("Unique Customers by Country")
                     st.markdown("""
@@ -641,116 +996,101 @@ def show_cj_page():
         )
 
         add_custom_css()
+        aggregates = page_aggregates('Customer Journey')
+        if cj_streamed_aggregates is not None and df_cj is not None:
+            st.caption(f"Large export: the cards and charts cover every row, the date filter and the tables "
+                       f"the last {len(df_cj):,} rows.")
+        # Todo-Live activity---------------------------
+        # Follows today's rows as the export job appends them, needs the export read whole (not streamed or a date range)
+        live_available = df_cj is not None and cj_streamed_aggregates is None and 'CJ' not in date_ranges()
+        live_col, interval_col = st.columns([1, 3])
+        if live_col.toggle("Live: today's activity", key="live_cj", disabled=not live_available) and live_available:
+            interval = interval_col.select_slider("Refresh every", LIVE_INTERVALS, value=10, key="live_interval",
+                                                  format_func=lambda seconds: f"{seconds} s")
+            fragment(run_every=interval)(show_live_cj_activity)(dataset_path(store_select, 'CJ', data_dir),
+                                                                    bool(st.session_state.get('arrow_ingestion')))
         # Todo-Customer Journey Data---------------------------
-        if df_cj is not None and not df_cj.empty:
-            filtered_df = (
-                df_cj[['Event_Time', 'Event', 'Customer_IP']]
-                .dropna(subset=['Event', 'Customer_IP'])
-                .drop_duplicates(subset=['Customer_IP', 'Event'])  # Remove duplicate events per session
-            )
-            filtered_df = filtered_df.sort_values(by=['Customer_IP', 'Event_Time'])
-
-            def convert_seconds(seconds):
-                if seconds < 60:
-                    return "< 1 min"
-                hours = int(seconds // 3600)
-                minutes = int((seconds % 3600) // 60)
-                return f"{hours} hr {minutes} min" if hours > 0 else f"{minutes} min"
-
-            filtered_df['Time_Spent'] = (
-                filtered_df.groupby(['Customer_IP'])['Event_Time']
-                .diff()
-                .dt.total_seconds()
-            )
+        # The slowest section of the page: a placeholder now, drawn once the cards and charts below are on screen
+        journey_slot = st.empty()
+        journey_slot.markdown("Loading the customer journey flow...")
+        wordcloud_slot = None
+
+        def show_journey_data(filtered_cj):
+            if df_cj is not None and not df_cj.empty:
+                def convert_seconds(seconds):
+                    if seconds < 60:
+                        return "< 1 min"
+                    hours = int(seconds // 3600)
+                    minutes = int((seconds % 3600) // 60)
+                    return f"{hours} hr {minutes} min" if hours > 0 else f"{minutes} min"
+
+                filtered_df = aggregates['ip_time_spent']
+
+                # Display Sankey Diagram after dataframe
+                with st.container():
+                    # The flow follows the CJ date range picked in the sidebar
+                    if len(filtered_cj) == len(df_cj):
+                        date_range = None
+                        transitions = lambda: aggregates['sankey_transitions']
+                    else:
+                        date_range = (str(filtered_cj['Event_Time'].min()), str(filtered_cj['Event_Time'].max()),
+                                      len(filtered_cj))
+                        transitions = lambda: computation_cache().get(
+                            ('sankey_transitions', store_select, data_fingerprint(), date_range),
+                            lambda: cj_sankey_transitions(filtered_cj))
 
-            filtered_df['Time_Spent'] = filtered_df['Time_Spent'].fillna(0)
-            filtered_df['Total_Time_Spent'] = filtered_df['Time_Spent'].apply(
-                convert_seconds)  # Updated Column Name
-            ip_time_spent = filtered_df.groupby('Customer_IP')['Time_Spent'].sum().reset_index()
-            ip_time_spent = ip_time_spent.sort_values(by='Time_Spent', ascending=False)
-            filtered_df['Customer_IP'] = pd.Categorical(filtered_df['Customer_IP'],
-                                                        categories=ip_time_spent['Customer_IP'], ordered=True)
-            filtered_df = filtered_df.sort_values(by=['Customer_IP', 'Time_Spent'], ascending=[True, False])
-
-            # Display Sankey Diagram after dataframe
-            with st.container():
-                df_cj['Session_ID'] = df_cj.groupby(['Customer_IP', 'session']).ngroup() + 1
-                df_filtered = df_cj[['Event', 'Session_ID']].dropna(subset=['Event'])
-                df_filtered = df_filtered.drop_duplicates(subset=['Session_ID', 'Event'])
-
-                event_order = ['Home', 'Collection', 'Search', 'Product', 'Cart', 'Cart Add', 'Cart Remove',
-                               'Cart Update']
-                df_filtered['Event'] = pd.Categorical(df_filtered['Event'], categories=event_order, ordered=True)
-                df_filtered = df_filtered.sort_values(by=['Session_ID', 'Event'])
-
-                transitions = []
-                for session, group in df_filtered.groupby('Session_ID'):
-                    events = group['Event'].tolist()
-                    levels = [f"{event}_{i}" for i, event in enumerate(events)]
-
-                    for i in range(len(levels)):
-                        if i < len(levels) - 1:
-                            transitions.append((levels[i], levels[i + 1]))
-
-                        drop_off = f"Drop-off_{i}"
-                        transitions.append((levels[i], drop_off))
-
-                drop_off_nodes = [f"Drop-off_{i}" for i in range(len(event_order))]
-
-                transition_counts = pd.DataFrame(transitions, columns=['Source', 'Target'])
-                transition_counts = transition_counts.groupby(['Source', 'Target']).size().reset_index(name='Count')
-
-                unique_events = list(set(transition_counts['Source']).union(set(transition_counts['Target'])))
-                node_indices = {event: i for i, event in enumerate(unique_events)}
-
-                source = [node_indices[src] for src in transition_counts['Source']]
-                target = [node_indices[tgt] for tgt in transition_counts['Target']]
-                value = transition_counts['Count'].tolist()
-
-                sankey_figure = go.Figure(go.Sankey(
-                    node=dict(
-                        pad=20,
-                        thickness=20,
-                        line=dict(color="black", width=0.5),
-                        label=unique_events,
-                        color=["#ff9259", "#66b3ff", "#99ff99", "#ffcc99"] * (len(unique_events) // 4 + 1)
-                    ),
-                    link=dict(
-                        source=source,
-                        target=target,
-                        value=value,
-                        color=["rgba(30, 144, 255, 0.4)" for _ in value]
-                    )
-                ))
+                    add_tooltip_css()
+                    tooltip_html = render_tooltip(
+                        f"Customer Journey flow from start to end you can see incoming and outgoing data and drop off data of each level")
+                    st.markdown(f"<h1 style='display: inline-block;'>Customer Journey Flow {tooltip_html}</h1>",
+                                unsafe_allow_html=True)
 
+                    @fragment
+                    def journey_flow_chart():
+                        with st.expander("Flow limits"):
+                            depth_col, flow_col, nodes_col, links_col = st.columns(4)
+                            limits = (
+                                depth_col.slider("Max steps", min_value=1, max_value=len(JOURNEY_EVENTS),
+                                                 value=SANKEY_LIMITS['max_depth'], key="sankey_max_depth"),
+                                flow_col.number_input("Min sessions per link", min_value=1,
+                                                      value=SANKEY_LIMITS['min_flow'], key="sankey_min_flow"),
+                                nodes_col.number_input("Max nodes", min_value=5, value=SANKEY_LIMITS['max_nodes'],
+                                                       step=5, key="sankey_max_nodes"),
+                                links_col.number_input("Max links", min_value=5, value=SANKEY_LIMITS['max_links'],
+                                                       step=10, key="sankey_max_links"),
+                            )
+                        # Keyed by the CJ date range instead of the filtered frame, transitions only run on a miss
+                        show_chart('show_cj_page:journey_flow',
+                                   lambda: sankey_figure(prune_sankey(transitions(), *limits)),
+                                   use_container_width=True, state=(date_range,))
+                    journey_flow_chart()
+
+                # st.write("### Customer IP-wise Time Spent on Each Page")
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
-                    f"Customer Journey flow from start to end you can see incoming and outgoing data and drop off data of each level")
-                st.markdown(f"<h1 style='display: inline-block;'>Customer Journey Flow {tooltip_html}</h1>",
-                            unsafe_allow_html=True)
-                st.plotly_chart(sankey_figure, use_container_width=True)
+                    f"Customer IP-wise Time Spent on Each Page")
+                st.markdown(
+                    f"<h1 style='display: inline-block;'>Customer IP-wise Time Spent on Each Page {tooltip_html}</h1>",
+                    unsafe_allow_html=True)
+                with st.expander("View Full Table", expanded=True):
+                    # Total_Time_Spent is only formatted for the rows on screen
+                    show_paginated_table(filtered_df, 'ip_time_spent', ['Customer_IP', 'Event', 'Total_Time_Spent'],
+                                         lambda window: window.assign(
+                                             Total_Time_Spent=window['Time_Spent'].apply(convert_seconds)))
+            else:
+                st.title("Customer Journey Flow")
+                st.markdown("""
+                                <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                                    <h3 style="font-size: 30px; color: white; font-weight: bold;">⚠️ No data for Customer Journey Flow</h3>
+                                </div>
+                                """, unsafe_allow_html=True)
 
-            # st.write("### Customer IP-wise Time Spent on Each Page")
-            add_tooltip_css()
-            tooltip_html = render_tooltip(
-                f"Customer IP-wise Time Spent on Each Page")
-            st.markdown(
-                f"<h1 style='display: inline-block;'>Customer IP-wise Time Spent on Each Page {tooltip_html}</h1>",
-                unsafe_allow_html=True)
-            with st.expander("View Full Table", expanded=True):
-                st.dataframe(filtered_df[['Customer_IP', 'Event', 'Total_Time_Spent']], use_container_width=True)
-        else:
-            st.title("Customer Journey Flow")
-            st.markdown("""
-                            <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
-                                <h3 style="font-size: 30px; color: white; font-weight: bold;">⚠️ No data for Customer Journey Flow</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
         # Todo- Card Creation for the above
+        lap("Card Creation for the above")
         col1, col2, col3 = st.columns(3)
         if df_cj is not None and not df_cj.empty:
             with col1:
-                total_listed_customers = df_cj['Customer_IP'].nunique()
+                total_listed_customers = aggregates['kpis']['total_viewers']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(f"Total unique customers: {total_listed_customers}")
                 st.markdown(f"<h1 style='display: inline-block;'>Total Viewers {tooltip_html}</h1>",
@@ -766,9 +1106,7 @@ def show_cj_page():
                 )
 
             with col2:
-                max_session_df = df_cj.loc[df_cj.groupby('Customer_IP')['session'].idxmax()]
-                customer_summary1 = max_session_df[max_session_df['session'] >= 2]
-                repeat_customers = customer_summary1.shape[0]
+                repeat_customers = aggregates['kpis']['repeat_viewers']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     f"Total repeat customers (with 2 or more sessions): {repeat_customers}")
@@ -785,8 +1123,7 @@ def show_cj_page():
                 )
 
             with col3:
-                max_session_df = df_cj.loc[df_cj.groupby('Customer_IP')['session'].idxmax()]
-                session_sum = max_session_df['session'].sum()
+                session_sum = aggregates['kpis']['total_sessions']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     f"Total sessions from customers with the highest session count: {session_sum}")
@@ -830,9 +1167,9 @@ def show_cj_page():
                 f"<h1 style='display: inline-block;'>Preview Filtered Customer Journey Data {tooltip_html}</h1>",
                 unsafe_allow_html=True)
             st.subheader("Customer Journey Data")
-            filtered_cj = filter_by_date(df_cj, 'Event_Time')
+            filtered_cj, date_range = filter_by_date(df_cj, 'Event_Time', dataset='CJ')
             # with st.expander("Preview Filtered CJ Data"):
-            st.dataframe(filtered_cj, use_container_width=True)
+            show_paginated_table(filtered_cj, 'filtered_cj', date_range=date_range)
         else:
             st.title("Preview of customer journey data filtered by the selected date range")
             st.markdown("""
@@ -845,34 +1182,21 @@ def show_cj_page():
         col1, col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
             try:
-                df_temp = df_cj.copy()
-                df_temp["Event_Time"] = pd.to_datetime(df_temp["Event_Time"], errors='coerce')
-                df_temp = df_temp.dropna(subset=["Event_Time"])
                 with col1:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "This chart compares the total number of sessions on weekdays and weekends based on event timestamps. The data is grouped by unique customer sessions.")
                     st.markdown(f"<h1 style='display: inline-block;'>Session :Weekday,Weekend {tooltip_html}</h1>",
                                 unsafe_allow_html=True)
-                    df_temp["Weekday_Weekend"] = df_temp["Event_Time"].dt.dayofweek.apply(
-                        lambda x: "Weekend" if x >= 5 else "Weekday")
-                    grouped_filtered_df = df_temp.groupby(["Customer_IP", "session"]).first().reset_index()
-                    weekday_count = grouped_filtered_df[grouped_filtered_df["Weekday_Weekend"] == "Weekday"].shape[0]
-                    weekend_count = grouped_filtered_df[grouped_filtered_df["Weekday_Weekend"] == "Weekend"].shape[0]
-                    counts = [weekday_count, weekend_count]
-                    labels = ["Weekday", "Weekend"]
-                    total_sessions = sum(counts)
-                    pie_data = pd.DataFrame({
-                        "Category": labels,
-                        "Count": counts,
-                        "Percentage": [(count / total_sessions) * 100 if total_sessions > 0 else 0 for count in counts]
-                    })
-                    pie_chart = alt.Chart(pie_data).mark_arc(size=200).encode(
-                        theta=alt.Theta(field="Count", type="quantitative"),
-                        color=alt.Color(field="Category", type="nominal"),
-                        tooltip=["Category", "Count", "Percentage"]
-                    ).properties(width=300, height=300)
-                    st.altair_chart(pie_chart, use_container_width=True)
+                    pie_data = aggregates['session_weekday_weekend']
+                    def build():
+                        pie_chart = alt.Chart(pie_data).mark_arc(size=200).encode(
+                            theta=alt.Theta(field="Count", type="quantitative"),
+                            color=alt.Color(field="Category", type="nominal"),
+                            tooltip=["Category", "Count", "Percentage"]
+                        ).properties(width=300, height=300)
+                        return pie_chart
+                    show_chart('show_cj_page:pie_chart', build, use_container_width=True)
                 with col2:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -880,26 +1204,23 @@ def show_cj_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Sessions: Days of the Week {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    grouped_filtered_df["days_of_week"] = grouped_filtered_df["Event_Time"].dt.dayofweek.apply(
-                        lambda x: ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"][x]
-                    )
-                    day_count = grouped_filtered_df["days_of_week"].value_counts()
-                    day_count = day_count.reindex(
-                        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], fill_value=0)
-                    pie_data = pd.DataFrame({
-                        "Day": day_count.index,
-                        "Count": day_count.values
-                    })
-                    pie_chart = alt.Chart(pie_data).mark_arc(size=200).encode(
-                        theta="Count:Q",
-                        color=alt.Color("Day:N",
-                                        sort=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
-                                              "Sunday"]),
-                        tooltip=["Day:N", "Count:Q"]
-                    ).properties(width=300, height=300)
-
-                    # Display Chart
-                    st.altair_chart(pie_chart, use_container_width=True)
+                    day_count = aggregates['session_day_of_week']
+                    def build():
+                        pie_data = pd.DataFrame({
+                            "Day": day_count.index,
+                            "Count": day_count.values
+                        })
+                        pie_chart = alt.Chart(pie_data).mark_arc(size=200).encode(
+                            theta="Count:Q",
+                            color=alt.Color("Day:N",
+                                            sort=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday",
+                                                  "Sunday"]),
+                            tooltip=["Day:N", "Count:Q"]
+                        ).properties(width=300, height=300)
+
+                        # Display Chart
+                        return pie_chart
+                    show_chart('show_cj_page:pie_chart#2', build, use_container_width=True)
 
             except Exception as e:
                 st.error(f"An error occurred: {e}")
@@ -921,6 +1242,7 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Session per hours---------------------------------------------
+        lap("Session per hours")
         col1 = st.columns(1)[0]
         if df_cj is not None and not df_cj.empty:
             with col1:
@@ -931,39 +1253,34 @@ def show_cj_page():
                 st.markdown(f"<h1 style='display: inline-block;'>Total sessions: hours of day {tooltip_html}</h1>",
                             unsafe_allow_html=True)
 
-                # Convert to datetime
-                df_cj['Event_Time'] = pd.to_datetime(df_cj['Event_Time'], errors='coerce', utc=True)
-                dyori_cj_df = df_cj.dropna(subset=['Event_Time'])
+                hour_count = aggregates['session_hour_of_day']
 
-                if not dyori_cj_df.empty:
-                    # Process hour data
-                    dyori_cj_df['hour_of_day'] = dyori_cj_df['Event_Time'].dt.hour + 1  # Shift hours to 1-24 range
-                    grouped_filtered_df = dyori_cj_df.groupby(['Customer_IP', 'session']).first().reset_index()
-                    hour_count = grouped_filtered_df['hour_of_day'].value_counts().sort_index()
-                    hour_count = hour_count.reindex(range(1, 25), fill_value=0)
+                if hour_count.sum() > 0:
 
                     # Create DataFrame
-                    hour_data = pd.DataFrame({
-                        'Hour of Day': hour_count.index,
-                        'Number of Sessions': hour_count.values
-                    })
-
-                    # Line Chart
-                    line_chart = alt.Chart(hour_data).mark_line().encode(
-                        x='Hour of Day:O',
-                        y='Number of Sessions:Q',
-                        tooltip=['Hour of Day:N', 'Number of Sessions:Q']
-                    ).properties(title="Total Sessions by Hour of the Day")
-
-                    # Points for Emphasis
-                    points = alt.Chart(hour_data).mark_point(size=60, color='red').encode(
-                        x='Hour of Day:O',
-                        y='Number of Sessions:Q',
-                        tooltip=['Hour of Day:N', 'Number of Sessions:Q']
-                    )
+                    def build():
+                        hour_data = pd.DataFrame({
+                            'Hour of Day': hour_count.index,
+                            'Number of Sessions': hour_count.values
+                        })
+
+                        # Line Chart
+                        line_chart = alt.Chart(hour_data).mark_line().encode(
+                            x='Hour of Day:O',
+                            y='Number of Sessions:Q',
+                            tooltip=['Hour of Day:N', 'Number of Sessions:Q']
+                        ).properties(title="Total Sessions by Hour of the Day")
+
+                        # Points for Emphasis
+                        points = alt.Chart(hour_data).mark_point(size=60, color='red').encode(
+                            x='Hour of Day:O',
+                            y='Number of Sessions:Q',
+                            tooltip=['Hour of Day:N', 'Number of Sessions:Q']
+                        )
 
-                    # Combine and Display
-                    st.altair_chart(line_chart + points, use_container_width=True)
+                        # Combine and Display
+                        return line_chart + points
+                    show_chart('show_cj_page:chart', build, use_container_width=True)
 
                 else:
                     st.title("Total Sessions by Hour of the Day")
@@ -982,39 +1299,15 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Total sessions: day, month, quarter, year
+        lap("Total sessions: day, month, quarter, year")
         if df_cj is not None and not df_cj.empty:
-            df_cj['day'] = df_cj['Event_Time'].dt.date
-            df_cj['session'] = pd.to_numeric(df_cj['session'], errors='coerce')
-            # Compute session counts
-            session_count_per_customer = df_cj.groupby(['Customer_IP', 'day'])['session'].nunique().reset_index()
-            session_count_per_day = session_count_per_customer.groupby('day')['session'].sum().reset_index()
+            # Precomputed per-day counts, filled up to today at render time
+            session_count_per_day = aggregates['sessions_per_day'].rename(columns={'session': 'session_count'})
             if not session_count_per_day.empty:
-                # Create a complete date range
-                start_date = session_count_per_day['day'].min()
-                end_date = datetime.today().date()
-                full_date_range = pd.date_range(start=start_date, end=end_date)
-
-                # Reindex session_count_per_day to include all dates
-                session_count_per_day.set_index('day', inplace=True)
-                session_count_per_day = session_count_per_day.reindex(full_date_range, fill_value=0).reset_index()
-                session_count_per_day.rename(columns={'index': 'day', 'session': 'session_count'}, inplace=True)
-
-                # Monthly Data
-                session_count_per_day['month'] = session_count_per_day['day'].dt.strftime('%Y-%m')
-                session_count_per_month = session_count_per_day.groupby('month')['session_count'].sum().reset_index()
-
-                # Ensure months are sorted chronologically
-                session_count_per_month['month'] = pd.to_datetime(session_count_per_month['month'], format='%Y-%m')
-                session_count_per_month = session_count_per_month.sort_values(by='month', ascending=True)
-
-                # Quarterly Data
-                session_count_per_day['quarter'] = session_count_per_day['day'].dt.to_period('Q').astype(str)
-                session_count_per_quarter = session_count_per_day.groupby('quarter')[
-                    'session_count'].sum().reset_index()
-
-                # Yearly Data
-                session_count_per_day['Year'] = session_count_per_day['day'].dt.year
-                session_count_per_year = session_count_per_day.groupby('Year')['session_count'].sum().reset_index()
+                (session_count_per_day, session_count_per_month, session_count_per_quarter,
+                 session_count_per_year) = fill_daily_counts(session_count_per_day, 'session_count',
+                                                             datetime.today().date())
+                session_count_per_year = session_count_per_year.rename(columns={'year': 'Year'})
             else:
                 session_count_per_month = None
                 session_count_per_quarter = None
@@ -1029,91 +1322,101 @@ def show_cj_page():
                         unsafe_allow_html=True)
 
             # Radio selection
-            view = st.radio("Select View",
-                            ['Sessions per Day', 'Sessions per Month', 'Sessions per Quarter', 'Sessions per Year'])
-
-            # Sessions per Day
-            if view == 'Sessions per Day' and not session_count_per_day.empty:
-                st.write("### Sessions per Day")
-                chart_day = alt.Chart(session_count_per_day).mark_line().encode(
-                    x=alt.X('day:T', title='Date', axis=alt.Axis(format="%b %d, %Y", labelAngle=90)),
-                    y=alt.Y('session_count:Q', title='Number of Sessions')
-                ).properties(title='Sessions per Day')
-
-                points_day = alt.Chart(session_count_per_day).mark_point(size=60, color='red').encode(
-                    x='day:T', y='session_count:Q', tooltip=['day:T', 'session_count:Q']
-                )
-
-                st.altair_chart(chart_day + points_day, use_container_width=True)
-
-            elif view == 'Sessions per Day':
-                st.title("Sessions per Day")
-                st.markdown(""" 
-                    <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
-                        <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Day ⚠️ No data Available</h3>
-                    </div>
-                """, unsafe_allow_html=True)
-
-            # Sessions per Month
-            if view == 'Sessions per Month' and session_count_per_month is not None:
-                st.write("### Sessions per Month")
-                chart_month = alt.Chart(session_count_per_month).mark_line().encode(
-                    x=alt.X('month:T', title=None, axis=alt.Axis(tickCount=5, format='%b %Y', labelAngle=-90)),
-                    y='session_count:Q'
-                ).properties(title='Sessions per Month')
+            @fragment
+            def sessions_period_chart():
+                view = st.radio("Select View",
+                                ['Sessions per Day', 'Sessions per Month', 'Sessions per Quarter', 'Sessions per Year'])
+
+                # Sessions per Day
+                if view == 'Sessions per Day' and not session_count_per_day.empty:
+                    st.write("### Sessions per Day")
+                    def build():
+                        sessions_plot = chart_series(session_count_per_day, 'day', 'session_count', 'Sessions per Day')
+                        chart_day = alt.Chart(sessions_plot).mark_line().encode(
+                            x=alt.X('day:T', title='Date', axis=alt.Axis(format="%b %d, %Y", labelAngle=90)),
+                            y=alt.Y('session_count:Q', title='Number of Sessions')
+                        ).properties(title='Sessions per Day')
+
+                        points_day = alt.Chart(sessions_plot).mark_point(size=60, color='red').encode(
+                            x='day:T', y='session_count:Q', tooltip=['day:T', 'session_count:Q']
+                        )
+                        return with_points(chart_day, points_day, sessions_plot)
+                    show_chart('sessions_period_chart:chart', build, use_container_width=True)
 
-                points_month = alt.Chart(session_count_per_month).mark_point(size=60, color='red').encode(
-                    x='month:T', y='session_count:Q', tooltip=['month:T', 'session_count:Q']
-                )
+                elif view == 'Sessions per Day':
+                    st.title("Sessions per Day")
+                    st.markdown(""" 
+                        <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                            <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Day ⚠️ No data Available</h3>
+                        </div>
+                    """, unsafe_allow_html=True)
 
-                st.altair_chart(chart_month + points_month, use_container_width=True)
+                # Sessions per Month
+                if view == 'Sessions per Month' and session_count_per_month is not None:
+                    st.write("### Sessions per Month")
+                    def build():
+                        chart_month = alt.Chart(session_count_per_month).mark_line().encode(
+                            x=alt.X('month:T', title=None, axis=alt.Axis(tickCount=5, format='%b %Y', labelAngle=-90)),
+                            y='session_count:Q'
+                        ).properties(title='Sessions per Month')
+
+                        points_month = alt.Chart(session_count_per_month).mark_point(size=60, color='red').encode(
+                            x='month:T', y='session_count:Q', tooltip=['month:T', 'session_count:Q']
+                        )
+                        return chart_month + points_month
+                    show_chart('sessions_period_chart:chart#2', build, use_container_width=True)
 
-            elif view == 'Sessions per Month':
-                st.title("Sessions per Month")
-                st.markdown(""" 
-                    <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
-                        <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Month ⚠️ No data Available</h3>
-                    </div>
-                """, unsafe_allow_html=True)
-            # Sessions per Quarter
-            if view == 'Sessions per Quarter' and session_count_per_quarter is not None:
-                st.write("### Sessions per Quarter")
-                chart_quarter = alt.Chart(session_count_per_quarter).mark_line().encode(
-                    x='quarter:N', y='session_count:Q'
-                ).properties(title='Sessions per Quarter')
-
-                points_quarter = alt.Chart(session_count_per_quarter).mark_point(size=60, color='red').encode(
-                    x='quarter:N', y='session_count:Q', tooltip=['quarter:N', 'session_count:Q']
-                )
-                st.altair_chart(chart_quarter + points_quarter, use_container_width=True)
+                elif view == 'Sessions per Month':
+                    st.title("Sessions per Month")
+                    st.markdown(""" 
+                        <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                            <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Month ⚠️ No data Available</h3>
+                        </div>
+                    """, unsafe_allow_html=True)
+                # Sessions per Quarter
+                if view == 'Sessions per Quarter' and session_count_per_quarter is not None:
+                    st.write("### Sessions per Quarter")
+                    def build():
+                        chart_quarter = alt.Chart(session_count_per_quarter).mark_line().encode(
+                            x='quarter:N', y='session_count:Q'
+                        ).properties(title='Sessions per Quarter')
+
+                        points_quarter = alt.Chart(session_count_per_quarter).mark_point(size=60, color='red').encode(
+                            x='quarter:N', y='session_count:Q', tooltip=['quarter:N', 'session_count:Q']
+                        )
+                        return chart_quarter + points_quarter
+                    show_chart('sessions_period_chart:chart#3', build, use_container_width=True)
 
-            elif view == 'Sessions per Quarter':
-                st.title("Sessions per Quarter")
-                st.markdown(""" 
-                    <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
-                        <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Quarter ⚠️ No data Available</h3>
-                    </div>
-                """, unsafe_allow_html=True)
+                elif view == 'Sessions per Quarter':
+                    st.title("Sessions per Quarter")
+                    st.markdown(""" 
+                        <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                            <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Quarter ⚠️ No data Available</h3>
+                        </div>
+                    """, unsafe_allow_html=True)
 
-            # Sessions per Year
-            if view == 'Sessions per Year' and session_count_per_year is not None:
-                st.write("### Sessions per Year")
-                chart_year = alt.Chart(session_count_per_year).mark_line().encode(
-                    x='Year:N', y='session_count:Q'
-                ).properties(title='Sessions per Year')
+                # Sessions per Year
+                if view == 'Sessions per Year' and session_count_per_year is not None:
+                    st.write("### Sessions per Year")
+                    def build():
+                        chart_year = alt.Chart(session_count_per_year).mark_line().encode(
+                            x='Year:N', y='session_count:Q'
+                        ).properties(title='Sessions per Year')
 
-                points_year = alt.Chart(session_count_per_year).mark_point(size=60, color='red').encode(
-                    x='Year:N', y='session_count:Q', tooltip=['Year:N', 'session_count:Q']
-                )
-                st.altair_chart(chart_year + points_year, use_container_width=True)
+                        points_year = alt.Chart(session_count_per_year).mark_point(size=60, color='red').encode(
+                            x='Year:N', y='session_count:Q', tooltip=['Year:N', 'session_count:Q']
+                        )
+                        return chart_year + points_year
+                    show_chart('sessions_period_chart:chart#4', build, use_container_width=True)
 
-            elif view == 'Sessions per Year':
-                st.title("Sessions per Year")
-                st.markdown(""" 
-                    <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
-                        <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Year ⚠️ No data Available</h3>
-                    </div>
-                """, unsafe_allow_html=True)
+                elif view == 'Sessions per Year':
+                    st.title("Sessions per Year")
+                    st.markdown(""" 
+                        <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                            <h3 style="font-size: 30px; color: white; font-weight: bold;">Sessions per Year ⚠️ No data Available</h3>
+                        </div>
+                    """, unsafe_allow_html=True)
+            sessions_period_chart()
         else:
             st.title("Total sessions: day, month, quarter, year")
             st.markdown(""" 
@@ -1123,6 +1426,7 @@ def show_cj_page():
             """, unsafe_allow_html=True)
 
         # Todo-Total session duration-Average session duration-Least session duration-Highest session duration
+        lap("Total session duration-Average session duration-Least session duration-Highest session duration")
         col1, col2, col3 = st.columns(3)
         if df_cj is not None and not df_cj.empty:
             def convert_seconds(seconds):
@@ -1130,24 +1434,15 @@ def show_cj_page():
                 minutes = int((seconds % 3600) // 60)
                 return f"{hours} hr {minutes} mini"
 
-            df_cj['Event_Time'] = pd.to_datetime(df_cj['Event_Time'])
-            groupby_session = df_cj.groupby(['session', 'Customer_IP']).agg(
-                Time_On_Page=('Time_On_Page', 'sum')
-            ).reset_index()
-
+            duration_kpis = aggregates['duration_kpis']
             # Calculate Overall Sum and Average
-            if not groupby_session.empty and 'Time_On_Page' in groupby_session.columns:
-                overall_sum = convert_seconds(groupby_session['Time_On_Page'].sum())
-                overall_average = convert_seconds(groupby_session['Time_On_Page'].mean())
+            if duration_kpis['total_duration'] is not None:
+                overall_sum = convert_seconds(duration_kpis['total_duration'])
+                overall_average = convert_seconds(duration_kpis['average_duration'])
             else:
                 overall_sum = None
                 overall_average = None
-            # Calculate Average Sessions Per Customer
-            session_count_per_customer = df_cj.groupby('Customer_IP')['session'].max().reset_index()
-            if not session_count_per_customer.empty and 'session' in session_count_per_customer.columns:
-                average_sessions_per_customer = round(session_count_per_customer['session'].mean(), 2)
-            else:
-                average_sessions_per_customer = None
+            average_sessions_per_customer = duration_kpis['average_sessions_per_customer']
             # Column 1: Total Session Duration
             with col1:
                 if overall_sum:
@@ -1242,18 +1537,97 @@ def show_cj_page():
                                     <h3 style="font-size: 30px; color: white; font-weight: bold;">⚠️ No data Available for  Each Customer</h3>
                                 </div>
                                 """, unsafe_allow_html=True)
+        # Todo-Session duration percentiles (p50, p90, p99) from per-day quantile sketches
+        lap("Session duration percentiles (p50, p90, p99) from per-day quantile sketches")
+        if df_cj is not None and not df_cj.empty:
+            session_sketches, event_sketches = aggregates['duration_sketches']
+            if session_sketches:
+                sketch_days = sorted(session_sketches)
+                add_tooltip_css()
+                tooltip_html = render_tooltip(
+                    "Session duration percentiles for the selected date range. Each day keeps a small mergeable quantile sketch, so any date range is combined without sorting every session again. Values are accurate to about 1%.")
+                st.markdown(f"<h1 style='display: inline-block;'>Session Duration Percentiles {tooltip_html}</h1>",
+                            unsafe_allow_html=True)
+                @fragment
+                def session_duration_percentiles():
+                    selected_range = st.date_input("Select Session Duration Date Range",
+                                                   value=(sketch_days[0], sketch_days[-1]),
+                                                   min_value=sketch_days[0], max_value=sketch_days[-1],
+                                                   key="session_duration_range")
+                    range_start, range_end = (selected_range[0], selected_range[-1]) if selected_range else (
+                        sketch_days[0], sketch_days[-1])
+                    session_sketch = computation_cache().get(
+                        ('session_sketch', store_select, data_fingerprint(), range_start, range_end),
+                        lambda: merge_sketches(sketches_in_range(session_sketches, range_start, range_end)))
+
+                    def format_duration(seconds):
+                        return "-" if seconds is None else convert_seconds(seconds)
+
+                    for col, (label, q) in zip(st.columns(3), [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]):
+                        with col:
+                            st.markdown(
+                                f"""
+                                    <div class="card">
+                                        <p>{label} session duration</p>
+                                        <h1>{format_duration(session_sketch.quantile(q))}</h1>
+                                    </div>
+                                """,
+                                unsafe_allow_html=True
+                            )
+                    chart_col1, chart_col2 = st.columns(2)
+                    with chart_col1:
+                        histogram_data = session_sketch.histogram(max_bins=20)
+                        if not histogram_data.empty:
+                            histogram_data['Duration'] = histogram_data.apply(
+                                lambda row: f"{round(row['Lower'])} - {round(row['Upper'])} sec", axis=1)
+                            # Bars span their buckets; the zero durations reach up to the first bucket above zero
+                            zero = histogram_data['Upper'] == 0
+                            above = histogram_data.loc[histogram_data['Lower'] > 0, 'Lower']
+                            histogram_data.loc[zero, 'Upper'] = above.min() if len(above) else 1
+                            st.markdown("<h3 style='text-align: center;'>Session Duration Distribution</h3>",
+                                        unsafe_allow_html=True)
+                            def build():
+                                histogram_chart = alt.Chart(histogram_data).mark_bar().encode(
+                                    x=alt.X('Lower:Q', title='Session Duration (sec)', scale=alt.Scale(type='symlog')),
+                                    x2='Upper:Q',
+                                    y=alt.Y('Count:Q', title='Number of Sessions'),
+                                    color=alt.Color('Count:Q', legend=None),
+                                    tooltip=['Duration:N', 'Count:Q']
+                                ).properties(width=600, height=300)
+                                return histogram_chart
+                            show_chart('session_duration_percentiles:histogram_chart', build, use_container_width=True,
+                                       state=(range_start, range_end))
+                    with chart_col2:
+                        event_rows = []
+                        for event in sorted({key[1] for key in event_sketches}):
+                            event_sketch = merge_sketches(
+                                sketches_in_range(event_sketches, range_start, range_end, by_value=event))
+                            if event_sketch.count:
+                                event_rows.append({
+                                    'Event': event,
+                                    'p50': format_duration(event_sketch.quantile(0.5)),
+                                    'p90': format_duration(event_sketch.quantile(0.9)),
+                                    'p99': format_duration(event_sketch.quantile(0.99)),
+                                })
+                        st.markdown("<h3 style='text-align: center;'>Time on Page Percentiles by Event</h3>",
+                                    unsafe_allow_html=True)
+                        st.dataframe(pd.DataFrame(event_rows), use_container_width=True)
+                session_duration_percentiles()
+            else:
+                st.title("Session Duration Percentiles")
+                st.markdown("""
+                    <div style="border: 2px solid black; padding: 20px; background-color: #454545; border-radius: 10px; text-align: center;">
+                        <h3 style="font-size: 30px; color: white; font-weight: bold;">⚠️ No data Available for Session Duration Percentiles</h3>
+                    </div>
+                """, unsafe_allow_html=True)
+
         # Todo- List of TOP 10 customer on pages with time spent in each Events
+        lap("List of TOP 10 customer on pages with time spent in each Events")
         if df_cj is not None and not df_cj.empty:
-            groupby_session = df_cj.groupby(['session', 'Customer_IP']).agg(
-                Time_On_Page=('Time_On_Page', 'sum'),
-                Event_time=('Event_Time', 'first')
-            ).reset_index()
+            top_5_rows = aggregates['top_sessions']
             # Check if there is data available
-            if not groupby_session.empty and 'Customer_IP' in groupby_session.columns and 'Time_On_Page' in groupby_session.columns:
-                groupby_session['Event_time'] = groupby_session['Event_time'].dt.date
-                top_5_rows = groupby_session.nlargest(10, 'Time_On_Page')
+            if not top_5_rows.empty:
                 top_5_rows['Time_On_Page'] = top_5_rows['Time_On_Page'].apply(convert_seconds)
-                top_5_rows = top_5_rows.drop(columns=['session'])
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "This table displays the top 10 customer sessions based on total time spent on the page. Hover over the rows to view detailed information about each session, including the customer IP, total time on page, and the first event time for each session.")
@@ -1279,8 +1653,9 @@ def show_cj_page():
             """, unsafe_allow_html=True)
 
         # Todo-Viewers with highest number of sessions
+        lap("Viewers with highest number of sessions")
         if df_cj is not None and not df_cj.empty:
-            max_session_per_ip = df_cj.groupby('Customer_IP')['session'].max().reset_index()
+            max_session_per_ip = aggregates['max_sessions_per_ip']
             if not max_session_per_ip.empty and 'Customer_IP' in max_session_per_ip.columns and 'session' in max_session_per_ip.columns:
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
@@ -1289,39 +1664,44 @@ def show_cj_page():
                     f"<h1 style='display: inline-block;'>Maximum Sessions per Customer IP {tooltip_html}</h1>",
                     unsafe_allow_html=True
                 )
-                top_n = st.slider("Select Top N IPs to Display", min_value=1, max_value=50, value=10)
-                top_n_ip = max_session_per_ip.nlargest(top_n, 'session')
-                st.markdown("<h3 style='text-align: center;'>Maximum Sessions per Customer IP</h3>",
-                            unsafe_allow_html=True)
+                @fragment
+                def top_ips_chart():
+                    top_n = st.slider("Select Top N IPs to Display", min_value=1, max_value=50, value=10)
+                    top_n_ip = max_session_per_ip.nlargest(top_n, 'session')
+                    st.markdown("<h3 style='text-align: center;'>Maximum Sessions per Customer IP</h3>",
+                                unsafe_allow_html=True)
 
-                # Create the bar chart
-                chart = alt.Chart(top_n_ip).mark_bar().encode(
-                    x=alt.X("Customer_IP:N", title="Customer IP", sort="-y"),
-                    y=alt.Y("session:Q", title="Max Session"),
-                    color=alt.Color("session:Q", legend=None),
-                    tooltip=["Customer_IP", "session"]
-                ).properties(
-                    width=700,
-                    height=400,
-                    title="Maximum Sessions per Customer IP"
-                )
+                    # Create the bar chart
+                    def build():
+                        chart = alt.Chart(top_n_ip).mark_bar().encode(
+                            x=alt.X("Customer_IP:N", title="Customer IP", sort="-y"),
+                            y=alt.Y("session:Q", title="Max Session"),
+                            color=alt.Color("session:Q", legend=None),
+                            tooltip=["Customer_IP", "session"]
+                        ).properties(
+                            width=700,
+                            height=400,
+                            title="Maximum Sessions per Customer IP"
+                        )
 
-                text = chart.mark_text(
-                    align='center',
-                    baseline='middle',
-                    dy=-10,
-                    fontSize=12
-                ).encode(
-                    text='session:Q'
-                )
-                final_chart = chart + text
+                        text = chart.mark_text(
+                            align='center',
+                            baseline='middle',
+                            dy=-10,
+                            fontSize=12
+                        ).encode(
+                            text='session:Q'
+                        )
+                        final_chart = chart + text
 
-                final_chart = final_chart.configure_axis(
-                    labelAngle=0,  # Horizontal x-axis labels
-                    labelFontSize=12,
-                    titleFontSize=14
-                )
-                st.altair_chart(final_chart, use_container_width=True)
+                        final_chart = final_chart.configure_axis(
+                            labelAngle=0,  # Horizontal x-axis labels
+                            labelFontSize=12,
+                            titleFontSize=14
+                        )
+                        return final_chart
+                    show_chart('top_ips_chart:final_chart', build, use_container_width=True)
+                top_ips_chart()
 
             else:
                 st.title("Maximum Sessions per Customer IP")
@@ -1338,15 +1718,12 @@ def show_cj_page():
                 </div>
             """, unsafe_allow_html=True)
         # Todo-Most viewed product and collections logic (same as your current code)
+        lap("Most viewed product and collections logic (same as your current code)")
         # Group the data by 'Product_Name' and 'Collection_Name'
         chart_col1, chart_col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
-            df_product_grouped = df_cj.groupby('Product_Name')['Customer_IP'].nunique().reset_index()
-            df_product_grouped.rename(columns={'Customer_IP': 'Unique_Visitors'}, inplace=True)
-            df_product_sorted = df_product_grouped.sort_values('Unique_Visitors', ascending=False)
-            df_collection_grouped = df_cj.groupby('Collection_Name')['Customer_IP'].nunique().reset_index()
-            df_collection_grouped.rename(columns={'Customer_IP': 'Unique_Visitors'}, inplace=True)
-            df_collection_sorted = df_collection_grouped.sort_values('Unique_Visitors', ascending=False)
+            df_product_grouped = df_product_sorted = aggregates['product_visitors']
+            df_collection_grouped = df_collection_sorted = aggregates['collection_visitors']
             # Create two columns for displaying charts
 
             # Check if 'Product_Name' column exists and has data
@@ -1358,38 +1735,43 @@ def show_cj_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Most Popular Products by Unique Visitors {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    top_n_products = st.slider("Select Top N Products to Display", min_value=1, max_value=50, value=10)
-                    df_top_n_product = df_product_sorted.head(top_n_products)
-                    st.markdown("<h3 style='text-align: center;'>Top N Most Popular Products</h3>",
-                                unsafe_allow_html=True)
-
-                    # Create the chart for products
-                    product_chart = alt.Chart(df_top_n_product).mark_bar().encode(
-                        x=alt.X('Product_Name:N', title='Product Name',
-                                sort=df_top_n_product['Unique_Visitors'].tolist(),
-                                axis=alt.Axis(labelAngle=90)),
-                        y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
-                        color=alt.Color('Unique_Visitors:Q', legend=None),
-                        tooltip=['Product_Name:N', 'Unique_Visitors:Q']
-                    ).properties(width=600, height=300, title="Top N Most Popular Products by Unique Visitors")
-
-                    # Adding text labels on the bars
-                    product_text = product_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,
-                        fontSize=12
-                    ).encode(
-                        text='Unique_Visitors:Q'
-                    )
+                    @fragment
+                    def most_viewed_products_chart():
+                        top_n_products = st.slider("Select Top N Products to Display", min_value=1, max_value=50, value=10)
+                        df_top_n_product = df_product_sorted.head(top_n_products)
+                        st.markdown("<h3 style='text-align: center;'>Top N Most Popular Products</h3>",
+                                    unsafe_allow_html=True)
 
-                    product_chart = product_chart + product_text
-                    product_chart = product_chart.configure_axis(
-                        labelAngle=90,
-                        labelFontSize=12,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(product_chart, use_container_width=True)
+                        # Create the chart for products
+                        def build():
+                            product_chart = alt.Chart(df_top_n_product).mark_bar().encode(
+                                x=alt.X('Product_Name:N', title='Product Name',
+                                        sort=df_top_n_product['Unique_Visitors'].tolist(),
+                                        axis=alt.Axis(labelAngle=90)),
+                                y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
+                                color=alt.Color('Unique_Visitors:Q', legend=None),
+                                tooltip=['Product_Name:N', 'Unique_Visitors:Q']
+                            ).properties(width=600, height=300, title="Top N Most Popular Products by Unique Visitors")
+
+                            # Adding text labels on the bars
+                            product_text = product_chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,
+                                fontSize=12
+                            ).encode(
+                                text='Unique_Visitors:Q'
+                            )
+
+                            product_chart = product_chart + product_text
+                            product_chart = product_chart.configure_axis(
+                                labelAngle=90,
+                                labelFontSize=12,
+                                titleFontSize=16
+                            )
+                            return product_chart
+                        show_chart('most_viewed_products_chart:product_chart', build, use_container_width=True)
+                    most_viewed_products_chart()
             else:
                 with chart_col1:
                     st.title("Most Popular Products by Unique Visitors")
@@ -1407,39 +1789,44 @@ def show_cj_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Most Popular Collections by Unique Visitors {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    top_n_collections = st.slider("Select Top N Collections to Display", min_value=1, max_value=50,
-                                                  value=10)
-                    df_top_n_collection = df_collection_sorted.head(top_n_collections)
-                    st.markdown("<h3 style='text-align: center;'>Top N Most Popular Collections</h3>",
-                                unsafe_allow_html=True)
-
-                    # Create the chart for collections
-                    collection_chart = alt.Chart(df_top_n_collection).mark_bar().encode(
-                        x=alt.X('Collection_Name:N', title='Collection Name',
-                                sort=df_top_n_collection['Unique_Visitors'].tolist(),
-                                axis=alt.Axis(labelAngle=90)),
-                        y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
-                        color=alt.Color('Unique_Visitors:Q', legend=None),
-                        tooltip=['Collection_Name:N', 'Unique_Visitors:Q']
-                    ).properties(width=600, height=300, title="Top N Most Popular Collections by Unique Visitors")
-
-                    # Adding text labels on the bars
-                    collection_text = collection_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,
-                        fontSize=12
-                    ).encode(
-                        text='Unique_Visitors:Q'
-                    )
+                    @fragment
+                    def most_viewed_collections_chart():
+                        top_n_collections = st.slider("Select Top N Collections to Display", min_value=1, max_value=50,
+                                                      value=10)
+                        df_top_n_collection = df_collection_sorted.head(top_n_collections)
+                        st.markdown("<h3 style='text-align: center;'>Top N Most Popular Collections</h3>",
+                                    unsafe_allow_html=True)
 
-                    collection_chart = collection_chart + collection_text
-                    collection_chart = collection_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=14,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(collection_chart, use_container_width=True)
+                        # Create the chart for collections
+                        def build():
+                            collection_chart = alt.Chart(df_top_n_collection).mark_bar().encode(
+                                x=alt.X('Collection_Name:N', title='Collection Name',
+                                        sort=df_top_n_collection['Unique_Visitors'].tolist(),
+                                        axis=alt.Axis(labelAngle=90)),
+                                y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
+                                color=alt.Color('Unique_Visitors:Q', legend=None),
+                                tooltip=['Collection_Name:N', 'Unique_Visitors:Q']
+                            ).properties(width=600, height=300, title="Top N Most Popular Collections by Unique Visitors")
+
+                            # Adding text labels on the bars
+                            collection_text = collection_chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,
+                                fontSize=12
+                            ).encode(
+                                text='Unique_Visitors:Q'
+                            )
+
+                            collection_chart = collection_chart + collection_text
+                            collection_chart = collection_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=14,
+                                titleFontSize=16
+                            )
+                            return collection_chart
+                        show_chart('most_viewed_collections_chart:collection_chart', build, use_container_width=True)
+                    most_viewed_collections_chart()
             else:
                 with chart_col2:
                     st.title("Most Popular Collections by Unique Visitors")
@@ -1465,23 +1852,21 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Product Name Most add to card in chart
+        lap("Product Name Most add to card in chart")
         chart_col1, chart_col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
-            df_cart_add = df_cj[df_cj['Event'] == 'Cart Add']
-            df_grouped_cart_add = df_cart_add.groupby('Product_Name')['Customer_IP'].nunique().reset_index()
-            df_grouped_cart_add.rename(columns={'Customer_IP': 'Unique_Visitors'}, inplace=True)
+            df_grouped_cart_add = aggregates['cart_add_visitors']
             with chart_col1:
-                if not df_cj['Search_Term'].dropna().empty:  # Check if there are any search terms
+                search_term_counts = aggregates['search_terms']
+                if not search_term_counts.empty:  # Check if there are any search terms
                     st.markdown("<h3 style='text-align: center;'>Most Searched Terms</h3>", unsafe_allow_html=True)
-                    search_terms = df_cj['Search_Term'].dropna().astype(str)  # Ensure no NaN values and all are strings
-                    search_term_counts = search_terms.value_counts()
-                    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(
-                        search_term_counts)
-                    image = wordcloud.to_image()
-                    image_stream = io.BytesIO()
-                    image.save(image_stream, format='PNG')
-                    image_stream.seek(0)
-                    st.image(image_stream, use_container_width=True)
+                    # Rendered in the background, a new image is drawn at the end of the page when it is ready
+                    wordcloud = wordcloud_png(search_term_counts, width=800, height=400)
+                    if wordcloud.done():
+                        st.image(wordcloud.result(), use_container_width=True)
+                    else:
+                        wordcloud_slot = st.empty()
+                        wordcloud_slot.markdown("Rendering the word cloud...")
                 else:
                     st.title("Most Searched Terms")
                     st.markdown("""
@@ -1490,52 +1875,57 @@ def show_cj_page():
                         </div>
                     """, unsafe_allow_html=True)
             with chart_col2:
-                if not df_cart_add.empty and 'Product_Name' in df_cart_add.columns:
+                if not df_grouped_cart_add.empty:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "This chart displays the top N products that were most frequently added to the cart, based on the number of unique visitors. The x-axis represents the product names, and the y-axis shows the count of unique visitors who added those products to their cart. Use the slider above to adjust the number of top products displayed. Hover over the bars to see detailed information about the number of unique visitors for each product.")
                     st.markdown(f"<h1 style='display: inline-block;'>Most Added Products to Cart {tooltip_html}</h1>",
                                 unsafe_allow_html=True)
-                    top_n_products = st.slider("Select Top N Products to Display", min_value=10, max_value=50, value=10)
-                    st.markdown(
-                        f"<h3 style='text-align: center;'>Top {top_n_products} Most Added Products to Cart</h3>",
-                        unsafe_allow_html=True)
-                    # Adjust filtering logic to reflect slider value
-                    df_top_n_cart_add = df_grouped_cart_add.sort_values('Unique_Visitors', ascending=False).head(
-                        top_n_products)
-
-                    # Modify the color encoding to use Unique_Visitors for coloring the bars
-                    cart_add_chart = alt.Chart(df_top_n_cart_add).mark_bar().encode(
-                        x=alt.X('Product_Name:N', title='Product Name',
-                                sort=df_top_n_cart_add['Unique_Visitors'].tolist(),
-                                axis=alt.Axis(labelAngle=90)),  # Rotate labels to 90 degrees for readability
-                        y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
-                        color=alt.Color('Unique_Visitors:Q', legend=None),
-                        # Color bars based on the Unique Visitors count
-                        tooltip=['Product_Name:N', 'Unique_Visitors:Q']
-                    ).properties(width=600, height=300, title="Top N Most Added Products to Cart by Unique Visitors")
-
-                    # Add labels on top of the bars (number of unique visitors)
-                    text = cart_add_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust label position
-                        fontSize=12
-                    ).encode(
-                        text='Unique_Visitors:Q'
-                    )
-                    # Combine the bar chart and text labels
-                    cart_add_chart = cart_add_chart + text
-
-                    # Configure the axis for better readability
-                    cart_add_chart = cart_add_chart.configure_axis(
-                        labelAngle=0,  # Set the angle of the axis labels (x-axis) to 0 degrees
-                        labelFontSize=14,  # Increase font size of labels
-                        titleFontSize=16  # Increase font size of axis title
-                    )
-
-                    # Display the chart
-                    st.altair_chart(cart_add_chart, use_container_width=True)
+                    @fragment
+                    def cart_add_products_chart():
+                        top_n_products = st.slider("Select Top N Products to Display", min_value=10, max_value=50, value=10)
+                        st.markdown(
+                            f"<h3 style='text-align: center;'>Top {top_n_products} Most Added Products to Cart</h3>",
+                            unsafe_allow_html=True)
+                        # Adjust filtering logic to reflect slider value
+                        def build():
+                            df_top_n_cart_add = df_grouped_cart_add.sort_values('Unique_Visitors', ascending=False).head(
+                                top_n_products)
+
+                            # Modify the color encoding to use Unique_Visitors for coloring the bars
+                            cart_add_chart = alt.Chart(df_top_n_cart_add).mark_bar().encode(
+                                x=alt.X('Product_Name:N', title='Product Name',
+                                        sort=df_top_n_cart_add['Unique_Visitors'].tolist(),
+                                        axis=alt.Axis(labelAngle=90)),  # Rotate labels to 90 degrees for readability
+                                y=alt.Y('Unique_Visitors:Q', title='Unique Visitors'),
+                                color=alt.Color('Unique_Visitors:Q', legend=None),
+                                # Color bars based on the Unique Visitors count
+                                tooltip=['Product_Name:N', 'Unique_Visitors:Q']
+                            ).properties(width=600, height=300, title="Top N Most Added Products to Cart by Unique Visitors")
+
+                            # Add labels on top of the bars (number of unique visitors)
+                            text = cart_add_chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,  # Adjust label position
+                                fontSize=12
+                            ).encode(
+                                text='Unique_Visitors:Q'
+                            )
+                            # Combine the bar chart and text labels
+                            cart_add_chart = cart_add_chart + text
+
+                            # Configure the axis for better readability
+                            cart_add_chart = cart_add_chart.configure_axis(
+                                labelAngle=0,  # Set the angle of the axis labels (x-axis) to 0 degrees
+                                labelFontSize=14,  # Increase font size of labels
+                                titleFontSize=16  # Increase font size of axis title
+                            )
+
+                            # Display the chart
+                            return cart_add_chart
+                        show_chart('cart_add_products_chart:cart_add_chart', build, use_container_width=True)
+                    cart_add_products_chart()
                 else:
                     st.title("Most Added Products to Cart")
                     st.markdown("""
@@ -1559,18 +1949,13 @@ def show_cj_page():
                     </div>
                 """, unsafe_allow_html=True)
         # Todo- Total add to cart product count--------------------------------------
+        lap("Total add to cart product count")
 
         col1 = st.columns(1)[0]
         # Check if data for 'Cart Add' event and 'Customer_IP' column is available
         if df_cj is not None and not df_cj.empty:
             if not df_cj.empty and 'Event' in df_cj.columns and 'Customer_IP' in df_cj.columns:
-                df_cart_add = df_cj[df_cj['Event'] == 'Cart Add']
-                df_grouped_cart_add = (
-                    df_cart_add.groupby('Product_Name')['Customer_IP']
-                    .nunique()
-                    .reset_index()
-                    .rename(columns={'Customer_IP': 'Unique_Visitors'})
-                )
+                df_grouped_cart_add = aggregates['cart_add_visitors']
                 total_unique_visitors = df_grouped_cart_add['Unique_Visitors'].sum()
 
                 with col1:
@@ -1604,16 +1989,13 @@ def show_cj_page():
             """, unsafe_allow_html=True)
 
         # Todo- Avg time spent on each page and Total time spent on each page
+        lap("Avg time spent on each page and Total time spent on each page")
         col1, col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
-            df_cj['Time_On_Page'] = pd.to_numeric(df_cj['Time_On_Page'], errors='coerce')
-            events = ['Cart', 'Home', 'Product', 'Collection']
-            filtered_df = df_cj[df_cj['Event'].isin(events)]
+            avg_time_per_event, Total_time_spent = aggregates['time_per_event']
             # Check if there is data available for the events
-            if not filtered_df.empty and 'Event' in filtered_df.columns and 'Time_On_Page' in filtered_df.columns:
-                avg_time_per_event = filtered_df.groupby('Event')['Time_On_Page'].mean().reset_index()
+            if not avg_time_per_event.empty:
                 avg_time_per_event['Time_On_Page_Display'] = avg_time_per_event['Time_On_Page'].apply(convert_seconds)
-                Total_time_spent = filtered_df.groupby('Event')['Time_On_Page'].sum().reset_index()
                 Total_time_spent['Time_On_Page_Display'] = Total_time_spent['Time_On_Page'].apply(convert_seconds)
                 with col1:
                     add_tooltip_css()
@@ -1621,16 +2003,18 @@ def show_cj_page():
                         "This pie chart displays the average time spent on each event (Cart, Home, Product, Collection). The size of each segment represents the average time spent on that event, and the color differentiates between event types. Hover over the segments to see the average time spent on each event, displayed in a human-readable format.")
                     st.markdown(f"<h1 style='display: inline-block;'>Avg Time Spent on Each Event {tooltip_html}</h1>",
                                 unsafe_allow_html=True)
-                    pie_chart_avg = alt.Chart(avg_time_per_event).mark_arc().encode(
-                        theta='Time_On_Page:Q',
-                        color='Event:N',
-                        tooltip=['Event:N', 'Time_On_Page_Display:N']
-                    ).properties(
-                        title="Average Time Spent on Each Event",
-                        width=350,
-                        height=350
-                    )
-                    st.altair_chart(pie_chart_avg, use_container_width=True)
+                    def build():
+                        pie_chart_avg = alt.Chart(avg_time_per_event).mark_arc().encode(
+                            theta='Time_On_Page:Q',
+                            color='Event:N',
+                            tooltip=['Event:N', 'Time_On_Page_Display:N']
+                        ).properties(
+                            title="Average Time Spent on Each Event",
+                            width=350,
+                            height=350
+                        )
+                        return pie_chart_avg
+                    show_chart('show_cj_page:pie_chart_avg', build, use_container_width=True)
                 # Column 2: Total Time Spent on Each Event
                 with col2:
                     add_tooltip_css()
@@ -1639,16 +2023,18 @@ def show_cj_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Total Time Spent on Each Event {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    pie_chart_total = alt.Chart(Total_time_spent).mark_arc().encode(
-                        theta='Time_On_Page:Q',
-                        color='Event:N',
-                        tooltip=['Event:N', 'Time_On_Page_Display:N']
-                    ).properties(
-                        title="Total Time Spent on Each Event",
-                        width=350,
-                        height=350
-                    )
-                    st.altair_chart(pie_chart_total, use_container_width=True)
+                    def build():
+                        pie_chart_total = alt.Chart(Total_time_spent).mark_arc().encode(
+                            theta='Time_On_Page:Q',
+                            color='Event:N',
+                            tooltip=['Event:N', 'Time_On_Page_Display:N']
+                        ).properties(
+                            title="Total Time Spent on Each Event",
+                            width=350,
+                            height=350
+                        )
+                        return pie_chart_total
+                    show_chart('show_cj_page:pie_chart_total', build, use_container_width=True)
         else:
             with col1:
                 st.title("Average Time Spent on Each Event")
@@ -1667,6 +2053,7 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Time_Spend on Each Product ID with Product Name------------------------------------------
+        lap("Time_Spend on Each Product ID with Product Name")
 
         chart_col1, chart_col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
@@ -1675,12 +2062,7 @@ def show_cj_page():
                 # time_spent_per_product = df_cj.groupby(['Product_ID', 'Product_Name'])['Time_On_Page'].sum().reset_index()
                 # if not df_cj.empty and 'Product_ID' in df_cj.columns and 'Time_On_Page' in df_cj.columns and not time_spent_per_product.empty:
                 if not df_cj.empty and 'Product_ID' in df_cj.columns and 'Time_On_Page' in df_cj.columns:
-                    df_cj['Product_ID'] = df_cj['Product_ID'].fillna('Unknown').astype(str).replace(".0", "",
-                                                                                                    regex=True)
-                    time_spent_per_product = df_cj.groupby(['Product_ID', 'Product_Name'])[
-                        'Time_On_Page'].sum().reset_index()
-                    time_spent_per_product_sorted = time_spent_per_product.sort_values(by='Time_On_Page',
-                                                                                       ascending=False)
+                    time_spent_per_product_sorted = aggregates['time_per_product']
                     time_spent_per_product_sorted['Time_On_Page'] = time_spent_per_product_sorted['Time_On_Page'].apply(
                         convert_seconds)
                     add_tooltip_css()
@@ -1705,9 +2087,7 @@ def show_cj_page():
                 # time_spent_per_product_sorted = time_spent_per_product.sort_values(by='Time_On_Page', ascending=False)
                 # if not df_cj.empty and 'Collection_Name' in df_cj.columns and 'Time_On_Page' in df_cj.columns and not time_spent_per_product_sorted.empty:
                 if not df_cj.empty and 'Collection_Name' in df_cj.columns and 'Time_On_Page' in df_cj.columns:
-                    time_spent_per_product = df_cj.groupby(['Collection_Name'])['Time_On_Page'].sum().reset_index()
-                    time_spent_per_product_sorted = time_spent_per_product.sort_values(by='Time_On_Page',
-                                                                                       ascending=False)
+                    time_spent_per_product_sorted = aggregates['time_per_collection']
                     time_spent_per_product_sorted['Time_On_Page'] = time_spent_per_product_sorted['Time_On_Page'].apply(
                         convert_seconds)
                     add_tooltip_css()
@@ -1742,13 +2122,11 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo- Viewers On Each Page
+        lap("Viewers On Each Page")
         if df_cj is not None and not df_cj.empty:
-            events = ['Cart', 'Home', 'Product', 'Collection']
-            filtered_df = df_cj[df_cj['Event'].isin(events)]
+            viewer_counts = aggregates['viewers_per_page']
 
-            if not filtered_df.empty:
-                viewer_counts = filtered_df.groupby("Event")["Customer_IP"].nunique().reset_index()
-                viewer_counts.columns = ["Event", "Total Viewers"]
+            if not viewer_counts.empty:
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "This bar chart displays the total number of viewers for each page or event. The x-axis represents the different pages or events, and the y-axis shows the total viewers count. Hover over the bars to see the exact number of viewers for each page/event. The bars are color-coded based on the total viewers count to give a visual cue of viewer distribution."
@@ -1757,30 +2135,31 @@ def show_cj_page():
                             unsafe_allow_html=True)
                 st.markdown("<h3 style='text-align: center;'>Viewers by Page</h3>", unsafe_allow_html=True)
 
-                page_chart = alt.Chart(viewer_counts).mark_bar().encode(
-                    x=alt.X('Event:N', title='Page/Event', sort=viewer_counts['Event'].tolist()),
-                    y=alt.Y('Total Viewers:Q', title='Total Viewers'),
-                    color=alt.Color('Total Viewers:Q', legend=None),  # Color bars based on the 'Total Viewers' count
-                    tooltip=['Event:N', 'Total Viewers:Q']
-                ).properties(width=600, height=300, title="Viewers by Page")
-
-                page_text = page_chart.mark_text(
-                    align='center',
-                    baseline='middle',
-                    dy=-10,  # Adjust label position
-                    fontSize=12
-                ).encode(
-                    text='Total Viewers:Q'
-                )
+                def build():
+                    page_chart = alt.Chart(viewer_counts).mark_bar().encode(
+                        x=alt.X('Event:N', title='Page/Event', sort=viewer_counts['Event'].tolist()),
+                        y=alt.Y('Total Viewers:Q', title='Total Viewers'),
+                        color=alt.Color('Total Viewers:Q', legend=None),  # Color bars based on the 'Total Viewers' count
+                        tooltip=['Event:N', 'Total Viewers:Q']
+                    ).properties(width=600, height=300, title="Viewers by Page")
 
-                page_chart = page_chart + page_text
-                page_chart = page_chart.configure_axis(
-                    labelAngle=0,
-                    labelFontSize=14,
-                    titleFontSize=16
-                )
+                    page_text = page_chart.mark_text(
+                        align='center',
+                        baseline='middle',
+                        dy=-10,  # Adjust label position
+                        fontSize=12
+                    ).encode(
+                        text='Total Viewers:Q'
+                    )
 
-                st.altair_chart(page_chart, use_container_width=True)
+                    page_chart = page_chart + page_text
+                    page_chart = page_chart.configure_axis(
+                        labelAngle=0,
+                        labelFontSize=14,
+                        titleFontSize=16
+                    )
+                    return page_chart
+                show_chart('show_cj_page:page_chart', build, use_container_width=True)
 
             else:
                 st.title("Total Viewers on Each Page")
@@ -1798,19 +2177,11 @@ def show_cj_page():
             """, unsafe_allow_html=True)
 
         # Todo -Bounce Rate of each Customer who spend time less then 30 second
+        lap("Bounce Rate of each Customer who spend time less then 30 second")
         chart_col1, chart_col2 = st.columns(2)
         if df_cj is not None and not df_cj.empty:
-            customer_time = df_cj.groupby('Customer_IP')['Time_On_Page'].sum().reset_index()
-            if not customer_time.empty:
-                filtered_customer_time = customer_time[customer_time['Time_On_Page'] < 30]
-                total_customers = customer_time['Customer_IP'].nunique()
-                customers_under_30_seconds = filtered_customer_time['Customer_IP'].nunique()
-
-                if total_customers > 0:
-                    percentage = (customers_under_30_seconds / total_customers) * 100
-                else:
-                    percentage = 0  # Avoid division by zero
-                percentage = round(percentage, 2)
+            percentage = aggregates['bounce_rate_under_30']
+            if percentage is not None:
                 # Streamlit layout for charts
                 # Viewers by Event chart
                 with chart_col1:
@@ -1848,25 +2219,9 @@ def show_cj_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Bounce Rate(%) by Event Type-------------------------------------------
+        lap("Bounce Rate(%) by Event Type")
         if df_cj is not None and not df_cj.empty:
-            events = ['Cart', 'Home', 'Product', 'Collection']
-            filtered_df = df_cj[df_cj['Event'].isin(events)]
-            filtered_df = filtered_df.sort_values(by=['Customer_IP', 'session'], ascending=True)
-            last_session_df = filtered_df.drop_duplicates(subset=['Customer_IP', 'session'], keep='last')
-            bounce_df = last_session_df[last_session_df['Time_On_Page'] < 10]
-            bounce_rate_by_event = {}
-            # Calculate bounce rates
-            for event in events:
-                total_events_event_count = df_cj[df_cj['Event'] == event]['Customer_IP'].nunique()
-                bounce_events_event_count = bounce_df[bounce_df['Event'] == event]['Customer_IP'].nunique()
-                bounce_rate_percentage = (
-                                                 bounce_events_event_count / total_events_event_count) * 100 if total_events_event_count > 0 else 0
-                bounce_rate_by_event[event] = bounce_rate_percentage
-            # Convert bounce rates dictionary to DataFrame
-            bounce_rate_df = pd.DataFrame(list(bounce_rate_by_event.items()), columns=['Event', 'Bounce Rate'])
-            bounce_rate_df['Bounce Rate'] = bounce_rate_df['Bounce Rate'].round(2)
-            # Filter out events with a zero bounce rate (if you want)
-            bounce_rate_df = bounce_rate_df[bounce_rate_df['Bounce Rate'] > 0]
+            bounce_rate_df = aggregates['bounce_rate_by_event']
             # If there is valid bounce rate data
             if not bounce_rate_df.empty:
                 with chart_col2:
@@ -1877,29 +2232,31 @@ def show_cj_page():
                                 unsafe_allow_html=True)
 
                     # Create the Altair chart
-                    bounce_chart = alt.Chart(bounce_rate_df).mark_bar().encode(
-                        x=alt.X('Event:N', title='Event Type', sort=bounce_rate_df['Event'].tolist()),
-                        y=alt.Y('Bounce Rate:Q', title='Bounce Rate (%)'),
-                        color=alt.Color('Bounce Rate:Q', legend=None),
-                        tooltip=['Event:N', 'Bounce Rate:Q']
-                    ).properties(width=600, height=300, title="Bounce Rate by Event Type")
-
-                    bounce_text = bounce_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust label position
-                        fontSize=12
-                    ).encode(
-                        text='Bounce Rate:Q'
-                    )
+                    def build():
+                        bounce_chart = alt.Chart(bounce_rate_df).mark_bar().encode(
+                            x=alt.X('Event:N', title='Event Type', sort=bounce_rate_df['Event'].tolist()),
+                            y=alt.Y('Bounce Rate:Q', title='Bounce Rate (%)'),
+                            color=alt.Color('Bounce Rate:Q', legend=None),
+                            tooltip=['Event:N', 'Bounce Rate:Q']
+                        ).properties(width=600, height=300, title="Bounce Rate by Event Type")
+
+                        bounce_text = bounce_chart.mark_text(
+                            align='center',
+                            baseline='middle',
+                            dy=-10,  # Adjust label position
+                            fontSize=12
+                        ).encode(
+                            text='Bounce Rate:Q'
+                        )
 
-                    bounce_chart = bounce_chart + bounce_text
-                    bounce_chart = bounce_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=14,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(bounce_chart)
+                        bounce_chart = bounce_chart + bounce_text
+                        bounce_chart = bounce_chart.configure_axis(
+                            labelAngle=0,
+                            labelFontSize=14,
+                            titleFontSize=16
+                        )
+                        return bounce_chart
+                    show_chart('show_cj_page:bounce_chart', build)
 
             # Else: No valid bounce rate data
             else:
@@ -1918,6 +2275,12 @@ def show_cj_page():
                         <h3 style="font-size: 30px; color: white; font-weight: bold;">Customers Rate Under 30 Seconds - ⚠️ No data Available</h3>
                     </div>
                 """, unsafe_allow_html=True)
+        # Todo- Customer Journey Data, into its placeholder at the top
+        lap("Customer Journey Data")
+        with journey_slot.container():
+            show_journey_data(filtered_cj if df_cj is not None and not df_cj.empty else None)
+        if wordcloud_slot is not None:
+            wordcloud_slot.image(wordcloud.result(), use_container_width=True)
 
     except:
         st.markdown(
@@ -1942,11 +2305,13 @@ def show_order_data_page():
     )
     add_custom_css()
     try:
+        aggregates = page_aggregates('Order Data')
         # Todo- Card Creation for the above -----------------------------------
+        lap("Card Creation for the above")
         col1 = st.columns(1)[0]
         with col1:
             if df_orders is not None and not df_orders.empty:
-                total_listed_customers = df_orders['Order_ID'].nunique()
+                total_listed_customers = aggregates['kpis']['unique_orders']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(f"Total number of unique orders placed: {total_listed_customers}")
                 st.markdown(f"<h1 style='display: inline-block;'>Unique Orders {tooltip_html}</h1>",
@@ -1970,9 +2335,9 @@ def show_order_data_page():
                 tooltip_html = render_tooltip("Preview of customer order data filtered by the selected date range.")
                 st.markdown(f"<h1 style='display: inline-block;'>Preview Filtered Order Data {tooltip_html}</h1>",
                             unsafe_allow_html=True)
-                filtered_orders = filter_by_date(df_orders, 'Order_Created_At')
+                filtered_orders, date_range = filter_by_date(df_orders, 'Order_Created_At', dataset='Orders_Dataset')
                 st.subheader("Customer Order Data")
-                st.dataframe(filtered_orders)
+                show_paginated_table(filtered_orders, 'filtered_orders', date_range=date_range)
             else:
                 st.title("Preview of customer order data filtered by the selected date range")
                 st.markdown("""
@@ -1982,31 +2347,20 @@ def show_order_data_page():
                             """, unsafe_allow_html=True)
 
         # Todo----Total orders placed: Weekday vs Weekend
+        lap("Total orders placed: Weekday vs Weekend")
         try:
             col1, col2 = st.columns(2)
             if df_orders is not None and not df_orders.empty:
 
-                df_orders_ = df_orders.groupby('Order_ID').agg({'Order_Created_At': 'first'})
-                df_orders_['Order_Created_At'] = pd.to_datetime(df_orders_['Order_Created_At'], errors='coerce',
-                                                                utc=True)
-                df_orders_['Weekday_Weekend'] = df_orders_['Order_Created_At'].dt.dayofweek.apply(
-                    lambda x: 'Weekend' if x >= 5 else 'Weekday')
-                weekday_count = df_orders_[df_orders_['Weekday_Weekend'] == 'Weekday'].shape[0]
-                weekend_count = df_orders_[df_orders_['Weekday_Weekend'] == 'Weekend'].shape[0]
-                counts = [weekday_count, weekend_count]
-                labels = ['Weekday', 'Weekend']
-                pie_data = pd.DataFrame({
-                    'Category': labels,
-                    'Count': counts,
-                    'Percentage': [(count / sum(counts)) * 100 for count in counts]  # Calculate percentage
-                })
+                pie_data = aggregates['weekday_weekend']
                 pie_data['Label'] = pie_data['Percentage'].round(1).astype(str) + '%'
                 # Plotting the Pie Chart
-                pie_chart = alt.Chart(pie_data).mark_arc().encode(
-                    theta=alt.Theta(field="Count", type="quantitative"),
-                    color=alt.Color(field="Category", type="nominal"),
-                    tooltip=["Category", "Count", "Percentage"],  # Show both count and percentage in tooltip
-                )
+                def build_pie_chart():
+                    return alt.Chart(pie_data).mark_arc().encode(
+                        theta=alt.Theta(field="Count", type="quantitative"),
+                        color=alt.Color(field="Category", type="nominal"),
+                        tooltip=["Category", "Count", "Percentage"],  # Show both count and percentage in tooltip
+                    )
                 with col1:
                     # st.write(f"Weekday Count: {weekday_count} ({(weekday_count / sum(counts)) * 100:.2f}%)")
                     # st.write(f"Weekend Count: {weekend_count} ({(weekend_count / sum(counts)) * 100:.2f}%)")
@@ -2016,38 +2370,30 @@ def show_order_data_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Total orders placed: Weekday vs Weekend {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    st.altair_chart(pie_chart, use_container_width=True)
+                    show_chart('show_order_data_page:pie_chart', build_pie_chart, use_container_width=True)
 
-                df_orders_ = df_orders.groupby('Order_ID').agg({'Order_Created_At': 'first'}).reset_index()
-                df_orders_['Order_Created_At'] = pd.to_datetime(df_orders_['Order_Created_At'], errors='coerce',
-                                                                utc=True)
                 # col1 = st.columns(1)[0]
                 with col2:
-
-                    df_orders_['days_of_week'] = df_orders_['Order_Created_At'].dt.dayofweek.apply(
-                        lambda x: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][x]
-                    )
-                    day_count = df_orders_['days_of_week'].value_counts()
-                    day_count = day_count.reindex(
-                        ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], fill_value=0)
+                    day_count = aggregates['day_of_week']
                     pie_data = pd.DataFrame({
                         'Day': day_count.index,
                         'Count': day_count.values
                     })
-                    pie_chart = alt.Chart(pie_data).mark_arc().encode(
-                        theta=alt.Theta(field="Count", type="quantitative"),
-                        color=alt.Color(field="Day", type="nominal",
-                                        sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
-                                              'Sunday']),
-                        tooltip=["Day:N", "Count:Q"]
-                    )
+                    def build_pie_chart():
+                        return alt.Chart(pie_data).mark_arc().encode(
+                            theta=alt.Theta(field="Count", type="quantitative"),
+                            color=alt.Color(field="Day", type="nominal",
+                                            sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
+                                                  'Sunday']),
+                            tooltip=["Day:N", "Count:Q"]
+                        )
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "This chart displays the total number of orders placed on each day of the week. Hover over the sections of the pie chart to view detailed information, including the specific day and the corresponding order count.")
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Total Orders Placed: Days of the Week {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    st.altair_chart(pie_chart, use_container_width=True)
+                    show_chart('show_order_data_page:pie_chart#2', build_pie_chart, use_container_width=True)
             else:
                 with col1:
                     st.title("Orders by Weekday/Weekend")
@@ -2081,15 +2427,12 @@ def show_order_data_page():
                            """, unsafe_allow_html=True)
 
         # Todo-Total Orders Placed: Hours of the Day-----------------------
+        lap("Total Orders Placed: Hours of the Day")
         if df_orders is not None and not df_orders.empty:
-            df_orders_ = df_orders.groupby('Order_ID').agg({'Order_Created_At': 'first'}).reset_index()
-            df_orders_['Order_Created_At'] = pd.to_datetime(df_orders_['Order_Created_At'], errors='coerce', utc=True)
             col1 = st.columns(1)[0]
 
             with col1:
-                df_orders_['hour_of_day'] = df_orders_['Order_Created_At'].dt.hour + 1  # Shift hours to 1-24 range
-                hour_count = df_orders_['hour_of_day'].value_counts().sort_index()
-                hour_count = hour_count.reindex(range(1, 25), fill_value=0)
+                hour_count = aggregates['hour_of_day']
 
                 if hour_count.sum() > 0:  # Check if there's data available
                     hour_data = pd.DataFrame({
@@ -2107,23 +2450,25 @@ def show_order_data_page():
 
                     st.markdown("<h3 style='text-align: center;'>Orders by Hour of the Day</h3>",
                                 unsafe_allow_html=True)
-                    line_chart = alt.Chart(hour_data).mark_line().encode(
-                        x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
-                        y=alt.Y('Number of Orders:Q', title='Number of Orders'),
-                        tooltip=['Hour of Day', 'Number of Orders']
-                    ).properties(
-                        width=700,
-                        height=400
-                    )
-                    # Add points to the line chart
-                    points = alt.Chart(hour_data).mark_point(size=100, color='red').encode(
-                        x=alt.X('Hour of Day:O', title='Hour of Day'),
-                        y=alt.Y('Number of Orders:Q', title='Number of Orders'),
-                        tooltip=['Hour of Day', 'Number of Orders']
-                    )
-                    # Combine the line chart and points
-                    combined_chart = line_chart + points
-                    st.altair_chart(combined_chart, use_container_width=True)
+                    def build():
+                        line_chart = alt.Chart(hour_data).mark_line().encode(
+                            x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
+                            y=alt.Y('Number of Orders:Q', title='Number of Orders'),
+                            tooltip=['Hour of Day', 'Number of Orders']
+                        ).properties(
+                            width=700,
+                            height=400
+                        )
+                        # Add points to the line chart
+                        points = alt.Chart(hour_data).mark_point(size=100, color='red').encode(
+                            x=alt.X('Hour of Day:O', title='Hour of Day'),
+                            y=alt.Y('Number of Orders:Q', title='Number of Orders'),
+                            tooltip=['Hour of Day', 'Number of Orders']
+                        )
+                        # Combine the line chart and points
+                        combined_chart = line_chart + points
+                        return combined_chart
+                    show_chart('show_order_data_page:combined_chart', build, use_container_width=True)
                 else:
                     st.title("Total Orders Placed: Hours of the Day")
                     st.markdown("""
@@ -2140,33 +2485,13 @@ def show_order_data_page():
             """, unsafe_allow_html=True)
 
         # Todo-Total orders placed: day, month, quarter, year
+        lap("Total orders placed: day, month, quarter, year")
         if df_orders is not None and not df_orders.empty:
-            df_orders_ = df_orders.groupby('Order_ID').agg({'Order_Created_At': 'first'}).reset_index()
-            df_orders_['Order_Created_At'] = pd.to_datetime(df_orders_['Order_Created_At'], errors='coerce', utc=True)
             col1 = st.columns(1)[0]
             with col1:
-                # Extract the day, month, quarter, and year from 'Order_Created_At'
-                df_orders_['day'] = df_orders_['Order_Created_At'].dt.date
-                # Calculate total orders placed per day
-                orders_per_day = df_orders_.groupby('day').size().reset_index(name='order_count')
-                # Create a complete date range
-                start_date = orders_per_day['day'].min()
-                end_date = datetime.today().date()
-                full_date_range = pd.date_range(start=start_date, end=end_date)
-                # Reindex `orders_per_day` to ensure all dates are included
-                orders_per_day.set_index('day', inplace=True)
-                orders_per_day = orders_per_day.reindex(full_date_range, fill_value=0).reset_index()
-                orders_per_day.rename(columns={'index': 'day'}, inplace=True)
-                # Add 'month', 'quarter', and 'year' columns
-                orders_per_day['month'] = orders_per_day['day'].dt.to_period('M').astype(str)  # Year-Month format
-                orders_per_day['quarter'] = orders_per_day['day'].dt.to_period('Q').astype(str)  # Year-Quarter format
-                orders_per_day['year'] = orders_per_day['day'].dt.year  # Year format
-                # Group data-----
-                orders_per_month = orders_per_day.groupby('month')['order_count'].sum().reset_index()
-                orders_per_month['month'] = pd.to_datetime(orders_per_month['month'], format='%Y-%m')
-                orders_per_month = orders_per_month.sort_values(by='month')
-                orders_per_quarter = orders_per_day.groupby('quarter')['order_count'].sum().reset_index()
-                orders_per_year = orders_per_day.groupby('year')['order_count'].sum().reset_index()
+                # Precomputed per-day counts, filled up to today at render time
+                orders_per_day, orders_per_month, orders_per_quarter, orders_per_year = fill_daily_counts(
+                    aggregates['orders_per_day'], 'order_count', datetime.today().date())
 
                 if orders_per_day.empty or orders_per_month.empty or orders_per_quarter.empty or orders_per_year.empty:
                     st.markdown("""
@@ -2183,76 +2508,88 @@ def show_order_data_page():
                         f"<h1 style='display: inline-block;'>Order Count Visualizations {tooltip_html}</h1>",
                         unsafe_allow_html=True
                     )
-                    view = st.radio("Select View",
-                                    ['Orders per Day', 'Orders per Month', 'Orders per Quarter', 'Orders per Year'])
-                    if view == 'Orders per Day':
-                        st.title('Orders Placed: Days')
-                        st.markdown("<h3 style='text-align: center;'>Orders by Day</h3>", unsafe_allow_html=True)
-                        line_chart = alt.Chart(orders_per_day).mark_line().encode(
-                            x=alt.X('day:T', title='Date',
-                                    axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)),
-                            y=alt.Y('order_count:Q', title='Number of Orders'),
-                            tooltip=['day:T', 'order_count:Q']
-                        )
-                        points = alt.Chart(orders_per_day).mark_point(size=60, color='red').encode(
-                            x='day:T',
-                            y='order_count:Q',
-                            tooltip=['day:T', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-                    elif view == 'Orders per Month':
-                        st.title('Orders Placed: Months')
-                        st.markdown("<h3 style='text-align: center;'>Orders by Month</h3>", unsafe_allow_html=True)
-                        # Ensure that the month column is formatted as 'Month Year'
-                        orders_per_month['month'] = orders_per_month['month'].dt.strftime(
-                            '%b %Y')  # Convert to Month Year format
-                        # Create the chart with the properly formatted month labels
-                        line_chart = alt.Chart(orders_per_month).mark_line().encode(
-                            x=alt.X('month:O', title='Month', axis=alt.Axis(labelAngle=-45)),
-                            # Ordinal scale for months
-                            y=alt.Y('order_count:Q', title='Number of Orders'),
-                            tooltip=[alt.Tooltip('month:N', title='Month'), 'order_count:Q']
-                        )
-                        points = alt.Chart(orders_per_month).mark_point(size=60, color='red').encode(
-                            x=alt.X('month:O', title='Month'),
-                            y=alt.Y('order_count:Q', title='Number of Orders'),
-                            tooltip=[alt.Tooltip('month:N', title='Month'), 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-
-                    elif view == 'Orders per Quarter':
-                        st.title('Orders Placed: Quarters')
-                        st.markdown("<h3 style='text-align: center;'>Orders by Quarter</h3>", unsafe_allow_html=True)
-                        line_chart = alt.Chart(orders_per_quarter).mark_line().encode(
-                            x=alt.X('quarter:N', title='Quarter'),
-                            y=alt.Y('order_count:Q', title='Number of Orders'),
-                            tooltip=['quarter:N', 'order_count:Q']
-                        )
-                        points = alt.Chart(orders_per_quarter).mark_point(size=60, color='red').encode(
-                            x='quarter:N',
-                            y='order_count:Q',
-                            tooltip=['quarter:N', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-
-                    elif view == 'Orders per Year':
-                        st.title('Orders Placed: Years')
-                        st.markdown("<h3 style='text-align: center;'>Orders by Year</h3>", unsafe_allow_html=True)
-                        line_chart = alt.Chart(orders_per_year).mark_line().encode(
-                            x=alt.X('year:O', title='Year'),
-                            y=alt.Y('order_count:Q', title='Number of Orders'),
-                            tooltip=['year:O', 'order_count:Q']
-                        )
-                        points = alt.Chart(orders_per_year).mark_point(size=60, color='red').encode(
-                            x='year:O',
-                            y='order_count:Q',
-                            tooltip=['year:O', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
+                    @fragment
+                    def orders_period_chart():
+                        view = st.radio("Select View",
+                                        ['Orders per Day', 'Orders per Month', 'Orders per Quarter', 'Orders per Year'])
+                        if view == 'Orders per Day':
+                            st.title('Orders Placed: Days')
+                            st.markdown("<h3 style='text-align: center;'>Orders by Day</h3>", unsafe_allow_html=True)
+                            def build():
+                                orders_plot = chart_series(orders_per_day, 'day', 'order_count', 'Orders per Day')
+                                line_chart = alt.Chart(orders_plot).mark_line().encode(
+                                    x=alt.X('day:T', title='Date',
+                                            axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)),
+                                    y=alt.Y('order_count:Q', title='Number of Orders'),
+                                    tooltip=['day:T', 'order_count:Q']
+                                )
+                                points = alt.Chart(orders_plot).mark_point(size=60, color='red').encode(
+                                    x='day:T',
+                                    y='order_count:Q',
+                                    tooltip=['day:T', 'order_count:Q']
+                                )
+                                combined_chart = with_points(line_chart, points, orders_plot)
+                                return combined_chart
+                            show_chart('orders_period_chart:combined_chart', build, use_container_width=True)
+                        elif view == 'Orders per Month':
+                            st.title('Orders Placed: Months')
+                            st.markdown("<h3 style='text-align: center;'>Orders by Month</h3>", unsafe_allow_html=True)
+                            # Ensure that the month column is formatted as 'Month Year'
+                            orders_per_month['month'] = orders_per_month['month'].dt.strftime(
+                                '%b %Y')  # Convert to Month Year format
+                            # Create the chart with the properly formatted month labels
+                            def build():
+                                line_chart = alt.Chart(orders_per_month).mark_line().encode(
+                                    x=alt.X('month:O', title='Month', axis=alt.Axis(labelAngle=-45)),
+                                    # Ordinal scale for months
+                                    y=alt.Y('order_count:Q', title='Number of Orders'),
+                                    tooltip=[alt.Tooltip('month:N', title='Month'), 'order_count:Q']
+                                )
+                                points = alt.Chart(orders_per_month).mark_point(size=60, color='red').encode(
+                                    x=alt.X('month:O', title='Month'),
+                                    y=alt.Y('order_count:Q', title='Number of Orders'),
+                                    tooltip=[alt.Tooltip('month:N', title='Month'), 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('orders_period_chart:combined_chart#2', build, use_container_width=True)
+
+                        elif view == 'Orders per Quarter':
+                            st.title('Orders Placed: Quarters')
+                            st.markdown("<h3 style='text-align: center;'>Orders by Quarter</h3>", unsafe_allow_html=True)
+                            def build():
+                                line_chart = alt.Chart(orders_per_quarter).mark_line().encode(
+                                    x=alt.X('quarter:N', title='Quarter'),
+                                    y=alt.Y('order_count:Q', title='Number of Orders'),
+                                    tooltip=['quarter:N', 'order_count:Q']
+                                )
+                                points = alt.Chart(orders_per_quarter).mark_point(size=60, color='red').encode(
+                                    x='quarter:N',
+                                    y='order_count:Q',
+                                    tooltip=['quarter:N', 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('orders_period_chart:combined_chart#3', build, use_container_width=True)
+
+                        elif view == 'Orders per Year':
+                            st.title('Orders Placed: Years')
+                            st.markdown("<h3 style='text-align: center;'>Orders by Year</h3>", unsafe_allow_html=True)
+                            def build():
+                                line_chart = alt.Chart(orders_per_year).mark_line().encode(
+                                    x=alt.X('year:O', title='Year'),
+                                    y=alt.Y('order_count:Q', title='Number of Orders'),
+                                    tooltip=['year:O', 'order_count:Q']
+                                )
+                                points = alt.Chart(orders_per_year).mark_point(size=60, color='red').encode(
+                                    x='year:O',
+                                    y='order_count:Q',
+                                    tooltip=['year:O', 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('orders_period_chart:combined_chart#4', build, use_container_width=True)
+                    orders_period_chart()
         else:
             st.title("Total orders placed: day, month, quarter, year")
             st.markdown("""
@@ -2262,20 +2599,14 @@ def show_order_data_page():
             """, unsafe_allow_html=True)
 
         # Todo--Average orders per customer
+        lap("Average orders per customer")
         col1, col2, col3, col4 = st.columns(4)
         if df_orders is not None and not df_orders.empty:
-            orders_per_customer = df_orders.groupby('Customer_ID')['Order_ID'].nunique().reset_index()
-            average_orders_per_customer = orders_per_customer['Order_ID'].mean()
-            average_orders_per_customer = round(average_orders_per_customer, 2)
-            # Total canceled orders
-            total_canceled_orders = df_orders[df_orders['Order_Cancelled_At'].notna()].shape[0]
-            # Most orders placed by a customer
-            customer_order_counts = df_orders.groupby('Customer_ID')['Order_ID'].nunique()
-            max_orders = customer_order_counts.max()
-            # Average order value
-            order_data = df_orders.groupby('Order_ID').agg({'Order_Total_Price': 'first'}).reset_index()
-            average_order_value = order_data['Order_Total_Price'].mean()
-            average_order_value = round(average_order_value, 2)
+            order_kpis = aggregates['kpis']
+            average_orders_per_customer = order_kpis['average_orders_per_customer']
+            total_canceled_orders = order_kpis['total_canceled_orders']
+            max_orders = order_kpis['max_orders']
+            average_order_value = order_kpis['average_order_value']
             # For average orders per customer
             with col1:
                 if df_orders is None or df_orders.empty:
@@ -2407,13 +2738,10 @@ def show_order_data_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Highest valued orders and Least valued orders-------------------------------------
+        lap("Highest valued orders and Least valued orders")
         chart_col1, chart_col2 = st.columns(2)
         if df_orders is not None and not df_orders.empty:
-            order_data = df_orders.groupby('Customer_Name').agg(
-                {'Order_ID': 'first', 'Order_Total_Price': 'first'}).reset_index()
-            order_data = order_data.dropna(subset=['Order_ID'])
-            top_customers = order_data.nlargest(50, 'Order_Total_Price')
-            least_customers = order_data.nsmallest(50, 'Order_Total_Price')
+            top_customers, least_customers = aggregates['value_ranking']
 
             # For Highest Valued Orders
             with chart_col1:
@@ -2430,40 +2758,45 @@ def show_order_data_page():
                         "This bar chart displays the top N customers by their total order price. Hover over each bar to view the customer name and the corresponding total order price in euros.")
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Highest valued orders {tooltip_html}</h1>",
-                        unsafe_allow_html=True
-                    )
-                    top_n = st.slider("Select Top N Customers to Display", min_value=1, max_value=50, value=5,
-                                      key="top_n_largest")
-                    top_customers_filtered = top_customers.nlargest(top_n, 'Order_Total_Price')
-                    st.markdown("<h3 style='text-align: center;'>Top N Customers by Total Order Price</h3>",
-                                unsafe_allow_html=True)
-                    # Create bar chart for Top N Customers
-                    top_chart = alt.Chart(top_customers_filtered).mark_bar().encode(
-                        x=alt.X('Customer_Name:O', title='Customer Name',
-                                sort=top_customers_filtered['Order_Total_Price'].tolist()),
-                        # Customer_Name on X-axis
-                        y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),  # Order_Total_Price on Y-axis
-                        color=alt.Color('Order_Total_Price:Q', legend=None),  # Color bars by Order_Total_Price
-                        tooltip=['Customer_Name:N',
-                                 alt.Tooltip('Order_Total_Price:Q', title='Total Order Price (€)', format=".2f")]
-                    ).properties(width=350, height=300)
-                    # Add text on bars
-                    top_chart_text = top_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust text position
-                        fontSize=12
-                    ).encode(
-                        text=alt.Text('Order_Total_Price:Q', format=".2f")
-                        # Add € symbol and format to 2 decimal places
-                    )
-                    top_chart = top_chart + top_chart_text
-                    top_chart = top_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=14,
-                        titleFontSize=16
+                        unsafe_allow_html=True
                     )
-                    st.altair_chart(top_chart, use_container_width=True)
+                    @fragment
+                    def highest_valued_orders_chart():
+                        top_n = st.slider("Select Top N Customers to Display", min_value=1, max_value=50, value=5,
+                                          key="top_n_largest")
+                        top_customers_filtered = top_customers.nlargest(top_n, 'Order_Total_Price')
+                        st.markdown("<h3 style='text-align: center;'>Top N Customers by Total Order Price</h3>",
+                                    unsafe_allow_html=True)
+                        # Create bar chart for Top N Customers
+                        def build():
+                            top_chart = alt.Chart(top_customers_filtered).mark_bar().encode(
+                                x=alt.X('Customer_Name:O', title='Customer Name',
+                                        sort=top_customers_filtered['Order_Total_Price'].tolist()),
+                                # Customer_Name on X-axis
+                                y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),  # Order_Total_Price on Y-axis
+                                color=alt.Color('Order_Total_Price:Q', legend=None),  # Color bars by Order_Total_Price
+                                tooltip=['Customer_Name:N',
+                                         alt.Tooltip('Order_Total_Price:Q', title='Total Order Price (€)', format=".2f")]
+                            ).properties(width=350, height=300)
+                            # Add text on bars
+                            top_chart_text = top_chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,  # Adjust text position
+                                fontSize=12
+                            ).encode(
+                                text=alt.Text('Order_Total_Price:Q', format=".2f")
+                                # Add € symbol and format to 2 decimal places
+                            )
+                            top_chart = top_chart + top_chart_text
+                            top_chart = top_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=14,
+                                titleFontSize=16
+                            )
+                            return top_chart
+                        show_chart('highest_valued_orders_chart:top_chart', build, use_container_width=True)
+                    highest_valued_orders_chart()
 
             # For Least Valued Orders
             with chart_col2:
@@ -2482,37 +2815,42 @@ def show_order_data_page():
                         f"<h1 style='display: inline-block;'>Least valued orders {tooltip_html}</h1>",
                         unsafe_allow_html=True
                     )
-                    least_n = st.slider("Select Least N Customers to Display", min_value=1, max_value=50, value=5,
-                                        key="top_n_smallest")
-                    least_customers_filtered = least_customers.nsmallest(least_n, 'Order_Total_Price')
-                    st.markdown("<h3 style='text-align: center;'>Least N Customers by Total Order Price</h3>",
-                                unsafe_allow_html=True)
-                    least_chart = alt.Chart(least_customers_filtered).mark_bar().encode(
-                        x=alt.X('Customer_Name:O', title='Customer Name',
-                                sort=least_customers_filtered['Order_Total_Price'].tolist()),
-                        # Customer_Name on X-axis
-                        y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),  # Order_Total_Price on Y-axis
-                        color=alt.Color('Order_Total_Price:Q', legend=None),  # Color bars by Order_Total_Price
-                        tooltip=['Customer_Name:N',
-                                 alt.Tooltip('Order_Total_Price:Q', title='Total Order Price (€)', format=".2f")]
-                    ).properties(width=350, height=300)
-                    # Add text on bars
-                    least_chart_text = least_chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10,  # Adjust text position
-                        fontSize=12
-                    ).encode(
-                        text=alt.Text('Order_Total_Price:Q', format=".2f")
-                        # Add € symbol and format to 2 decimal places
-                    )
-                    least_chart = least_chart + least_chart_text
-                    least_chart = least_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=14,
-                        titleFontSize=16
-                    )
-                    st.altair_chart(least_chart, use_container_width=True)
+                    @fragment
+                    def least_valued_orders_chart():
+                        least_n = st.slider("Select Least N Customers to Display", min_value=1, max_value=50, value=5,
+                                            key="top_n_smallest")
+                        least_customers_filtered = least_customers.nsmallest(least_n, 'Order_Total_Price')
+                        st.markdown("<h3 style='text-align: center;'>Least N Customers by Total Order Price</h3>",
+                                    unsafe_allow_html=True)
+                        def build():
+                            least_chart = alt.Chart(least_customers_filtered).mark_bar().encode(
+                                x=alt.X('Customer_Name:O', title='Customer Name',
+                                        sort=least_customers_filtered['Order_Total_Price'].tolist()),
+                                # Customer_Name on X-axis
+                                y=alt.Y('Order_Total_Price:Q', title='Total Order Price (€)'),  # Order_Total_Price on Y-axis
+                                color=alt.Color('Order_Total_Price:Q', legend=None),  # Color bars by Order_Total_Price
+                                tooltip=['Customer_Name:N',
+                                         alt.Tooltip('Order_Total_Price:Q', title='Total Order Price (€)', format=".2f")]
+                            ).properties(width=350, height=300)
+                            # Add text on bars
+                            least_chart_text = least_chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10,  # Adjust text position
+                                fontSize=12
+                            ).encode(
+                                text=alt.Text('Order_Total_Price:Q', format=".2f")
+                                # Add € symbol and format to 2 decimal places
+                            )
+                            least_chart = least_chart + least_chart_text
+                            least_chart = least_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=14,
+                                titleFontSize=16
+                            )
+                            return least_chart
+                        show_chart('least_valued_orders_chart:least_chart', build, use_container_width=True)
+                    least_valued_orders_chart()
         else:
             with chart_col1:
                 st.title("Highest valued orders")
@@ -2530,12 +2868,10 @@ def show_order_data_page():
                 """, unsafe_allow_html=True)
 
         # Todo-Total Order by Referring Site
+        lap("Total Order by Referring Site")
         try:
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset="Order_ID", keep="first")
-                total_orders_by_site = df_unique_orders.groupby("Order_Referring_Site")[
-                    "Order_ID"].count().reset_index()
-                total_orders_by_site.columns = ["Referring Site", "Total Orders"]
+                total_orders_by_site = aggregates['referring_sites']
                 if not total_orders_by_site.empty:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -2544,34 +2880,39 @@ def show_order_data_page():
                         f"<h1 style='display: inline-block;'>Total Orders by Referring Sites {tooltip_html}</h1>",
                         unsafe_allow_html=True)
                     st.markdown("### Visualizing the count of total orders grouped by referring sites")
-                    top_n = st.slider("Select Top N Referring Sites to Display", min_value=1,
-                                      max_value=len(total_orders_by_site), value=5)
-                    top_order_sites = total_orders_by_site.nlargest(top_n, "Total Orders")
-                    # Step 4: Create Altair Chart
-                    chart = alt.Chart(top_order_sites).mark_bar().encode(
-                        x=alt.X("Referring Site:O", title="Referring Site", sort="-y"),
-                        y=alt.Y("Total Orders:Q", title="Number of Orders"),
-                        color=alt.Color("Total Orders:Q", legend=None),
-                        tooltip=["Referring Site:N", "Total Orders:Q"]
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Referring Sites by Total Orders"
-                    )
-                    text = chart.mark_text(
-                        align="center",
-                        baseline="middle",
-                        dy=-10  # Adjust text position
-                    ).encode(
-                        text="Total Orders:Q"
-                    )
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                    @fragment
+                    def order_referring_sites_chart():
+                        top_n = st.slider("Select Top N Referring Sites to Display", min_value=1,
+                                          max_value=min(len(total_orders_by_site), 50), value=5)
+                        def build():
+                            top_order_sites = top_k_with_other(total_orders_by_site, "Referring Site", "Total Orders", top_n)
+                            # Step 4: Create Altair Chart
+                            chart = alt.Chart(top_order_sites).mark_bar().encode(
+                                x=alt.X("Referring Site:O", title="Referring Site", sort=None),
+                                y=alt.Y("Total Orders:Q", title="Number of Orders"),
+                                color=alt.Color("Total Orders:Q", legend=None),
+                                tooltip=["Referring Site:N", "Total Orders:Q"]
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Referring Sites by Total Orders"
+                            )
+                            text = chart.mark_text(
+                                align="center",
+                                baseline="middle",
+                                dy=-10  # Adjust text position
+                            ).encode(
+                                text="Total Orders:Q"
+                            )
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('order_referring_sites_chart:final_chart', build, use_container_width=True)
+                    order_referring_sites_chart()
                 else:
                     st.title("Total Orders by Referring Sites")
                     st.markdown("""
@@ -2615,12 +2956,14 @@ def show_abandoned_checkouts_page():
         )
     add_custom_css()
     try:
+        aggregates = page_aggregates('Abandoned Checkouts')
         # Todo- Card Creation for the above
+        lap("Card Creation for the above")
         try:
             col1 = st.columns(1)[0]
             if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
                 with col1:
-                    abandoned_orders = df_abandoned_checkouts['Order_ID'].nunique()
+                    abandoned_orders = aggregates['kpis']['abandoned_orders']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(f"Total number of abandoned orders: {abandoned_orders}")
                     st.markdown(
@@ -2657,8 +3000,9 @@ def show_abandoned_checkouts_page():
                 unsafe_allow_html=True
             )
             st.subheader("Abandoned Checkouts Data")
-            filtered_abandoned_checkouts = filter_by_date(df_abandoned_checkouts, 'Order_Created_At')
-            st.dataframe(filtered_abandoned_checkouts)
+            filtered_abandoned_checkouts, date_range = filter_by_date(df_abandoned_checkouts, 'Order_Created_At',
+                                                                       dataset='AbandonedCheckouts')
+            show_paginated_table(filtered_abandoned_checkouts, 'filtered_abandoned_checkouts', date_range=date_range)
         else:
             st.title("Preview of Abandoned Checkouts data filtered by the selected date range")
             st.markdown("""
@@ -2667,31 +3011,19 @@ def show_abandoned_checkouts_page():
                             </div>
                         """, unsafe_allow_html=True)
         # Todo-Total Order placed on weekdays and weekend
+        lap("Total Order placed on weekdays and weekend")
 
         col1, col2 = st.columns(2)
         if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
             add_tooltip_css()
-            df_abandoned_checkouts_ = df_abandoned_checkouts.groupby('Order_ID').agg({'Order_Created_At': 'first'})
-            df_abandoned_checkouts_['Order_Created_At'] = pd.to_datetime(df_abandoned_checkouts_['Order_Created_At'],
-                                                                         errors='coerce', utc=True)
-            df_abandoned_checkouts_['Weekday_Weekend'] = df_abandoned_checkouts_['Order_Created_At'].dt.dayofweek.apply(
-                lambda x: 'Weekend' if x >= 5 else 'Weekday'
-            )
-            weekday_count = df_abandoned_checkouts_[df_abandoned_checkouts_['Weekday_Weekend'] == 'Weekday'].shape[0]
-            weekend_count = df_abandoned_checkouts_[df_abandoned_checkouts_['Weekday_Weekend'] == 'Weekend'].shape[0]
-            counts = [weekday_count, weekend_count]
-            labels = ['Weekday', 'Weekend']
-            pie_data = pd.DataFrame({
-                'Category': labels,
-                'Count': counts,
-                'Percentage': [(count / sum(counts)) * 100 for count in counts]  # Calculate percentage
-            })
+            pie_data = aggregates['weekday_weekend']
             pie_data['Label'] = pie_data['Percentage'].round(1).astype(str) + '%'
-            pie_chart = alt.Chart(pie_data).mark_arc().encode(
-                theta=alt.Theta(field="Count", type="quantitative"),
-                color=alt.Color(field="Category", type="nominal"),
-                tooltip=["Category", "Count", "Percentage"],  # Show both count and percentage in tooltip
-            )
+            def build_pie_chart():
+                return alt.Chart(pie_data).mark_arc().encode(
+                    theta=alt.Theta(field="Count", type="quantitative"),
+                    color=alt.Color(field="Category", type="nominal"),
+                    tooltip=["Category", "Count", "Percentage"],  # Show both count and percentage in tooltip
+                )
             with col1:
                 # st.write(f"Weekday Count: {weekday_count} ({(weekday_count / sum(counts)) * 100:.2f}%)")
                 # st.write(f"Weekend Count: {weekend_count} ({(weekend_count / sum(counts)) * 100:.2f}%)")
@@ -2701,7 +3033,7 @@ def show_abandoned_checkouts_page():
                     f"<h1 style='display: inline-block;'>Total Orders Abandoned: Weekday vs Weekend {tooltip_html}</h1>",
                     unsafe_allow_html=True
                 )
-                st.altair_chart(pie_chart, use_container_width=True)
+                show_chart('show_abandoned_checkouts_page:pie_chart', build_pie_chart, use_container_width=True)
         else:
             with col1:
                 st.title("Orders abandoned by Weekday/Weekend")
@@ -2711,31 +3043,22 @@ def show_abandoned_checkouts_page():
                     </div>
                 """, unsafe_allow_html=True)
         # Todo----------Total orders abandoned: days of week-------------------
+        lap("Total orders abandoned: days of week")
         if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
-            df_abandoned_checkouts_ = df_abandoned_checkouts.groupby('Order_ID').agg(
-                {'Order_Created_At': 'first'}).reset_index()
-            df_abandoned_checkouts_['Order_Created_At'] = pd.to_datetime(df_abandoned_checkouts_['Order_Created_At'],
-                                                                         errors='coerce', utc=True)
             with col2:
-                df_abandoned_checkouts_['days_of_week'] = df_abandoned_checkouts_[
-                    'Order_Created_At'].dt.dayofweek.apply(
-                    lambda x: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][x]
-                )
-                day_count = df_abandoned_checkouts_['days_of_week'].value_counts()
-                day_count = day_count.reindex(
-                    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
-                    fill_value=0)
+                day_count = aggregates['day_of_week']
                 pie_data = pd.DataFrame({
                     'Day': day_count.index,
                     'Count': day_count.values
                 })
-                pie_chart = alt.Chart(pie_data).mark_arc().encode(
-                    theta=alt.Theta(field="Count", type="quantitative"),
-                    color=alt.Color(field="Day", type="nominal",
-                                    sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
-                                          'Sunday']),
-                    tooltip=["Day:N", "Count:Q"]
-                )
+                def build_pie_chart():
+                    return alt.Chart(pie_data).mark_arc().encode(
+                        theta=alt.Theta(field="Count", type="quantitative"),
+                        color=alt.Color(field="Day", type="nominal",
+                                        sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
+                                              'Sunday']),
+                        tooltip=["Day:N", "Count:Q"]
+                    )
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "Hover over the chart segments to view the number of abandoned orders for each day of the week. The chart shows how orders are distributed across different weekdays, with each segment representing a specific day.")
@@ -2743,7 +3066,7 @@ def show_abandoned_checkouts_page():
                     f"<h1 style='display: inline-block;'>Total Orders Abandoned: Days of Week {tooltip_html}</h1>",
                     unsafe_allow_html=True
                 )
-                st.altair_chart(pie_chart, use_container_width=True)
+                show_chart('show_abandoned_checkouts_page:pie_chart#2', build_pie_chart, use_container_width=True)
         else:
             with col2:
                 st.title("Orders abandoned by Day of the Week")
@@ -2753,22 +3076,13 @@ def show_abandoned_checkouts_page():
                     </div>
                 """, unsafe_allow_html=True)
         # Todo- Total orders abandoned: hours of day
+        lap("Total orders abandoned: hours of day")
         try:
             col1 = st.columns(1)[0]
             if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
-                df_abandoned_checkouts_ = df_abandoned_checkouts.groupby('Order_ID').agg(
-                    {'Order_Created_At': 'first'}).reset_index()
-                df_abandoned_checkouts_['Order_Created_At'] = pd.to_datetime(
-                    df_abandoned_checkouts_['Order_Created_At'],
-                    errors='coerce', utc=True)
                 with col1:
-                    # Add 'hour_of_day' column for the df_abandoned_checkouts_ DataFrame
-                    df_abandoned_checkouts_['hour_of_day'] = df_abandoned_checkouts_[
-                                                                 'Order_Created_At'].dt.hour + 1  # Shift hours to 1-24 range
-                    # Count orders per hour
-                    hour_count = df_abandoned_checkouts_['hour_of_day'].value_counts().sort_index()
-                    # Reindex to ensure every hour from 1 to 24 is included
-                    hour_count = hour_count.reindex(range(1, 25), fill_value=0)
+                    # Orders per hour, every hour from 1 to 24 included
+                    hour_count = aggregates['hour_of_day']
                     # Prepare data for the chart
                     hour_data = pd.DataFrame({
                         'Hour of Day': hour_count.index,
@@ -2784,23 +3098,25 @@ def show_abandoned_checkouts_page():
 
                     st.markdown("<h3 style='text-align: center;'>Orders abandoned by Hour of the Day</h3>",
                                 unsafe_allow_html=True)
-                    line_chart = alt.Chart(hour_data).mark_line().encode(
-                        x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
-                        y=alt.Y('Number of Orders:Q', title='Number of Orders'),
-                        tooltip=['Hour of Day', 'Number of Orders']
-                    ).properties(
-                        width=700,
-                        height=400
-                    )
-                    # Add points to the line chart
-                    points = alt.Chart(hour_data).mark_point(size=100, color='red').encode(
-                        x=alt.X('Hour of Day:O', title='Hour of Day'),
-                        y=alt.Y('Number of Orders:Q', title='Number of Orders'),
-                        tooltip=['Hour of Day', 'Number of Orders']
-                    )
-                    # Combine the line chart and points
-                    combined_chart = line_chart + points
-                    st.altair_chart(combined_chart, use_container_width=True)
+                    def build():
+                        line_chart = alt.Chart(hour_data).mark_line().encode(
+                            x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
+                            y=alt.Y('Number of Orders:Q', title='Number of Orders'),
+                            tooltip=['Hour of Day', 'Number of Orders']
+                        ).properties(
+                            width=700,
+                            height=400
+                        )
+                        # Add points to the line chart
+                        points = alt.Chart(hour_data).mark_point(size=100, color='red').encode(
+                            x=alt.X('Hour of Day:O', title='Hour of Day'),
+                            y=alt.Y('Number of Orders:Q', title='Number of Orders'),
+                            tooltip=['Hour of Day', 'Number of Orders']
+                        )
+                        # Combine the line chart and points
+                        combined_chart = line_chart + points
+                        return combined_chart
+                    show_chart('show_abandoned_checkouts_page:combined_chart', build, use_container_width=True)
             else:
                 with col1:
                     st.title("Orders abandoned by Hour of the Day")
@@ -2815,48 +3131,15 @@ def show_abandoned_checkouts_page():
                 unsafe_allow_html=True)
 
         # Todo-Total orders abandoned: day, month, quarter, year
+        lap("Total orders abandoned: day, month, quarter, year")
         try:
             col1 = st.columns(1)[0]
             if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
-                df_abandoned_checkouts_ = df_abandoned_checkouts.groupby('Order_ID').agg(
-                    {'Order_Created_At': 'first'}).reset_index()
-                # Convert 'Order_Created_At' to datetime if not already done for abandoned checkouts
-                df_abandoned_checkouts_['Order_Created_At'] = pd.to_datetime(
-                    df_abandoned_checkouts_['Order_Created_At'],
-                    errors='coerce', utc=True)
                 with col1:
-                    # Extract the day, month, quarter, and year from 'Order_Created_At'
-                    df_abandoned_checkouts_['day'] = df_abandoned_checkouts_['Order_Created_At'].dt.date
-                    # Calculate total abandoned orders placed per day
-                    abandoned_orders_per_day = df_abandoned_checkouts_.groupby('day').size().reset_index(
-                        name='order_count')
-                    # Create a complete date range for abandoned orders
-                    start_date = abandoned_orders_per_day['day'].min()
-                    end_date = datetime.today().date()
-                    full_date_range = pd.date_range(start=start_date, end=end_date)
-                    # Reindex `abandoned_orders_per_day` to ensure all dates are included
-                    abandoned_orders_per_day.set_index('day', inplace=True)
-                    abandoned_orders_per_day = abandoned_orders_per_day.reindex(full_date_range,
-                                                                                fill_value=0).reset_index()
-                    abandoned_orders_per_day.rename(columns={'index': 'day'}, inplace=True)
-                    # Add 'month', 'quarter', and 'year' columns
-                    abandoned_orders_per_day['month'] = abandoned_orders_per_day['day'].dt.to_period('M').astype(
-                        str)  # Year-Month format
-                    abandoned_orders_per_day['quarter'] = abandoned_orders_per_day['day'].dt.to_period('Q').astype(
-                        str)  # Year-Quarter format
-                    abandoned_orders_per_day['year'] = abandoned_orders_per_day['day'].dt.year  # Year format
-                    # Group data for abandoned orders
-                    abandoned_orders_per_month = abandoned_orders_per_day.groupby('month')[
-                        'order_count'].sum().reset_index()
-                    abandoned_orders_per_month['month'] = pd.to_datetime(abandoned_orders_per_month['month'],
-                                                                         format='%Y-%m')
-                    abandoned_orders_per_month = abandoned_orders_per_month.sort_values(by='month')
-                    # Group data for Quarter data set
-                    abandoned_orders_per_quarter = abandoned_orders_per_day.groupby('quarter')[
-                        'order_count'].sum().reset_index()
-                    # group data for year dataset
-                    abandoned_orders_per_year = abandoned_orders_per_day.groupby('year')[
-                        'order_count'].sum().reset_index()
+                    # Precomputed per-day counts, filled up to today at render time
+                    (abandoned_orders_per_day, abandoned_orders_per_month, abandoned_orders_per_quarter,
+                     abandoned_orders_per_year) = fill_daily_counts(aggregates['orders_per_day'], 'order_count',
+                                                                    datetime.today().date())
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "Hover over the chart to view detailed data for each time period.See the total number of abandoned orders for each day, month, quarter, or year.Check the specific order count for each time interval.The tooltip shows both the time period and the corresponding abandoned order count.")
@@ -2864,86 +3147,99 @@ def show_abandoned_checkouts_page():
                         f"<h1 style='display: inline-block;'>Abandoned Order Count Visualizations {tooltip_html}</h1>",
                         unsafe_allow_html=True
                     )
-                    view = st.radio("Select View", ['Abandoned Orders per Day', 'Abandoned Orders per Month',
-                                                    'Abandoned Orders per Quarter', 'Abandoned Orders per Year'])
-                    if view == 'Abandoned Orders per Day':
-                        st.title('Abandoned Orders: Days')
-                        st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Day</h3>",
-                                    unsafe_allow_html=True)
-                        line_chart = alt.Chart(abandoned_orders_per_day).mark_line().encode(
-                            x=alt.X('day:T', title='Date',
-                                    axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)),
-                            y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
-                            tooltip=['day:T', 'order_count:Q']
-                        )
-                        points = alt.Chart(abandoned_orders_per_day).mark_point(size=60, color='red').encode(
-                            x='day:T',
-                            y='order_count:Q',
-                            tooltip=['day:T', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-
-                    elif view == 'Abandoned Orders per Month':
-                        st.title('Abandoned Orders: Months')
-                        st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Month</h3>",
-                                    unsafe_allow_html=True)
-                        # Ensure 'month' is a datetime column
-                        abandoned_orders_per_month['month'] = pd.to_datetime(abandoned_orders_per_month['month'],
-                                                                             format='%Y-%m-%d')
-                        # Create the chart with formatted month labels
-                        line_chart = alt.Chart(abandoned_orders_per_month).mark_line().encode(
-                            x=alt.X('month:T', title='Month', axis=alt.Axis(format='%b %Y', labelAngle=-45)),
-                            # Date type with custom formatting
-                            y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
-                            tooltip=[alt.Tooltip('month:T', title='Month'), 'order_count:Q']
-                        )
-                        points = alt.Chart(abandoned_orders_per_month).mark_point(size=60, color='red').encode(
-                            x=alt.X('month:T', title='Month'),
-                            y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
-                            tooltip=[alt.Tooltip('month:T', title='Month'), 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-
-                    elif view == 'Abandoned Orders per Quarter':
-                        st.title('Abandoned Orders: Quarters')
-                        st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Quarter</h3>",
-                                    unsafe_allow_html=True)
-                        line_chart = alt.Chart(abandoned_orders_per_quarter).mark_line().encode(
-                            x=alt.X('quarter:N', title='Quarter'),
-                            y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
-                            tooltip=['quarter:N', 'order_count:Q']
-                        )
-                        points = alt.Chart(abandoned_orders_per_quarter).mark_point(size=60, color='red').encode(
-                            x='quarter:N',
-                            y='order_count:Q',
-                            tooltip=['quarter:N', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
-                    elif view == 'Abandoned Orders per Year':
-                        st.title('Abandoned Orders: Years')
-                        st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Year</h3>",
-                                    unsafe_allow_html=True)
-                        line_chart = alt.Chart(abandoned_orders_per_year).mark_line().encode(
-                            x=alt.X('year:O', title='Year'),
-                            y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
-                            tooltip=['year:O', 'order_count:Q']
-                        )
-                        points = alt.Chart(abandoned_orders_per_year).mark_point(size=60, color='red').encode(
-                            x='year:O',
-                            y='order_count:Q',
-                            tooltip=['year:O', 'order_count:Q']
-                        )
-                        combined_chart = line_chart + points
-                        st.altair_chart(combined_chart, use_container_width=True)
+                    @fragment
+                    def abandoned_period_chart():
+                        view = st.radio("Select View", ['Abandoned Orders per Day', 'Abandoned Orders per Month',
+                                                        'Abandoned Orders per Quarter', 'Abandoned Orders per Year'])
+                        if view == 'Abandoned Orders per Day':
+                            st.title('Abandoned Orders: Days')
+                            st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Day</h3>",
+                                        unsafe_allow_html=True)
+                            def build():
+                                abandoned_plot = chart_series(abandoned_orders_per_day, 'day', 'order_count',
+                                                              'Abandoned Orders per Day')
+                                line_chart = alt.Chart(abandoned_plot).mark_line().encode(
+                                    x=alt.X('day:T', title='Date',
+                                            axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)),
+                                    y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
+                                    tooltip=['day:T', 'order_count:Q']
+                                )
+                                points = alt.Chart(abandoned_plot).mark_point(size=60, color='red').encode(
+                                    x='day:T',
+                                    y='order_count:Q',
+                                    tooltip=['day:T', 'order_count:Q']
+                                )
+                                combined_chart = with_points(line_chart, points, abandoned_plot)
+                                return combined_chart
+                            show_chart('abandoned_period_chart:combined_chart', build, use_container_width=True)
+
+                        elif view == 'Abandoned Orders per Month':
+                            st.title('Abandoned Orders: Months')
+                            st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Month</h3>",
+                                        unsafe_allow_html=True)
+                            # Ensure 'month' is a datetime column
+                            abandoned_orders_per_month['month'] = pd.to_datetime(abandoned_orders_per_month['month'],
+                                                                                 format='%Y-%m-%d')
+                            # Create the chart with formatted month labels
+                            def build():
+                                line_chart = alt.Chart(abandoned_orders_per_month).mark_line().encode(
+                                    x=alt.X('month:T', title='Month', axis=alt.Axis(format='%b %Y', labelAngle=-45)),
+                                    # Date type with custom formatting
+                                    y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
+                                    tooltip=[alt.Tooltip('month:T', title='Month'), 'order_count:Q']
+                                )
+                                points = alt.Chart(abandoned_orders_per_month).mark_point(size=60, color='red').encode(
+                                    x=alt.X('month:T', title='Month'),
+                                    y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
+                                    tooltip=[alt.Tooltip('month:T', title='Month'), 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('abandoned_period_chart:combined_chart#2', build, use_container_width=True)
+
+                        elif view == 'Abandoned Orders per Quarter':
+                            st.title('Abandoned Orders: Quarters')
+                            st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Quarter</h3>",
+                                        unsafe_allow_html=True)
+                            def build():
+                                line_chart = alt.Chart(abandoned_orders_per_quarter).mark_line().encode(
+                                    x=alt.X('quarter:N', title='Quarter'),
+                                    y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
+                                    tooltip=['quarter:N', 'order_count:Q']
+                                )
+                                points = alt.Chart(abandoned_orders_per_quarter).mark_point(size=60, color='red').encode(
+                                    x='quarter:N',
+                                    y='order_count:Q',
+                                    tooltip=['quarter:N', 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('abandoned_period_chart:combined_chart#3', build, use_container_width=True)
+                        elif view == 'Abandoned Orders per Year':
+                            st.title('Abandoned Orders: Years')
+                            st.markdown("<h3 style='text-align: center;'>Abandoned Orders by Year</h3>",
+                                        unsafe_allow_html=True)
+                            def build():
+                                line_chart = alt.Chart(abandoned_orders_per_year).mark_line().encode(
+                                    x=alt.X('year:O', title='Year'),
+                                    y=alt.Y('order_count:Q', title='Number of Abandoned Orders'),
+                                    tooltip=['year:O', 'order_count:Q']
+                                )
+                                points = alt.Chart(abandoned_orders_per_year).mark_point(size=60, color='red').encode(
+                                    x='year:O',
+                                    y='order_count:Q',
+                                    tooltip=['year:O', 'order_count:Q']
+                                )
+                                combined_chart = line_chart + points
+                                return combined_chart
+                            show_chart('abandoned_period_chart:combined_chart#4', build, use_container_width=True)
+                    abandoned_period_chart()
 
                 # Todo-Average abandoned orders per customer------------------------------------------------------------
+                lap("Average abandoned orders per customer")
                 col1, col2 = st.columns(2)
                 with col1:
-                    abandoned_orders_per_customer = df_abandoned_checkouts.groupby('Customer_ID')['Order_ID'].nunique()
-                    average_abandoned_orders = abandoned_orders_per_customer.mean()
+                    average_abandoned_orders = aggregates['kpis']['average_abandoned_orders']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(f"Total number of abandoned orders: {abandoned_orders}")
                     st.markdown(
@@ -2960,9 +3256,7 @@ def show_abandoned_checkouts_page():
                         unsafe_allow_html=True
                     )
                 with col2:
-                    most_abandoned_orders_per_customer = df_abandoned_checkouts.groupby('Customer_ID')[
-                        'Order_ID'].nunique()
-                    most_abandoned_orders_per_customer = most_abandoned_orders_per_customer.max()
+                    most_abandoned_orders_per_customer = aggregates['kpis']['most_abandoned_orders']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         f"Customer with the most abandoned orders: {most_abandoned_orders_per_customer}")
@@ -2989,15 +3283,9 @@ def show_abandoned_checkouts_page():
                     """, unsafe_allow_html=True)
 
             # Todo- Referring Sites by Abandoned Orders Top N
+            lap("Referring Sites by Abandoned Orders Top N")
             if df_abandoned_checkouts is not None and not df_abandoned_checkouts.empty:
-                df_abandoned_checkouts['Order_Referring_Site'] = df_abandoned_checkouts['Order_Referring_Site'].fillna(
-                    'Unknown')  # Handle missing values
-                df_abandoned_checkouts['Order_ID'] = df_abandoned_checkouts['Order_ID'].astype(
-                    str)  # Ensure Order_ID is treated as a string
-                referring_sites = df_abandoned_checkouts.groupby('Order_Referring_Site')[
-                    'Order_ID'].nunique().reset_index()
-                referring_sites = referring_sites.rename(columns={'Order_ID': 'Total_Abandoned_Orders'})
-                referring_sites = referring_sites.sort_values('Total_Abandoned_Orders', ascending=False)
+                referring_sites = aggregates['referring_sites']
                 add_tooltip_css()
                 tooltip_html = render_tooltip("""Hover over the chart to view detailed data for each referring site.
                     Check the total number of abandoned orders associated with each referring site.
@@ -3006,28 +3294,34 @@ def show_abandoned_checkouts_page():
                     f"<h1 style='display: inline-block;'>Total Abandoned Orders by Referring Sites {tooltip_html}</h1>",
                     unsafe_allow_html=True
                 )
-                top_n = st.slider("Select Top N Referring Sites to Display", min_value=1, max_value=50, value=10,
-                                  key="top_n_sites")
-                top_referring_sites = referring_sites.head(top_n)
-                st.markdown("<h3 style='text-align: center;'>Top N Referring Sites by Abandoned Orders</h3>",
-                            unsafe_allow_html=True)
-                chart = alt.Chart(top_referring_sites).mark_bar().encode(
-                    x=alt.X('Order_Referring_Site:O', title='Referring Site', sort='-y'),  # X-axis for sites
-                    y=alt.Y('Total_Abandoned_Orders:Q', title='Total Abandoned Orders'),
-                    # Y-axis for total abandoned orders
-                    color=alt.Color('Total_Abandoned_Orders:Q', legend=None),  # Color bars by count
-                    tooltip=['Order_Referring_Site:N', 'Total_Abandoned_Orders:Q']  # Add tooltips
-                ).properties(width=700, height=400)
-                chart_text = chart.mark_text(
-                    align='center',
-                    baseline='bottom',
-                    dy=-10,
-                    fontSize=12
-                ).encode(
-                    text='Total_Abandoned_Orders:Q'
-                )
-                final_chart = chart + chart_text
-                st.altair_chart(final_chart, use_container_width=True)
+                @fragment
+                def abandoned_referring_sites_chart():
+                    top_n = st.slider("Select Top N Referring Sites to Display", min_value=1, max_value=50, value=10,
+                                      key="top_n_sites")
+                    top_referring_sites = top_k_with_other(referring_sites, 'Order_Referring_Site',
+                                                           'Total_Abandoned_Orders', top_n)
+                    st.markdown("<h3 style='text-align: center;'>Top N Referring Sites by Abandoned Orders</h3>",
+                                unsafe_allow_html=True)
+                    def build():
+                        chart = alt.Chart(top_referring_sites).mark_bar().encode(
+                            x=alt.X('Order_Referring_Site:O', title='Referring Site', sort=None),  # X-axis for sites
+                            y=alt.Y('Total_Abandoned_Orders:Q', title='Total Abandoned Orders'),
+                            # Y-axis for total abandoned orders
+                            color=alt.Color('Total_Abandoned_Orders:Q', legend=None),  # Color bars by count
+                            tooltip=['Order_Referring_Site:N', 'Total_Abandoned_Orders:Q']  # Add tooltips
+                        ).properties(width=700, height=400)
+                        chart_text = chart.mark_text(
+                            align='center',
+                            baseline='bottom',
+                            dy=-10,
+                            fontSize=12
+                        ).encode(
+                            text='Total_Abandoned_Orders:Q'
+                        )
+                        final_chart = chart + chart_text
+                        return final_chart
+                    show_chart('abandoned_referring_sites_chart:final_chart', build, use_container_width=True)
+                abandoned_referring_sites_chart()
             else:
                 st.title("Total Abandoned Orders by Referring Sites")
                 st.markdown("""
@@ -3062,16 +3356,15 @@ def show_products_page():
     )
     add_custom_css()
     try:
+        aggregates = page_aggregates('Products')
         # Todo-Average number of products ordered by a customer
+        lap("Average number of products ordered by a customer")
         try:
             col1, col2 = st.columns(2)
             if df_orders is not None and not df_orders.empty:
-                customer_product_counts = df_orders.groupby('Customer_ID')['Product_ID'].nunique().reset_index()
-                average_products_per_customer = customer_product_counts['Product_ID'].mean()
-                average_products_per_customer = round(average_products_per_customer, 2)
+                average_products_per_customer = aggregates['kpis']['average_products_per_customer']
                 # Total Product counts---------------------------------------------
-                df_products_cleaned = df_products.dropna(subset=['Product_Published_At'])
-                total_product_count = df_products_cleaned['Product_ID'].nunique()
+                total_product_count = aggregates['kpis']['total_product_count']
                 with col1:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -3128,8 +3421,8 @@ def show_products_page():
             tooltip_html = render_tooltip("Preview of product data filtered by the selected date range.")
             st.markdown(f"<h1 style='display: inline-block;'>Preview Filtered Product Data {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-            filtered_products = filter_by_date(df_products, 'Product_Created_At')
-            st.dataframe(filtered_products, use_container_width=True)
+            filtered_products, date_range = filter_by_date(df_products, 'Product_Created_At')
+            show_paginated_table(filtered_products, 'filtered_products', date_range=date_range)
         else:
             st.title("Preview of product data filtered by the selected date range")
             st.markdown("""
@@ -3139,55 +3432,56 @@ def show_products_page():
             """, unsafe_allow_html=True)
 
         # Todo-Count of products in each type----------------------------------------
+        lap("Count of products in each type")
         try:
             col1, col2 = st.columns(2)
             if df_products is not None and not df_products.empty:
                 with col1:
-                    df_products_ = df_products.dropna(subset=['Product_Published_At'])
-                    # df_products_['Product_Type'] = df_products_['Product_Type'].replace("", "No Type")
-                    df_products_['Product_Type'] = df_products_['Product_Type'].astype(str).replace(
-                        {"nan": "No Type", "": "No Type"})
-                    product_counts = df_products_.groupby('Product_Type')['Product_ID'].nunique().reset_index()
-                    product_counts.columns = ['Product_Type', 'Count']
+                    product_counts = aggregates['type_counts']
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "Hover over the bars to see the product type and the corresponding count of unique products in that type.")
                     st.markdown(f"<h1 style='display: inline-block;'>Product Count by Type {tooltip_html}</h1>",
                                 unsafe_allow_html=True)
                     st.markdown("### Visualizing the count of unique products in each type")
-                    top_n = st.slider("Select Top N Product Types to Display", min_value=1,
-                                      max_value=len(product_counts),
-                                      value=5)
-                    top_product_counts = product_counts.nlargest(top_n, 'Count')
-                    chart = alt.Chart(top_product_counts).mark_bar().encode(
-                        x=alt.X('Product_Type:O', title='Product Type', sort='-y'),
-                        y=alt.Y('Count:Q', title='Number of Products'),
-                        color=alt.Color('Count:Q', legend=None),
-                        tooltip=['Product_Type:N', 'Count:Q']
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Product Types by Count"
-                    )
-                    text = chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10  # Adjust text position
-                    ).encode(
-                        text='Count:Q'
-                    )
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                    @fragment
+                    def product_types_chart():
+                        top_n = st.slider("Select Top N Product Types to Display", min_value=1,
+                                          max_value=min(len(product_counts), 50),
+                                          value=5)
+                        def build():
+                            top_product_counts = top_k_with_other(product_counts, 'Product_Type', 'Count', top_n)
+                            chart = alt.Chart(top_product_counts).mark_bar().encode(
+                                x=alt.X('Product_Type:O', title='Product Type', sort=None),
+                                y=alt.Y('Count:Q', title='Number of Products'),
+                                color=alt.Color('Count:Q', legend=None),
+                                tooltip=['Product_Type:N', 'Count:Q']
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Product Types by Count"
+                            )
+                            text = chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10  # Adjust text position
+                            ).encode(
+                                text='Count:Q'
+                            )
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('product_types_chart:final_chart', build, use_container_width=True)
+                    product_types_chart()
                 with col2:
                     # Todo- Most Sold Product----------------------------------------------
+                    lap("Most Sold Product")
                     if df_orders is not None and not df_orders.empty:
-                        product_sales = df_orders.groupby('Product_Name')['Product_Quantity'].sum().reset_index()
-                        product_sales = product_sales.sort_values(by='Product_Quantity', ascending=False)
+                        product_sales = aggregates['most_sold']
                         add_tooltip_css()
                         tooltip_html = render_tooltip(
                             "Hover over the bars to see the product name and the total quantity sold for each product.")
@@ -3196,34 +3490,40 @@ def show_products_page():
                             unsafe_allow_html=True
                         )
                         st.markdown("### Displaying the most sold products by quantity")
-                        top_n = st.slider("Select Top N Most Sold Products to Display", min_value=1,
-                                          max_value=len(product_sales),
-                                          value=5)
-                        top_sold_products = product_sales.head(top_n)
-                        chart = alt.Chart(top_sold_products).mark_bar().encode(
-                            x=alt.X('Product_Name:O', title='Product Name', sort='-y'),
-                            y=alt.Y('Product_Quantity:Q', title='Quantity Sold'),
-                            color=alt.Color('Product_Quantity:Q', legend=None),
-                            tooltip=['Product_Name:N', 'Product_Quantity:Q']
-                        ).properties(
-                            width=700,
-                            height=400,
-                            title="Top N Most Sold Products"
-                        )
-                        text = chart.mark_text(
-                            align='center',
-                            baseline='middle',
-                            dy=-10  # Adjust text position
-                        ).encode(
-                            text='Product_Quantity:Q'
-                        )
-                        final_chart = chart + text
-                        final_chart = final_chart.configure_axis(
-                            labelAngle=0,
-                            labelFontSize=12,
-                            titleFontSize=14
-                        )
-                        st.altair_chart(final_chart, use_container_width=True)
+                        @fragment
+                        def most_sold_products_chart():
+                            top_n = st.slider("Select Top N Most Sold Products to Display", min_value=1,
+                                              max_value=min(len(product_sales), 50),
+                                              value=5)
+                            def build():
+                                top_sold_products = top_k_with_other(product_sales, 'Product_Name', 'Product_Quantity',
+                                                                     top_n)
+                                chart = alt.Chart(top_sold_products).mark_bar().encode(
+                                    x=alt.X('Product_Name:O', title='Product Name', sort=None),  # "Other" stays last
+                                    y=alt.Y('Product_Quantity:Q', title='Quantity Sold'),
+                                    color=alt.Color('Product_Quantity:Q', legend=None),
+                                    tooltip=['Product_Name:N', 'Product_Quantity:Q']
+                                ).properties(
+                                    width=700,
+                                    height=400,
+                                    title="Top N Most Sold Products"
+                                )
+                                text = chart.mark_text(
+                                    align='center',
+                                    baseline='middle',
+                                    dy=-10  # Adjust text position
+                                ).encode(
+                                    text='Product_Quantity:Q'
+                                )
+                                final_chart = chart + text
+                                final_chart = final_chart.configure_axis(
+                                    labelAngle=0,
+                                    labelFontSize=12,
+                                    titleFontSize=14
+                                )
+                                return final_chart
+                            show_chart('most_sold_products_chart:final_chart', build, use_container_width=True)
+                        most_sold_products_chart()
                     else:
                         st.title("Most Sold Products")
                         st.markdown("""
@@ -3252,17 +3552,12 @@ def show_products_page():
                 unsafe_allow_html=True)
 
         # Todo-Most Price Product
+        lap("Most Price Product")
         try:
             col1, col2 = st.columns(2)
             if df_products is not None and not df_products.empty:
                 with col1:
-                    df_products_ = df_products.dropna(subset=['Product_Published_At'])
-                    most_priced = (
-                        df_products_.groupby(["Product_ID", "Product_Title"])
-                        .agg({"Variant_Price": "max"})
-                        .reset_index()
-                        .sort_values(by="Variant_Price", ascending=False)
-                    )
+                    most_priced = aggregates['price_ranking'][0]
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
                         "Hover over the bars to view detailed information about the product title and its highest variant price, showcasing the most expensive products.")
@@ -3271,40 +3566,40 @@ def show_products_page():
                         unsafe_allow_html=True
                     )
                     st.markdown("### Displaying the most expensive products by price")
-                    top_n = st.slider("Select Top N Most Priced Products to Display", min_value=1,
-                                      max_value=len(most_priced), value=5)
-                    top_priced_products = most_priced.head(top_n)
-                    chart = alt.Chart(top_priced_products).mark_bar().encode(
-                        x=alt.X('Product_Title:O', title='Product Title', sort='-y'),
-                        y=alt.Y('Variant_Price:Q', title='Price ($)'),
-                        color=alt.Color('Variant_Price:Q', legend=None),
-                        tooltip=['Product_Title:N', 'Variant_Price:Q']
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Most Priced Products"
-                    )
-                    text = chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10  # Adjust text position
-                    ).encode(
-                        text='Variant_Price:Q'
-                    )
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=90,
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                    @fragment
+                    def most_priced_products_chart():
+                        top_n = st.slider("Select Top N Most Priced Products to Display", min_value=1,
+                                          max_value=len(most_priced), value=5)
+                        def build():
+                            top_priced_products = most_priced.head(top_n)
+                            chart = alt.Chart(top_priced_products).mark_bar().encode(
+                                x=alt.X('Product_Title:O', title='Product Title', sort='-y'),
+                                y=alt.Y('Variant_Price:Q', title='Price ($)'),
+                                color=alt.Color('Variant_Price:Q', legend=None),
+                                tooltip=['Product_Title:N', 'Variant_Price:Q']
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Most Priced Products"
+                            )
+                            text = chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10  # Adjust text position
+                            ).encode(
+                                text='Variant_Price:Q'
+                            )
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=90,
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('most_priced_products_chart:final_chart', build, use_container_width=True)
+                    most_priced_products_chart()
                 with col2:
-                    df_products_ = df_products.dropna(subset=['Product_Published_At'])
-                    Least_priced = (
-                        df_products_.groupby(["Product_ID", "Product_Title"])
-                        .agg({"Variant_Price": "min"})
-                        .reset_index()
-                    )
+                    Least_priced = aggregates['price_ranking'][1]
                     price_order = Least_priced.sort_values(by="Variant_Price", ascending=True)["Product_Title"].tolist()
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -3314,36 +3609,41 @@ def show_products_page():
                         unsafe_allow_html=True
                     )
                     st.markdown("### Displaying the Least expensive products by price")
-                    top_n = st.slider("Select Top N Products to Display", min_value=1, max_value=len(Least_priced),
-                                      value=5)
-                    top_priced_products = Least_priced.head(top_n)
-                    chart = alt.Chart(top_priced_products).mark_bar().encode(
-                        x=alt.X('Product_Title:O', title='Product Title', sort=price_order),
-                        # Custom sort order for X axis
-                        y=alt.Y('Variant_Price:Q', title='Price ($)'),
-                        color=alt.Color('Variant_Price:Q', legend=None),
-                        tooltip=['Product_Title:N', 'Variant_Price:Q']
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Least Priced Products"
-                    )
-                    text = chart.mark_text(
-                        align='center',
-                        baseline='middle',
-                        dy=-10  # Adjust text position
-                    ).encode(
-                        text='Variant_Price:Q'
-                    )
-                    # Combine chart and text
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=90,
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    # Display chart
-                    st.altair_chart(final_chart, use_container_width=True)
+                    @fragment
+                    def least_priced_products_chart():
+                        top_n = st.slider("Select Top N Products to Display", min_value=1, max_value=len(Least_priced),
+                                          value=5)
+                        def build():
+                            top_priced_products = Least_priced.head(top_n)
+                            chart = alt.Chart(top_priced_products).mark_bar().encode(
+                                x=alt.X('Product_Title:O', title='Product Title', sort=price_order),
+                                # Custom sort order for X axis
+                                y=alt.Y('Variant_Price:Q', title='Price ($)'),
+                                color=alt.Color('Variant_Price:Q', legend=None),
+                                tooltip=['Product_Title:N', 'Variant_Price:Q']
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Least Priced Products"
+                            )
+                            text = chart.mark_text(
+                                align='center',
+                                baseline='middle',
+                                dy=-10  # Adjust text position
+                            ).encode(
+                                text='Variant_Price:Q'
+                            )
+                            # Combine chart and text
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=90,
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            # Display chart
+                            return final_chart
+                        show_chart('least_priced_products_chart:final_chart', build, use_container_width=True)
+                    least_priced_products_chart()
             else:
                 with col1:
                     st.title("Most Priced Products ")
@@ -3365,27 +3665,10 @@ def show_products_page():
                 unsafe_allow_html=True)
 
         # Todo- List for unsold product----------------------------------
+        lap("List for unsold product")
         try:
             if (df_products is not None and not df_products.empty) and (df_orders is not None and not df_orders.empty):
-                df_products_cleaned = df_products.dropna(subset=['Product_Published_At'])
-                sold_product_ids = df_orders['Product_ID'].unique()
-                all_product_ids = df_products_cleaned['Product_ID']
-                unsold_product_ids = all_product_ids[~all_product_ids.isin(sold_product_ids)]
-                unsold_products = df_products_cleaned[df_products_cleaned['Product_ID'].isin(unsold_product_ids)]
-                unsold_products_grouped = unsold_products.groupby(
-                    ['Product_ID', 'Product_Title', 'Product_Published_At'], as_index=False).first()
-                unsold_products_grouped['Product_ID'] = unsold_products_grouped['Product_ID'].astype(str).replace(",",
-                                                                                                                  "",
-                                                                                                                  regex=True)
-                unsold_products_grouped['Product_Published_At'] = \
-                    unsold_products_grouped['Product_Published_At'].str.split("T").str[0]
-                unsold_products_grouped['Product_Published_At'] = pd.to_datetime(
-                    unsold_products_grouped['Product_Published_At'])
-                unsold_products_grouped_sorted = unsold_products_grouped.sort_values(by='Product_Published_At',
-                                                                                     ascending=True)
-                unsold_products_grouped_sorted['Product_Published_At'] = unsold_products_grouped_sorted[
-                    'Product_Published_At'].dt.date
-                Data_display = unsold_products_grouped_sorted[['Product_ID', 'Product_Title', 'Product_Published_At']]
+                Data_display = aggregates['unsold']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "Displaying a summary of products that have not been sold, including their product IDs, titles, and the date they were published.")
@@ -3404,38 +3687,9 @@ def show_products_page():
                 """, unsafe_allow_html=True)
 
             # Todo-Count of products in each price range
+            lap("Count of products in each price range")
             if df_products is not None and not df_products.empty:
-                df_products_cleaned = df_products.dropna(subset=['Product_Published_At'])
-                min_price = df_products_cleaned['Variant_Price'].min()
-                max_price = df_products_cleaned['Variant_Price'].max()
-                price_range = max_price - min_price
-                q1 = df_products_cleaned['Variant_Price'].quantile(0.25)
-                q3 = df_products_cleaned['Variant_Price'].quantile(0.75)
-                iqr = q3 - q1
-                n = len(df_products_cleaned)
-                # Freedman-Diaconis Rule to calculate bin width
-                if iqr > 0 and n > 1:
-                    bin_width = 2 * iqr / (n ** (1 / 3))  # Dynamic bin width
-                else:
-                    bin_width = price_range / 5  # Fallback: divide into 5 bins if data is uniform
-                # Calculate the number of bins dynamically
-                num_bins = max(1, int(price_range / bin_width))  # Ensure at least 1 bin
-                # Create dynamic price bins based on the min and max price
-                price_bins = pd.cut(df_products_cleaned['Variant_Price'], bins=num_bins)
-                # Adjust bin edges if any lower bounds are negative
-                bin_edges = price_bins.cat.categories
-                if bin_edges[0].left < 0:
-                    bin_edges = pd.IntervalIndex(
-                        [pd.Interval(max(0, interval.left), interval.right) for interval in bin_edges])
-                    price_bins = pd.cut(df_products_cleaned['Variant_Price'], bins=bin_edges)
-                # Create dynamic labels for the price bins
-                price_labels = [f"{max(0, round(bin.left, 2))} - {round(bin.right, 2)}" for bin in
-                                price_bins.cat.categories]
-                # Create a new column 'Price_Range' to categorize products into dynamic price ranges
-                df_products_cleaned['Price_Range'] = pd.cut(df_products_cleaned['Variant_Price'], bins=num_bins,
-                                                            labels=price_labels, include_lowest=True)
-                price_range_counts = df_products_cleaned['Price_Range'].value_counts().reset_index()
-                price_range_counts.columns = ['Price_Range', 'Count']
+                price_range_counts, price_labels = aggregates['price_ranges']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "This chart displays the count of products in different price ranges. Hover over each bar to view the specific price range and the corresponding number of products.")
@@ -3444,31 +3698,33 @@ def show_products_page():
                     unsafe_allow_html=True
                 )
                 st.markdown("### Displaying the count of products in different price ranges")
-                chart = alt.Chart(price_range_counts).mark_bar().encode(
-                    x=alt.X('Price_Range:N', title='Price Range', sort=price_labels),
-                    y=alt.Y('Count:Q', title='Number of Products'),
-                    color=alt.Color('Count:Q', legend=None),
-                    tooltip=['Price_Range:N', 'Count:Q']
-                ).properties(
-                    width=700,
-                    height=400,
-                    title="Count of Products in Each Price Range"
-                )
-                # Adding text labels on the bars
-                text = chart.mark_text(
-                    align='center',
-                    baseline='middle',
-                    dy=-10  # Adjust text position
-                ).encode(
-                    text='Count:Q'
-                )
-                final_chart = chart + text
-                final_chart = final_chart.configure_axis(
-                    labelAngle=90,
-                    labelFontSize=10,
-                    titleFontSize=14
-                )
-                st.altair_chart(final_chart, use_container_width=True)
+                def build():
+                    chart = alt.Chart(price_range_counts).mark_bar().encode(
+                        x=alt.X('Price_Range:N', title='Price Range', sort=price_labels),
+                        y=alt.Y('Count:Q', title='Number of Products'),
+                        color=alt.Color('Count:Q', legend=None),
+                        tooltip=['Price_Range:N', 'Count:Q']
+                    ).properties(
+                        width=700,
+                        height=400,
+                        title="Count of Products in Each Price Range"
+                    )
+                    # Adding text labels on the bars
+                    text = chart.mark_text(
+                        align='center',
+                        baseline='middle',
+                        dy=-10  # Adjust text position
+                    ).encode(
+                        text='Count:Q'
+                    )
+                    final_chart = chart + text
+                    final_chart = final_chart.configure_axis(
+                        labelAngle=90,
+                        labelFontSize=10,
+                        titleFontSize=14
+                    )
+                    return final_chart
+                show_chart('show_products_page:final_chart', build, use_container_width=True)
             else:
                 st.title("Count of Products in Each Price Range")
                 st.markdown("""
@@ -3504,15 +3760,13 @@ def show_revenue_page():
     )
     add_custom_css()
     try:
+        aggregates = page_aggregates('Revenue')
         try:
             col1, col2, col3 = st.columns(3)
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
-                Total_price = df_unique_orders['Order_Total_Price'].sum()
-                Total_price = round(Total_price, 2)
-                Average_Revenue_ = df_unique_orders['Order_Total_Price'].mean()
-                Average_Revenue = round(Average_Revenue_, 2)
-                Total_amaount_refund = df_unique_orders['Order_Refund_Amount'].sum()
+                Total_price = aggregates['kpis']['total_revenue']
+                Average_Revenue = aggregates['kpis']['average_revenue']
+                Total_amaount_refund = aggregates['kpis']['total_refund']
                 with col1:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -3597,8 +3851,8 @@ def show_revenue_page():
             st.markdown(f"<h1 style='display: inline-block;'>Preview Filtered Revenue Data {tooltip_html}</h1>",
                         unsafe_allow_html=True
                         )
-            filtered_products = filter_by_date(df_orders, 'Order_Created_At')
-            st.dataframe(filtered_products)
+            filtered_products, date_range = filter_by_date(df_orders, 'Order_Created_At', dataset='Orders_Dataset')
+            show_paginated_table(filtered_products, 'filtered_revenue_orders', date_range=date_range)
         else:
             st.title("Preview of revenue data filtered by the selected date range.")
             st.markdown("""
@@ -3608,38 +3862,21 @@ def show_revenue_page():
             """, unsafe_allow_html=True)
 
         # Todo-Total revenue placed: weekday vs weekend-----------------------
+        lap("Total revenue placed: weekday vs weekend")
         col1, col2 = st.columns(2)
         try:
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
-                # Ensure the 'Order_Created_At' column is in datetime format
-                df_unique_orders['Order_Created_At'] = pd.to_datetime(df_unique_orders['Order_Created_At'],
-                                                                      errors='coerce',
-                                                                      utc=True)
-                # Add a new column for Weekday/Weekend
-                df_unique_orders['Weekday_Weekend'] = df_unique_orders['Order_Created_At'].dt.dayofweek.apply(
-                    lambda x: 'Weekend' if x >= 5 else 'Weekday'
-                )
-                weekday_revenue = df_unique_orders[df_unique_orders['Weekday_Weekend'] == 'Weekday'][
-                    'Order_Total_Price'].sum()
-                weekend_revenue = df_unique_orders[df_unique_orders['Weekday_Weekend'] == 'Weekend'][
-                    'Order_Total_Price'].sum()
-                revenues = [weekday_revenue, weekend_revenue]
-                labels = ['Weekday', 'Weekend']
-                pie_data_revenue = pd.DataFrame({
-                    'Category': labels,
-                    'Revenue': revenues,
-                    'Percentage': [(rev / sum(revenues)) * 100 for rev in revenues]
-                })
+                pie_data_revenue = aggregates['weekday_weekend'].rename(columns={'Count': 'Revenue'})
                 pie_data_revenue['Label'] = pie_data_revenue['Percentage'].round(1).astype(str) + '%'
                 # Add formatted revenue with € symbol for tooltips
                 pie_data_revenue['Total_Revenue'] = '€' + pie_data_revenue['Revenue'].round(2).astype(str)
                 # Create the pie chart using Altair
-                pie_chart_revenue = alt.Chart(pie_data_revenue).mark_arc().encode(
-                    theta=alt.Theta(field="Revenue", type="quantitative"),
-                    color=alt.Color(field="Category", type="nominal"),
-                    tooltip=["Category", "Total_Revenue:N", "Percentage"]
-                )
+                def build_pie_chart_revenue():
+                    return alt.Chart(pie_data_revenue).mark_arc().encode(
+                        theta=alt.Theta(field="Revenue", type="quantitative"),
+                        color=alt.Color(field="Category", type="nominal"),
+                        tooltip=["Category", "Total_Revenue:N", "Percentage"]
+                    )
                 # Display the results in Streamlit
                 # st.write(f"Weekday Revenue: €{weekday_revenue:.2f} ({(weekday_revenue / sum(revenues)) * 100:.2f}%)")
                 # st.write(f"Weekend Revenue: €{weekend_revenue:.2f} ({(weekend_revenue / sum(revenues)) * 100:.2f}%)")
@@ -3652,7 +3889,7 @@ def show_revenue_page():
                         f"<h1 style='display: inline-block;'>Total Revenue Placed: Weekday vs Weekend {tooltip_html}</h1>",
                         unsafe_allow_html=True
                         )
-                    st.altair_chart(pie_chart_revenue, use_container_width=True)
+                    show_chart('show_revenue_page:pie_chart_revenue', build_pie_chart_revenue, use_container_width=True)
             else:
                 st.title("Total Revenue Placed: Weekday vs Weekend")
                 st.markdown("""
@@ -3662,29 +3899,22 @@ def show_revenue_page():
                    """, unsafe_allow_html=True)
 
             # Todo-Total revenue placed: days of week--------------------------
+            lap("Total revenue placed: days of week")
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
-                df_unique_orders['Order_Created_At'] = pd.to_datetime(df_unique_orders['Order_Created_At'],
-                                                                      errors='coerce', utc=True)
-                df_unique_orders['days_of_week'] = df_unique_orders['Order_Created_At'].dt.dayofweek.apply(
-                    lambda x: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][x]
-                )
-                revenue_per_day = df_unique_orders.groupby('days_of_week')['Order_Total_Price'].sum()
-                revenue_per_day = revenue_per_day.reindex(
-                    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], fill_value=0
-                )
+                revenue_per_day = aggregates['day_of_week']
                 pie_data_revenue = pd.DataFrame({
                     'Day': revenue_per_day.index,
                     'Revenue': revenue_per_day.values
                 })
                 pie_data_revenue['Total_Revenue'] = '€' + pie_data_revenue['Revenue'].round(2).astype(str)
-                pie_chart_revenue = alt.Chart(pie_data_revenue).mark_arc().encode(
-                    theta=alt.Theta(field="Revenue", type="quantitative"),
-                    color=alt.Color(field="Day", type="nominal",
-                                    sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
-                                          'Sunday']),
-                    tooltip=["Day:N", "Total_Revenue:N"]
-                )
+                def build_pie_chart_revenue():
+                    return alt.Chart(pie_data_revenue).mark_arc().encode(
+                        theta=alt.Theta(field="Revenue", type="quantitative"),
+                        color=alt.Color(field="Day", type="nominal",
+                                        sort=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
+                                              'Sunday']),
+                        tooltip=["Day:N", "Total_Revenue:N"]
+                    )
                 with col2:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -3692,7 +3922,7 @@ def show_revenue_page():
                     st.markdown(
                         f"<h1 style='display: inline-block;'>Total Revenue Placed: Days of the Week {tooltip_html}</h1>",
                         unsafe_allow_html=True)
-                    st.altair_chart(pie_chart_revenue, use_container_width=True)
+                    show_chart('show_revenue_page:pie_chart_revenue#2', build_pie_chart_revenue, use_container_width=True)
             else:
                 st.title("Total Revenue Placed: Days of the Week")
                 st.markdown("""
@@ -3717,16 +3947,10 @@ def show_revenue_page():
                    """, unsafe_allow_html=True)
 
         # Todo---Total revenue placed: hours of day-------------------------------
+        lap("Total revenue placed: hours of day")
         try:
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
-                df_unique_orders['Order_Created_At'] = pd.to_datetime(df_unique_orders['Order_Created_At'],
-                                                                      errors='coerce',
-                                                                      utc=True)
-                df_unique_orders['hour_of_day'] = df_unique_orders[
-                                                      'Order_Created_At'].dt.hour + 1  # Shift hours to 1-24 range
-                revenue_per_hour = df_unique_orders.groupby('hour_of_day')['Order_Total_Price'].sum()
-                revenue_per_hour = revenue_per_hour.reindex(range(1, 25), fill_value=0)
+                revenue_per_hour = aggregates['hour_of_day']
                 hour_revenue_data = pd.DataFrame({
                     'Hour of Day': revenue_per_hour.index,
                     'Total Revenue': revenue_per_hour.values
@@ -3739,21 +3963,23 @@ def show_revenue_page():
                     f"<h1 style='display: inline-block;'>Total Revenue Placed: Hours of Day {tooltip_html}</h1>",
                     unsafe_allow_html=True)
                 st.markdown("<h3 style='text-align: center;'>Revenue by Hour of the Day</h3>", unsafe_allow_html=True)
-                line_chart = alt.Chart(hour_revenue_data).mark_line().encode(
-                    x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
-                    y=alt.Y('Total Revenue:Q', title='Total Revenue (€)'),
-                    tooltip=['Hour of Day', 'Overall Revenue']
-                ).properties(
-                    width=700,
-                    height=400
-                )
-                points = alt.Chart(hour_revenue_data).mark_point(size=100, color='blue').encode(
-                    x=alt.X('Hour of Day:O', title='Hour of Day'),
-                    y=alt.Y('Total Revenue:Q', title='Total Revenue (€)'),
-                    tooltip=['Hour of Day', 'Overall Revenue']
-                )
-                combined_chart = line_chart + points
-                st.altair_chart(combined_chart, use_container_width=True)
+                def build():
+                    line_chart = alt.Chart(hour_revenue_data).mark_line().encode(
+                        x=alt.X('Hour of Day:O', title='Hour of Day', scale=alt.Scale(domain=list(range(1, 25)))),
+                        y=alt.Y('Total Revenue:Q', title='Total Revenue (€)'),
+                        tooltip=['Hour of Day', 'Overall Revenue']
+                    ).properties(
+                        width=700,
+                        height=400
+                    )
+                    points = alt.Chart(hour_revenue_data).mark_point(size=100, color='blue').encode(
+                        x=alt.X('Hour of Day:O', title='Hour of Day'),
+                        y=alt.Y('Total Revenue:Q', title='Total Revenue (€)'),
+                        tooltip=['Hour of Day', 'Overall Revenue']
+                    )
+                    combined_chart = line_chart + points
+                    return combined_chart
+                show_chart('show_revenue_page:combined_chart', build, use_container_width=True)
             else:
                 st.title("Total Revenue Placed: Hours of Day")
                 st.markdown("""
@@ -3768,25 +3994,15 @@ def show_revenue_page():
                 unsafe_allow_html=True)
 
         # Todo-Total revenue placed: day, month, quarter, year----------------------------
+        lap("Total revenue placed: day, month, quarter, year")
         try:
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset='Order_ID', keep='first')
-                # Ensure the 'Order_Created_At' column is in datetime format
-                df_unique_orders['Order_Created_At'] = pd.to_datetime(df_unique_orders['Order_Created_At'],
-                                                                      errors='coerce',
-                                                                      utc=True)
-                # Extract the day, month, quarter, and year
-                df_unique_orders['day'] = df_unique_orders['Order_Created_At'].dt.date
-                df_unique_orders['month'] = df_unique_orders['Order_Created_At'].dt.to_period('M').astype(
-                    str)  # Year-Month format
-                df_unique_orders['quarter'] = df_unique_orders['Order_Created_At'].dt.to_period('Q').astype(
-                    str)  # Year-Quarter format
-                df_unique_orders['year'] = df_unique_orders['Order_Created_At'].dt.year
-                # Group by day, month, quarter, and year to calculate total revenue
-                revenue_per_day = df_unique_orders.groupby('day')['Order_Total_Price'].sum().reset_index()
-                revenue_per_month = df_unique_orders.groupby('month')['Order_Total_Price'].sum().reset_index()
-                revenue_per_quarter = df_unique_orders.groupby('quarter')['Order_Total_Price'].sum().reset_index()
-                revenue_per_year = df_unique_orders.groupby('year')['Order_Total_Price'].sum().reset_index()
+                # Total revenue per day, month, quarter and year
+                per_period = aggregates['per_period']
+                revenue_per_day = per_period['day']
+                revenue_per_month = per_period['month']
+                revenue_per_quarter = per_period['quarter']
+                revenue_per_year = per_period['year']
                 add_tooltip_css()
                 tooltip_html = render_tooltip(
                     "This chart displays the total revenue for different time periods. Select between daily, monthly, quarterly, or yearly views. Hover over the chart to see the specific time period (day, month, quarter, or year) and the corresponding total revenue in euros.")
@@ -3794,90 +4010,102 @@ def show_revenue_page():
                     f"<h1 style='display: inline-block;'>Revenue Visualizations (Day,Month,Quarter,Year) {tooltip_html}</h1>",
                     unsafe_allow_html=True
                 )
-                view = st.radio("Select View",
-                                ['Revenue per Day', 'Revenue per Month', 'Revenue per Quarter', 'Revenue per Year'])
-                if view == 'Revenue per Day':
-                    st.title('Revenue Placed: Days')
-                    st.markdown("<h3 style='text-align: center;'>Revenue by Day</h3>", unsafe_allow_html=True)
-                    # Define the line chart-------------
-                    line_chart = alt.Chart(revenue_per_day).mark_line().encode(
-                        x=alt.X(
-                            'day:T',
-                            title='Date',
-                            axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)  # Adjust axis labels
-                        ),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
-                        tooltip=['day:T', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    # Define the points for emphasis--------
-                    points = alt.Chart(revenue_per_day).mark_point(size=60, color='blue').encode(
-                        x='day:T',
-                        y='Order_Total_Price:Q',
-                        tooltip=['day:T', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    # Combine the line chart and points
-                    combined_chart = line_chart + points
-                    # Set chart properties
-                    combined_chart = combined_chart.properties(
-                        width=700,  # Adjust width for better readability
-                        height=400  # Adjust height
-                    )
-                    # Display the chart in Streamlit
-                    st.altair_chart(combined_chart, use_container_width=True)
-                elif view == 'Revenue per Month':
-                    st.title('Revenue Placed: Months')
-                    st.markdown("<h3 style='text-align: center;'>Revenue by Month</h3>", unsafe_allow_html=True)
-                    revenue_per_month['month'] = pd.to_datetime(revenue_per_month['month'], format='%Y-%m')
-                    revenue_per_month['month'] = revenue_per_month['month'].dt.strftime(
-                        '%b %Y')  # Convert to Month Year format
-                    line_chart = alt.Chart(revenue_per_month).mark_line().encode(
-                        x=alt.X('month:O', title='Month', axis=alt.Axis(labelAngle=-45)),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
-                        tooltip=['month:N',
-                                 alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    points = alt.Chart(revenue_per_month).mark_point(size=60, color='blue').encode(
-                        x='month:O',
-                        y='Order_Total_Price:Q',
-                        tooltip=['month:N',
-                                 alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    combined_chart = line_chart + points
-                    st.altair_chart(combined_chart, use_container_width=True)
-
-                elif view == 'Revenue per Quarter':
-                    st.title('Revenue Placed: Quarters')
-                    st.markdown("<h3 style='text-align: center;'>Revenue by Quarter</h3>", unsafe_allow_html=True)
-                    line_chart = alt.Chart(revenue_per_quarter).mark_line().encode(
-                        x=alt.X('quarter:N', title='Quarter'),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
-                        tooltip=['quarter:N',
-                                 alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    points = alt.Chart(revenue_per_quarter).mark_point(size=60, color='blue').encode(
-                        x='quarter:N',
-                        y='Order_Total_Price:Q',
-                        tooltip=['quarter:N',
-                                 alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    combined_chart = line_chart + points
-                    st.altair_chart(combined_chart, use_container_width=True)
-
-                elif view == 'Revenue per Year':
-                    st.title('Revenue Placed: Years')
-                    st.markdown("<h3 style='text-align: center;'>Revenue by Year</h3>", unsafe_allow_html=True)
-                    line_chart = alt.Chart(revenue_per_year).mark_line().encode(
-                        x=alt.X('year:O', title='Year'),
-                        y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
-                        tooltip=['year:O', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    points = alt.Chart(revenue_per_year).mark_point(size=60, color='blue').encode(
-                        x='year:O',
-                        y='Order_Total_Price:Q',
-                        tooltip=['year:O', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
-                    )
-                    combined_chart = line_chart + points
-                    st.altair_chart(combined_chart, use_container_width=True)
+                @fragment
+                def revenue_period_chart():
+                    view = st.radio("Select View",
+                                    ['Revenue per Day', 'Revenue per Month', 'Revenue per Quarter', 'Revenue per Year'])
+                    if view == 'Revenue per Day':
+                        st.title('Revenue Placed: Days')
+                        st.markdown("<h3 style='text-align: center;'>Revenue by Day</h3>", unsafe_allow_html=True)
+                        def build():
+                            revenue_plot = chart_series(revenue_per_day, 'day', 'Order_Total_Price', 'Revenue per Day')
+                            # Define the line chart-------------
+                            line_chart = alt.Chart(revenue_plot).mark_line().encode(
+                                x=alt.X(
+                                    'day:T',
+                                    title='Date',
+                                    axis=alt.Axis(format="%b %d, %Y", labelAngle=-90, tickMinStep=1)  # Adjust axis labels
+                                ),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
+                                tooltip=['day:T', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            # Define the points for emphasis--------
+                            points = alt.Chart(revenue_plot).mark_point(size=60, color='blue').encode(
+                                x='day:T',
+                                y='Order_Total_Price:Q',
+                                tooltip=['day:T', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            # Combine the line chart and points, the points only while they stay readable
+                            combined_chart = with_points(line_chart, points, revenue_plot)
+                            # Set chart properties
+                            combined_chart = combined_chart.properties(
+                                width=700,  # Adjust width for better readability
+                                height=400  # Adjust height
+                            )
+                            # Display the chart in Streamlit
+                            return combined_chart
+                        show_chart('revenue_period_chart:combined_chart', build, use_container_width=True)
+                    elif view == 'Revenue per Month':
+                        st.title('Revenue Placed: Months')
+                        st.markdown("<h3 style='text-align: center;'>Revenue by Month</h3>", unsafe_allow_html=True)
+                        revenue_per_month['month'] = pd.to_datetime(revenue_per_month['month'], format='%Y-%m')
+                        revenue_per_month['month'] = revenue_per_month['month'].dt.strftime(
+                            '%b %Y')  # Convert to Month Year format
+                        def build():
+                            line_chart = alt.Chart(revenue_per_month).mark_line().encode(
+                                x=alt.X('month:O', title='Month', axis=alt.Axis(labelAngle=-45)),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
+                                tooltip=['month:N',
+                                         alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            points = alt.Chart(revenue_per_month).mark_point(size=60, color='blue').encode(
+                                x='month:O',
+                                y='Order_Total_Price:Q',
+                                tooltip=['month:N',
+                                         alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            combined_chart = line_chart + points
+                            return combined_chart
+                        show_chart('revenue_period_chart:combined_chart#2', build, use_container_width=True)
+
+                    elif view == 'Revenue per Quarter':
+                        st.title('Revenue Placed: Quarters')
+                        st.markdown("<h3 style='text-align: center;'>Revenue by Quarter</h3>", unsafe_allow_html=True)
+                        def build():
+                            line_chart = alt.Chart(revenue_per_quarter).mark_line().encode(
+                                x=alt.X('quarter:N', title='Quarter'),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
+                                tooltip=['quarter:N',
+                                         alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            points = alt.Chart(revenue_per_quarter).mark_point(size=60, color='blue').encode(
+                                x='quarter:N',
+                                y='Order_Total_Price:Q',
+                                tooltip=['quarter:N',
+                                         alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            combined_chart = line_chart + points
+                            return combined_chart
+                        show_chart('revenue_period_chart:combined_chart#3', build, use_container_width=True)
+
+                    elif view == 'Revenue per Year':
+                        st.title('Revenue Placed: Years')
+                        st.markdown("<h3 style='text-align: center;'>Revenue by Year</h3>", unsafe_allow_html=True)
+                        def build():
+                            line_chart = alt.Chart(revenue_per_year).mark_line().encode(
+                                x=alt.X('year:O', title='Year'),
+                                y=alt.Y('Order_Total_Price:Q', title='Total Revenue (€)'),
+                                tooltip=['year:O', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            points = alt.Chart(revenue_per_year).mark_point(size=60, color='blue').encode(
+                                x='year:O',
+                                y='Order_Total_Price:Q',
+                                tooltip=['year:O', alt.Tooltip('Order_Total_Price:Q', format=",.2f", title="Total Revenue (€)")]
+                            )
+                            combined_chart = line_chart + points
+                            return combined_chart
+                        show_chart('revenue_period_chart:combined_chart#4', build, use_container_width=True)
+                revenue_period_chart()
             else:
                 st.title("Revenue Visualizations (Day,Month,Quarter,Year)")
                 st.markdown("""
@@ -3891,12 +4119,10 @@ def show_revenue_page():
                 unsafe_allow_html=True)
 
         # Todo-Order Refering site chart
+        lap("Order Refering site chart")
         try:
             if df_orders is not None and not df_orders.empty:
-                df_unique_orders = df_orders.drop_duplicates(subset="Order_ID", keep="first")
-                total_revenue_by_site = df_unique_orders.groupby("Order_Referring_Site")[
-                    "Order_Total_Price"].sum().reset_index()
-                total_revenue_by_site.columns = ["Referring Site", "Total Revenue"]
+                total_revenue_by_site = aggregates['referring_sites']
                 if not total_revenue_by_site.empty:
                     add_tooltip_css()
                     tooltip_html = render_tooltip(
@@ -3906,37 +4132,42 @@ def show_revenue_page():
                         unsafe_allow_html=True
                     )
                     st.markdown("### Visualizing the total revenue generated by different referring sites")
-                    top_n = st.slider("Select Top N Referring Sites to Display", min_value=1,
-                                      max_value=len(total_revenue_by_site), value=5)
-                    top_revenue_sites = total_revenue_by_site.nlargest(top_n, "Total Revenue")
-                    # Step 4: Create Altair Chart
-                    chart = alt.Chart(top_revenue_sites).mark_bar().encode(
-                        x=alt.X("Referring Site:O", title="Referring Site", sort="-y"),
-                        y=alt.Y("Total Revenue:Q", title="Total Revenue (€)"),
-                        color=alt.Color("Total Revenue:Q", legend=None),
-                        tooltip=["Referring Site:N",
-                                 alt.Tooltip("Total Revenue:Q", format=",.2f", title="Total Revenue (€)")],
-                    ).properties(
-                        width=700,
-                        height=400,
-                        title="Top N Referring Sites by Total Revenue"
-                    )
-                    # Adding text labels on the bars
-                    text = chart.mark_text(
-                        align="center",
-                        baseline="middle",
-                        dy=-10  # Adjust text position
-                    ).encode(
-                        text=alt.Text("Total Revenue:Q", format=",.2f")
-                    )
-                    # Combine chart and text
-                    final_chart = chart + text
-                    final_chart = final_chart.configure_axis(
-                        labelAngle=0,
-                        labelFontSize=12,
-                        titleFontSize=14
-                    )
-                    st.altair_chart(final_chart, use_container_width=True)
+                    @fragment
+                    def revenue_referring_sites_chart():
+                        top_n = st.slider("Select Top N Referring Sites to Display", min_value=1,
+                                          max_value=min(len(total_revenue_by_site), 50), value=5)
+                        def build():
+                            top_revenue_sites = top_k_with_other(total_revenue_by_site, "Referring Site", "Total Revenue", top_n)
+                            # Step 4: Create Altair Chart
+                            chart = alt.Chart(top_revenue_sites).mark_bar().encode(
+                                x=alt.X("Referring Site:O", title="Referring Site", sort=None),
+                                y=alt.Y("Total Revenue:Q", title="Total Revenue (€)"),
+                                color=alt.Color("Total Revenue:Q", legend=None),
+                                tooltip=["Referring Site:N",
+                                         alt.Tooltip("Total Revenue:Q", format=",.2f", title="Total Revenue (€)")],
+                            ).properties(
+                                width=700,
+                                height=400,
+                                title="Top N Referring Sites by Total Revenue"
+                            )
+                            # Adding text labels on the bars
+                            text = chart.mark_text(
+                                align="center",
+                                baseline="middle",
+                                dy=-10  # Adjust text position
+                            ).encode(
+                                text=alt.Text("Total Revenue:Q", format=",.2f")
+                            )
+                            # Combine chart and text
+                            final_chart = chart + text
+                            final_chart = final_chart.configure_axis(
+                                labelAngle=0,
+                                labelFontSize=12,
+                                titleFontSize=14
+                            )
+                            return final_chart
+                        show_chart('revenue_referring_sites_chart:final_chart', build, use_container_width=True)
+                    revenue_referring_sites_chart()
                 else:
                     st.title("Order Refering site chart")
                     st.markdown("""
@@ -3963,24 +4194,232 @@ def show_revenue_page():
             unsafe_allow_html=True)
 
 
-page = st.sidebar.selectbox("Select a Page",
-                            ['Customer Journey', 'Customer Data', 'Order Data', 'Abandoned Checkouts', 'Products',
-                             'Revenue'])
+PERF_HISTORY_SIZE = 50
+PROFILE_DIR = os.path.join(BASE_DIR, "cache", "profiles")
+# ?profile=1 only profiles when the server was started with DASHBOARD_PROFILING=1, keeping the last PROFILES_KEPT
+PROFILING = os.environ.get("DASHBOARD_PROFILING", "").lower() in ('1', 'true', 'yes')
+PROFILES_KEPT = 20
+
+
+def show_performance_panel(container, records, page):
+    page_seconds = sum(record['seconds'] for record in records if record['kind'] == 'page')
+    load_seconds = sum(record['seconds'] for record in records if record['kind'] == 'load')
+    history = st.session_state.setdefault('perf_history', [])
+    history.append({'store': store_select, 'page': page, 'page_seconds': round(page_seconds, 3),
+                    'load_seconds': round(load_seconds, 3)})
+    del history[:-PERF_HISTORY_SIZE]
+    if not st.session_state.get('show_performance'):
+        return
+    with container:
+        st.markdown(f"### Performance\nThis rerun: **{page_seconds + load_seconds:.2f}s** "
+                    f"(page {page_seconds:.2f}s, load {load_seconds:.2f}s)")
+        slowest_sections = slowest(records)
+        slowest_sections['seconds'] = slowest_sections['seconds'].round(4)
+        slowest_sections['MB'] = (slowest_sections.pop('bytes') / 1024 ** 2).round(2)
+        st.dataframe(slowest_sections, use_container_width=True, hide_index=True)
+        stats = computation_cache().stats()
+        hit_rate = "-" if stats['hit_rate'] is None else f"{stats['hit_rate']:.0%}"
+        st.markdown(f"Shared computations: {stats['entries']} kept ({stats['bytes'] / 1024 ** 2:.1f} MB), "
+                    f"{stats['hits']} hits, {stats['waits']} waited on another session, {stats['misses']} computed, "
+                    f"{stats['evictions']} evicted, {stats['errors']} failed (hit rate {hit_rate})")
+        st.markdown(f"#### Last {len(history)} reruns")
+        history_df = pd.DataFrame(history)
+        st.line_chart(history_df[['page_seconds', 'load_seconds']])
+        st.dataframe(history_df.iloc[::-1], use_container_width=True, hide_index=True)
+
+
+@st.cache_data(show_spinner=False)
+def load_memory_report(store, fingerprint, _frames):
+    return memory_report(_frames)
+
+
+def show_memory_panel(container):
+    if not st.session_state.get('show_memory') or not store_select:
+        return
+    report = load_memory_report(store_select, data_fingerprint(), store_frames)
+    summary = memory_summary(report)
+    loaded_mb = summary.loc[summary['frame'].str.startswith('df:'), 'bytes'].sum() / 1024 ** 2
+    derived_mb = summary.loc[summary['frame'].str.startswith('derived:'), 'bytes'].sum() / 1024 ** 2
+    # What this session holds: the frames of the selected store plus any DataFrame kept in session state
+    session_state_mb = sum(value.memory_usage(deep=True).sum() for value in st.session_state.values()
+                           if isinstance(value, pd.DataFrame)) / 1024 ** 2
+    memory_by_store = st.session_state.setdefault('memory_by_store', {})
+    memory_by_store[store_select] = round(loaded_mb + derived_mb, 2)
+    with container:
+        st.markdown(f"### Memory\n**{store_select}**: {loaded_mb:.2f} MB loaded, {derived_mb:.2f} MB derived  \n"
+                    f"This session: {loaded_mb + derived_mb + session_state_mb:.2f} MB "
+                    f"(stores viewed: {', '.join(f'{store} {mb} MB' for store, mb in memory_by_store.items())})")
+        st.dataframe(summary[['frame', 'rows', 'MB', 'flagged_columns', 'possible_saving']],
+                     use_container_width=True, hide_index=True)
+        flagged = flagged_columns(report)
+        if not flagged.empty:
+            st.markdown("Object columns worth converting")
+            st.dataframe(flagged[['frame', 'column', 'unique', 'bytes', 'suggestion', 'suggested_bytes']],
+                         use_container_width=True, hide_index=True)
+
+
+def show_profile(pstats_path, hotspot_table):
+    with st.expander("cProfile of this rerun", expanded=True):
+        st.markdown(f"Saved to `{pstats_path}` (open with `python -m pstats` or snakeviz)")
+        st.dataframe(hotspot_table, use_container_width=True, hide_index=True)
+        with open(pstats_path, 'rb') as f:
+            st.download_button("Download .pstats", f.read(), file_name=os.path.basename(pstats_path),
+                               mime="application/octet-stream")
+
+
+def main():
+    global store_select, store_frames, df_abandoned_checkouts, df_cj, df_customers, df_orders, df_products, \
+        cj_streamed_aggregates
+    full_date_bounds.clear()
+    start_run()
+    st.set_page_config(
+        page_title="QQQeApps:Dashboard",
+        page_icon="🔧",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    st.markdown(
+        """
+        <style>
+        .css-1d3912d {  /* This selector targets the Streamlit's dark theme toggle button */
+            background-color: #000;
+            color: white;
+        }
+        </style>
+        """, unsafe_allow_html=True
+    )
+
+    st.sidebar.markdown(
+        """
+        <h1 style='text-align: center;
+                   font-size: 40px;
+                   font-family: Arial, sans-serif;
+                   background: linear-gradient(to right, white, navy);
+                   -webkit-background-clip: text;
+                   -webkit-text-fill-color: transparent;'>
+            QQQe Dashboard
+        </h1>
+        """,
+        unsafe_allow_html=True
+    )
+
+    store_names = get_store_names(data_dir)
+    store_select = st.sidebar.selectbox('Select Store', store_names)
+    # pyarrow CSV engine with text kept as Arrow strings, see `python Ingestion_report.py <store>`
+    st.sidebar.toggle("Arrow ingestion", key="arrow_ingestion", disabled=not ARROW_INGESTION)
+
+    warmer = cache_warmer()
+    if store_select:
+        warmer.record_use(store_select)
+        data_files = {
+            'AbandonedCheckouts': f"{store_select}_AbandonedCheckouts.csv",
+            'CJ': f"{store_select}_CJ.csv",
+            'Customers_Dataset': f"{store_select}_Customers_Dataset.csv",
+            'Orders_Dataset': f"{store_select}_Orders_Dataset.csv",
+            'Products_Dataset': f"{store_select}_Products_Dataset.csv"
+        }
+        try:
+            df_abandoned_checkouts = load_dataset('AbandonedCheckouts',
+                                                  os.path.join(data_dir, data_files['AbandonedCheckouts']))
+            if df_abandoned_checkouts is not None and df_abandoned_checkouts.empty:
+                df_abandoned_checkouts = None
+        except:
+            df_abandoned_checkouts = None
 
-if page == 'Customer Journey':
-    show_cj_page()
+        cj_streamed_aggregates = None
+        try:
+            cj_path = os.path.join(data_dir, data_files['CJ'])
+            stat = os.stat(cj_path)
+            # A date range of it is read from the month partitions instead
+            if stat.st_size > CJ_STREAM_BYTES and not (PARTITIONING and 'CJ' in date_ranges()):
+                cj_streamed_aggregates, df_cj = snapshot(load_streamed_cj(cj_path, (stat.st_size, stat.st_mtime_ns)))
+            else:
+                df_cj = load_dataset('CJ', cj_path)
+            if df_cj is not None and df_cj.empty:
+                df_cj = None
+        except:
+            df_cj = None
 
-elif page == 'Customer Data':
-    show_customer_data_page()
+        try:
+            df_customers = load_data(os.path.join(data_dir, data_files['Customers_Dataset']))
+            if df_customers is not None and df_customers.empty:
+                df_customers = None
+        except:
+            df_customers = None
 
-elif page == 'Order Data':
-    show_order_data_page()
+        try:
+            df_orders = load_dataset('Orders_Dataset', os.path.join(data_dir, data_files['Orders_Dataset']))
+            if df_orders is not None and df_orders.empty:
+                df_orders = None
+        except:
+            df_orders = None
 
-elif page == 'Abandoned Checkouts':
-    show_abandoned_checkouts_page()
+        try:
+            df_products = load_data(os.path.join(data_dir, data_files['Products_Dataset']), encoding='latin1')
+            if df_products is not None and df_products.empty:
+                df_products = None
+        except:
+            df_products = None
 
-elif page == 'Products':
-    show_products_page()
+        store_frames = {
+            'AbandonedCheckouts': df_abandoned_checkouts,
+            'CJ': df_cj,
+            'Customers_Dataset': df_customers,
+            'Orders_Dataset': df_orders,
+            'Products_Dataset': df_products,
+        }
 
-elif page == 'Revenue':
-    show_revenue_page()
+    page = st.sidebar.selectbox("Select a Page",
+                                ['Customer Journey', 'Customer Data', 'Order Data', 'Abandoned Checkouts', 'Products',
+                                 'Revenue'], key="page")
+    st.sidebar.toggle("Performance", key="show_performance")
+    perf_panel = st.sidebar.container()
+    st.sidebar.toggle("Memory", key="show_memory")
+    memory_panel = st.sidebar.container()
+    # Draws each section as soon as its own aggregate is ready instead of after the whole page is computed
+    if st.sidebar.toggle("Progressive rendering", key="progressive"):
+        st.sidebar.slider("Worker threads (0: compute while drawing)", min_value=0, max_value=8, value=2,
+                          key="progressive_workers")
+    # Every store's data and aggregates are loaded in the background while no session is rerunning
+    with st.sidebar:
+        show_warming_progress(warmer)
+
+    def render_page():
+        with section(f"page:{page}", kind='page'):
+            if page == 'Customer Journey':
+                show_cj_page()
+
+            elif page == 'Customer Data':
+                show_customer_data_page()
+
+            elif page == 'Order Data':
+                show_order_data_page()
+
+            elif page == 'Abandoned Checkouts':
+                show_abandoned_checkouts_page()
+
+            elif page == 'Products':
+                show_products_page()
+
+            elif page == 'Revenue':
+                show_revenue_page()
+            close_lap()
+
+    # Open the app with ?profile=1 (optionally &top=50) to profile this rerun of the selected page
+    if PROFILING and st.query_params.get("profile") in ('1', 'true', 'yes'):
+        top = st.query_params.get("top", "30")
+        pstats_path, hotspot_table = profile_call(render_page, PROFILE_DIR, f"{store_select}-{page}",
+                                                  int(top) if top.isdigit() else 30, keep=PROFILES_KEPT)
+        show_profile(pstats_path, hotspot_table)
+    else:
+        render_page()
+    show_performance_panel(perf_panel, stop_run(), page)
+    show_memory_panel(memory_panel)
+
+
+# Importing this module (e.g. for Store_analytics or benchmarks) must not start the UI
+if __name__ == '__main__':
+    # The cache warmer waits for reruns to finish, it starts with the first session of the server
+    with cache_warmer().foreground():
+        main()
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import Future
+
+from Lazy_import import lazy_import
+from Progressive_aggregates import executor
+from Store_data import BASE_DIR
+
+# wordcloud pulls in matplotlib, only loaded when an image is not on disk yet
+wordcloud = lazy_import('wordcloud')
+
+# Rendered PNGs, one file per hash of the term frequencies and image size.
+# Least recently used files are removed once the folder grows past WORDCLOUD_MAX_BYTES.
+WORDCLOUD_DIR = os.path.join(BASE_DIR, "cache", "wordclouds")
+WORDCLOUD_MAX_BYTES = 64 * 1024 ** 2
+
+# Renders in progress, so reruns and sessions asking for the same image wait on one render
+_renders = {}
+_renders_lock = threading.Lock()
+
+
+def wordcloud_key(frequencies, width, height):
+    items = [[str(term), float(count)] for term, count in frequencies.items()]
+    return hashlib.sha256(json.dumps([items, width, height]).encode()).hexdigest()
+
+
+def render_png(frequencies, width, height):
+    image = wordcloud.WordCloud(width=width, height=height, background_color='white').generate_from_frequencies(
+        frequencies).to_image()
+    image_stream = io.BytesIO()
+    image.save(image_stream, format='PNG')
+    return image_stream.getvalue()
+
+
+def evict_wordclouds(cache_dir=WORDCLOUD_DIR, max_bytes=WORDCLOUD_MAX_BYTES):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".png"):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass
+        total -= size
+
+
+def _render(key, frequencies, width, height, cache_dir, max_bytes):
+    try:
+        png = render_png(frequencies, width, height)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = os.path.join(cache_dir, f"{key}.png.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(png)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{key}.png"))
+        evict_wordclouds(cache_dir, max_bytes)
+        return png
+    finally:
+        with _renders_lock:
+            _renders.pop(key, None)
+
+
+def wordcloud_png(frequencies, width=800, height=400, cache_dir=WORDCLOUD_DIR, max_bytes=WORDCLOUD_MAX_BYTES):
+    # A Future with the PNG bytes: already done when the image is on disk, otherwise rendered on the shared pool
+    key = wordcloud_key(frequencies, width, height)
+    path = os.path.join(cache_dir, f"{key}.png")
+    try:
+        with open(path, 'rb') as f:
+            done = Future()
+            done.set_result(f.read())
+        os.utime(path)  # the modification time is the LRU order
+        return done
+    except OSError:
+        pass
+    with _renders_lock:
+        if key not in _renders:
+            _renders[key] = executor(1).submit(_render, key, dict(frequencies), width, height, cache_dir,
+                                               max_bytes)
+        return _renders[key]
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Store_data import DATA_DIR, load_store  # noqa: E402
+
+# The small store bundled in data/, every test checks its results against the in-memory functions on it
+STORE = 'qetest1'
+
+
+@pytest.fixture(scope='session')
+def store():
+    return STORE
+
+
+@pytest.fixture(scope='session')
+def frames(store):
+    return load_store(store, DATA_DIR)
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from Quantile_sketch import QuantileSketch
+
+
+def assert_same(full, folded, path='aggregates'):
+    # Folded aggregates hold the same values as the ones computed on the whole frame; row order and the
+    # integer / float width of a column may differ
+    if isinstance(full, dict):
+        assert set(full) == set(folded), path
+        for key in full:
+            assert_same(full[key], folded[key], f"{path}.{key}")
+    elif isinstance(full, (tuple, list)):
+        assert len(full) == len(folded), path
+        for i, (a, b) in enumerate(zip(full, folded)):
+            assert_same(a, b, f"{path}[{i}]")
+    elif isinstance(full, QuantileSketch):
+        assert full.count == folded.count, path
+        for q in (0.1, 0.5, 0.9, 0.99):
+            assert folded.quantile(q) == pytest.approx(full.quantile(q)), path
+    elif isinstance(full, pd.DataFrame):
+        columns = list(full.columns)
+        assert columns == list(folded.columns), path
+        pd.testing.assert_frame_equal(full.sort_values(columns).reset_index(drop=True),
+                                      folded.sort_values(columns).reset_index(drop=True),
+                                      check_dtype=False, obj=path)
+    elif isinstance(full, pd.Series):
+        pd.testing.assert_series_equal(full.sort_index(), folded.sort_index(), check_dtype=False,
+                                       check_names=False, check_index_type=False, obj=path)
+    elif isinstance(full, float):
+        assert folded == pytest.approx(full, nan_ok=True), path
+    else:
+        assert full == folded, path
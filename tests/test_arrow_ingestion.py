@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from Ingestion_report import aggregate_differences  # noqa: E402
+from Store_data import DATA_DIR, load_store  # noqa: E402
+from Store_metrics import PAGE_TASKS, compute_page_aggregates, product_type_counts  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def arrow_frames(store):
+    return load_store(store, DATA_DIR, arrow=True)
+
+
+def page_frames(frames):
+    return {dataset: None if df is None or df.empty else df for dataset, df in frames.items()}
+
+
+def test_arrow_strings(frames, arrow_frames):
+    orders = arrow_frames['Orders_Dataset']
+    assert any(dtype == pd.StringDtype('pyarrow') for dtype in orders.dtypes)
+    assert orders['Order_Created_At'].dtype == frames['Orders_Dataset']['Order_Created_At'].dtype
+    assert len(orders) == len(frames['Orders_Dataset'])
+
+
+@pytest.mark.parametrize('page', list(PAGE_TASKS))
+def test_same_chart_inputs(frames, arrow_frames, page):
+    expected = compute_page_aggregates(page, page_frames(frames))
+    assert aggregate_differences(expected, compute_page_aggregates(page, page_frames(arrow_frames)), page) == []
+
+
+def test_differences_found():
+    expected = {'counts': pd.DataFrame({'Type': ['a', 'b'], 'Count': [2, 1]}), 'total': 3.0}
+    actual = {'counts': pd.DataFrame({'Type': ['a', 'c'], 'Count': [2, 1]}), 'total': 3.0}
+    assert aggregate_differences(expected, actual) == ['aggregates.counts']
+
+
+@pytest.mark.parametrize('dtype', [object, pd.StringDtype('pyarrow')])
+def test_missing_product_types(dtype):
+    df = pd.DataFrame({
+        'Product_ID': [1, 2, 3, 4],
+        'Product_Type': pd.Series(['Bundle', None, '', 'Bundle'], dtype=dtype),
+        'Product_Published_At': pd.to_datetime(['2024-01-01'] * 4, utc=True),
+    })
+    counts = product_type_counts(df)
+    assert counts.set_index('Product_Type')['Count'].to_dict() == {'Bundle': 2, 'No Type': 2}
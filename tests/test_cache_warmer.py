@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+
+import pytest
+
+import Cache_warmer
+from Cache_warmer import CacheWarmer
+
+
+@pytest.fixture
+def usage_path(tmp_path):
+    path = tmp_path / 'store_usage.json'
+    path.write_text(json.dumps({'b': 3, 'c': 7}))
+    return str(path)
+
+
+def make_warmer(usage_path, stores, warm_store=None, fingerprints=None, **kwargs):
+    fingerprints = fingerprints if fingerprints is not None else {}
+    return CacheWarmer(warm_store or (lambda store: None), lambda: list(stores),
+                       lambda store: fingerprints.get(store, 0), usage_path=usage_path, poll_seconds=0.05, **kwargs)
+
+
+def test_most_used_first(usage_path):
+    warmer = make_warmer(usage_path, ['a', 'b', 'c', 'd'])
+    warmer.record_use('a')
+    # By page views, ties by name
+    assert warmer.pending() == ['c', 'b', 'a', 'd']
+
+
+def test_only_max_stores_warmed(usage_path):
+    stores = ['a', 'b', 'c', 'd']
+    warmer = make_warmer(usage_path, stores, max_stores=2)
+    assert warmer.pending() == ['c', 'b']
+    assert warmer.progress() == (0, 2, None)
+    # A store used more than the warmed ones takes the place of the least used
+    for _ in range(5):
+        warmer.record_use('d')
+    assert warmer.pending() == ['c', 'd']
+    assert set(warmer.status) == {'c', 'd'}
+
+
+def test_changed_files_queued_again(usage_path):
+    fingerprints = {}
+    warmer = make_warmer(usage_path, ['a', 'b'], fingerprints=fingerprints)
+    for store in warmer.pending():
+        warmer.status[store]['state'] = 'warm'
+    assert warmer.pending() == []
+    fingerprints['a'] = 1
+    assert warmer.pending() == ['a']
+
+
+def test_waits_for_idle(usage_path, monkeypatch):
+    monkeypatch.setattr(Cache_warmer, 'IDLE_SECONDS', 0.2)
+    warmed = []
+    warmer = make_warmer(usage_path, ['a', 'b', 'c'], lambda store: warmed.append((store, time.monotonic())))
+    with warmer.foreground():
+        warmer.start()
+        time.sleep(0.4)
+        # Nothing is warmed while a session reruns
+        assert warmed == []
+    finished = time.monotonic()
+    while len(warmed) < 3 and time.monotonic() - finished < 5:
+        time.sleep(0.01)
+    assert [store for store, _ in warmed] == ['c', 'b', 'a']
+    # ... nor until the sessions were idle for IDLE_SECONDS
+    assert warmed[0][1] - finished >= 0.2
+    assert warmer.progress() == (3, 3, None)
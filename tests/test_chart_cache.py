@@ -0,0 +1,20 @@
+import pandas as pd
+
+from Chart_cache import chart_key, closure_values
+
+
+def builder(df):
+    return lambda: df.plot()
+
+
+def test_same_shape_frames_keyed_apart():
+    first = pd.DataFrame({'Site': ['a', 'b'], 'Orders': [3, 1]})
+    second = pd.DataFrame({'Site': ['c', 'd'], 'Orders': [3, 1]})
+    assert chart_key(*closure_values(builder(first))) != chart_key(*closure_values(builder(second)))
+    assert chart_key(*closure_values(builder(first))) == chart_key(*closure_values(builder(first.copy())))
+
+
+def test_unhashable_cells():
+    df = pd.DataFrame({'Pages': [['Home', 'Cart'], ['Home']]})
+    other = pd.DataFrame({'Pages': [['Home'], ['Home', 'Cart']]})
+    assert chart_key(*closure_values(builder(df))) != chart_key(*closure_values(builder(other)))
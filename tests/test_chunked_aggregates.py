@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from Chunked_aggregates import CjChunkAggregator, stream_cj_aggregates
+from Store_data import DATA_DIR, dataset_path
+from Store_metrics import compute_page_aggregates
+
+from helpers import assert_same
+
+
+@pytest.fixture(scope='module')
+def full(frames):
+    return compute_page_aggregates('Customer Journey', frames)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 3, 7, 1000])
+def test_stream_matches_full_frame(store, full, chunk_rows):
+    folded, window = stream_cj_aggregates(dataset_path(store, 'CJ', DATA_DIR), chunk_rows=chunk_rows)
+    assert_same(full, folded)
+    assert window is None
+
+
+def test_update_by_slices(frames, full):
+    # The appended rows of a live export are folded the same way (Incremental_load.IncrementalAggregates)
+    df = frames['CJ']
+    aggregator = CjChunkAggregator()
+    for start in range(0, len(df), 5):
+        aggregator.update(df.iloc[start:start + 5])
+    assert aggregator.rows == len(df)
+    assert_same(full, aggregator.result())
+
+
+def test_window_keeps_last_rows(store, frames):
+    _, window = stream_cj_aggregates(dataset_path(store, 'CJ', DATA_DIR), chunk_rows=3, window_rows=4)
+    pd.testing.assert_frame_equal(window.reset_index(drop=True), frames['CJ'].tail(4).reset_index(drop=True),
+                                  check_dtype=False)
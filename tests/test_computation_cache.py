@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from Computation_cache import ComputationCache, value_bytes
+from Store_metrics import compute_page_aggregates
+
+
+def test_computed_once(store, frames):
+    cache = ComputationCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return compute_page_aggregates('Order Data', frames)
+
+    first = cache.get((store, 'Order Data'), compute)
+    assert cache.get((store, 'Order Data'), compute) is first
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['bytes'] == value_bytes(first) > 0
+
+
+def test_single_flight():
+    cache = ComputationCache()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get('key', compute))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # The other sessions wait on the running computation instead of starting their own
+    while cache.stats()['waits'] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
+
+
+def test_errors_not_kept():
+    cache = ComputationCache()
+
+    def fail():
+        raise ValueError("no data")
+
+    with pytest.raises(ValueError):
+        cache.get('key', fail)
+    assert cache.get('key', lambda: 42) == 42
+    assert cache.stats()['errors'] == 1
+
+
+def test_least_recently_used_dropped():
+    cache = ComputationCache(max_entries=2)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    cache.get('a', lambda: 1)
+    cache.get('c', lambda: 3)
+    assert list(cache.values) == ['a', 'c']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_cap(frames):
+    orders = frames['Orders_Dataset']
+    size = value_bytes(orders)
+    cache = ComputationCache(max_bytes=int(size * 2.5))
+    for i in range(3):
+        cache.get(i, lambda: orders.copy())
+    assert list(cache.values) == [1, 2]
+    assert cache.stats()['bytes'] == 2 * size <= cache.max_bytes
+    # A value larger than the cap is returned but not kept
+    small = ComputationCache(max_bytes=size // 2)
+    assert small.get('orders', lambda: orders) is orders
+    assert small.stats()['entries'] == 0
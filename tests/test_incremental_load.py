@@ -0,0 +1,166 @@
+import csv
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from Chunked_aggregates import LiveDayAggregator, RevenueChunkAggregator
+from Incremental_load import AppendableCsv, IncrementalAggregates
+from Store_data import DATA_DIR, dataset_path, read_dataset
+from Store_metrics import compute_page_aggregates, viewers_per_page
+
+from helpers import assert_same
+
+
+@pytest.fixture
+def export(tmp_path, store):
+    # (path of a copy of the store's orders export holding only its first rows, lines of the whole export)
+    with open(dataset_path(store, 'Orders_Dataset', DATA_DIR), 'rb') as f:
+        lines = f.readlines()
+    path = str(tmp_path / os.path.basename(dataset_path(store, 'Orders_Dataset', DATA_DIR)))
+    with open(path, 'wb') as f:
+        f.writelines(lines[:401])
+    return path, lines
+
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_append_reads_only_new_rows(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    df, generation = source.refresh()
+    assert source.status == 'loaded' and len(df) == 400
+    assert source.refresh() == (df, generation) and source.status == 'unchanged'
+    append(path, b''.join(lines[401:900]))
+    df, same_generation = source.refresh()
+    assert source.status == 'appended' and same_generation == generation
+    pd.testing.assert_frame_equal(df, read_dataset(path))
+
+
+def test_partial_line_waits(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    source.refresh()
+    # A row written in two parts: only read once its newline is there
+    append(path, lines[401][:20])
+    df, _ = source.refresh()
+    assert source.status == 'unchanged' and len(df) == 400
+    append(path, lines[401][20:])
+    df, _ = source.refresh()
+    assert source.status == 'appended'
+    pd.testing.assert_frame_equal(df, read_dataset(path))
+
+
+def test_truncated_export_read_again(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    _, generation = source.refresh()
+    with open(path, 'wb') as f:
+        f.writelines(lines[:201])
+    df, new_generation = source.refresh()
+    assert source.status == 'loaded' and new_generation == generation + 1
+    pd.testing.assert_frame_equal(df, read_dataset(path))
+
+
+def test_rewritten_head_read_again(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    _, generation = source.refresh()
+    # The first rows swapped (same size), then rows appended: the whole file is read again, not just the new rows
+    with open(path, 'wb') as f:
+        f.writelines([lines[0], lines[2], lines[1], *lines[3:401], *lines[401:500]])
+    df, new_generation = source.refresh()
+    assert source.status == 'loaded' and new_generation == generation + 1
+    pd.testing.assert_frame_equal(df, read_dataset(path))
+
+
+def test_empty_dates_appended(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    df, _ = source.refresh()
+    date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    assert date_columns
+    # The next row of the export with its dates left empty
+    row = next(csv.reader([lines[401].decode()]))
+    header = next(csv.reader([lines[0].decode()]))
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(['' if col in date_columns else value for col, value in zip(header, row)])
+    append(path, buffer.getvalue().encode())
+    df, _ = source.refresh()
+    assert source.status == 'appended' and len(df) == 401
+    for col in date_columns:
+        assert df[col].dtype == read_dataset(path)[col].dtype
+        assert pd.isna(df[col].iloc[-1])
+
+
+def test_revenue_folded_from_appends(export):
+    path, lines = export
+    source = AppendableCsv(path)
+    aggregates = IncrementalAggregates(RevenueChunkAggregator)
+    written = 401
+    for end in (401, 700, 1000, len(lines)):
+        append(path, b''.join(lines[written:end]))
+        written = end
+        df, generation = source.refresh()
+        assert len(df) == end - 1
+        assert_same(compute_page_aggregates('Revenue', {'Orders_Dataset': df}), aggregates.update(df, generation))
+    # A full read starts the fold over
+    with open(path, 'wb') as f:
+        f.writelines(lines[:600])
+    df, generation = source.refresh()
+    assert source.status == 'loaded'
+    assert_same(compute_page_aggregates('Revenue', {'Orders_Dataset': df}), aggregates.update(df, generation))
+
+
+def live_counts(df, day):
+    # The live counters of one UTC day computed on the whole frame
+    times = pd.to_datetime(df['Event_Time'], utc=True)
+    on_day = times.dt.floor('D') == pd.Timestamp(day, tz='UTC')
+    today = df[on_day].assign(hour=times[on_day].dt.hour + 1)
+    cart_adds = today[today['Event'] == 'Cart Add']
+    return {
+        'events': len(today),
+        'last_event': times[on_day].max(),
+        'sessions': len(today[['Customer_IP', 'session']].drop_duplicates()),
+        'visitors': today['Customer_IP'].nunique(),
+        'sessions_per_hour': today[['hour', 'Customer_IP', 'session']].drop_duplicates().groupby('hour').size()
+        .reindex(range(1, 25), fill_value=0),
+        'viewers_per_page': viewers_per_page(today),
+        'cart_adds': len(cart_adds),
+        'cart_add_visitors': cart_adds['Customer_IP'].nunique(),
+    }
+
+
+def test_live_day_across_rollover(tmp_path):
+    # A CJ export written every 3 minutes from 21:00 to 03:00, read by the live section as it grows
+    events = ['Home', 'Collection', 'Product', 'Cart Add', 'Cart', 'Search', 'Checkout']
+    df = pd.DataFrame({
+        'Event': [events[i % len(events)] for i in range(120)],
+        'Customer_IP': [f"10.0.0.{i % 5}" for i in range(120)],
+        'Event_Time': pd.date_range('2025-01-24 21:00', periods=120, freq='3min', tz='UTC'),
+        'Time_On_Page': [float(i % 11) for i in range(120)],
+        'session': [i // 20 + 1 for i in range(120)],
+    })
+    lines = df.to_csv(index=False).encode().splitlines(keepends=True)
+    path = str(tmp_path / 'live_CJ.csv')
+    with open(path, 'wb') as f:
+        f.writelines(lines[:31])
+    source = AppendableCsv(path)
+    # One fold per day, as Store_selection.live_day_aggregates keys them
+    live = {day: IncrementalAggregates(lambda day=day: LiveDayAggregator(day))
+            for day in ('2025-01-24', '2025-01-25')}
+    written = 31
+    for end, day in ((31, '2025-01-24'), (55, '2025-01-24'), (70, '2025-01-24'), (70, '2025-01-25'),
+                     (100, '2025-01-25'), (len(lines), '2025-01-25')):
+        append(path, b''.join(lines[written:end]))
+        written = end
+        df, generation = source.refresh()
+        assert len(df) == end - 1
+        assert_same(live_counts(df, day), live[day].update(df, generation), day)
+    # The new day's fold read the rows of the day before too, they are only counted as seen
+    aggregator = live['2025-01-25'].aggregator
+    assert aggregator.rows == len(df) and aggregator.events < len(df)
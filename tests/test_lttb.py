@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from Store_metrics import downsample_lttb, fill_daily_counts, lttb_indices, orders_per_day
+
+
+def test_short_series_kept_whole():
+    x = np.arange(10, dtype=float)
+    assert list(lttb_indices(x, x, 10)) == list(range(10))
+    assert list(lttb_indices(x, x, 50)) == list(range(10))
+    assert list(lttb_indices(x, x, 2)) == list(range(10))
+
+
+def test_one_point_per_bucket():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=float)
+    y = rng.normal(size=1000)
+    indices = lttb_indices(x, y, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+    every = 998 / 48
+    for bucket, index in enumerate(indices[1:-1]):
+        assert int(bucket * every) + 1 <= index < int((bucket + 1) * every) + 1
+
+
+def test_spikes_kept():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[[77, 251, 420]] = [40, -25, 60]
+    indices = lttb_indices(x, y, 20)
+    assert {77, 251, 420} <= set(indices)
+
+
+def test_orders_per_day(frames):
+    per_day = orders_per_day(frames['Orders_Dataset'])
+    per_day, _, _, _ = fill_daily_counts(per_day, 'order_count', per_day['day'].max())
+    plot_df = downsample_lttb(per_day, 'day', 'order_count', 60)
+    assert len(per_day) > 60 and len(plot_df) == 60
+    # Rows of the full series, in order, from its first to its last day
+    pd.testing.assert_frame_equal(plot_df, per_day.loc[plot_df.index])
+    assert plot_df.index.is_monotonic_increasing
+    assert plot_df['day'].iloc[0] == per_day['day'].iloc[0]
+    assert plot_df['day'].iloc[-1] == per_day['day'].iloc[-1]
+    assert plot_df['order_count'].max() == per_day['order_count'].max()
+
+
+def test_small_frame_unchanged(frames):
+    per_day = orders_per_day(frames['Orders_Dataset'])
+    assert downsample_lttb(per_day, 'day', 'order_count', len(per_day)) is per_day
+    assert isinstance(downsample_lttb(per_day.head(3), 'day', 'order_count', 60), pd.DataFrame)
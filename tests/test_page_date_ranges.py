@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Store_selection.py')
+
+
+def select_page(at, page):
+    next(box for box in at.sidebar.selectbox if box.label == "Select a Page").select(page)
+    at.run()
+    assert not at.exception, [str(error.value) for error in at.exception]
+
+
+def cards(at):
+    return [block.value for block in at.markdown if 'class="card"' in block.value]
+
+
+@pytest.fixture(scope='module')
+def app(store):
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.run()
+    at.sidebar.selectbox[0].select(store)
+    at.run()
+    return at
+
+
+@pytest.mark.parametrize('page', ['Customer Data', 'Products'])
+def test_orders_range_stays_on_its_pages(app, page):
+    select_page(app, page)
+    full = cards(app)
+    assert full
+    select_page(app, 'Order Data')
+    start, end = app.sidebar.date_input[0], app.sidebar.date_input[1]
+    order_cards = cards(app)
+    start.set_value(start.value + (end.value - start.value) / 2)
+    app.run()
+    narrowed = cards(app)
+    assert narrowed != order_cards
+    app.run()
+    assert cards(app) == narrowed
+    # The narrowed orders range is only loaded on the pages drawing it, and the other pages keep their numbers
+    # from one rerun to the next
+    select_page(app, page)
+    assert cards(app) == full
+    app.run()
+    assert cards(app) == full
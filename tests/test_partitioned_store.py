@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from Partitioned_store import (PARTITIONED_DATASETS, UNDATED, date_bounds, ensure_partitions,  # noqa: E402
+                               months_in_range, read_manifest, read_partitions, source_stat, write_partitions)
+from Store_data import DATA_DIR, dataset_path  # noqa: E402
+from Store_metrics import filter_date_range  # noqa: E402
+
+DATASET = 'Orders_Dataset'
+DATE_COLUMN = PARTITIONED_DATASETS[DATASET]
+
+
+def assert_same_rows(df, expected):
+    # Parquet gives None where the CSV read gave NaN, and may type the columns differently
+    pd.testing.assert_frame_equal(df.astype(object).where(df.notna(), None),
+                                  expected.astype(object).where(expected.notna(), None))
+
+
+@pytest.fixture
+def dirs(tmp_path, store):
+    # A copy of the store's export, so the tests can change it, and an empty partition folder
+    data_dir, partition_dir = tmp_path / 'data', tmp_path / 'partitions'
+    data_dir.mkdir()
+    shutil.copy(dataset_path(store, DATASET, DATA_DIR), dataset_path(store, DATASET, str(data_dir)))
+    return str(data_dir), str(partition_dir)
+
+
+@pytest.fixture
+def orders(frames):
+    return frames[DATASET]
+
+
+def test_manifest(store, dirs, orders):
+    data_dir, partition_dir = dirs
+    manifest = write_partitions(store, DATASET, data_dir, partition_dir, chunk_rows=200)
+    assert manifest == read_manifest(store, DATASET, partition_dir)
+    assert manifest['date_column'] == DATE_COLUMN
+    assert manifest['source'] == source_stat(store, DATASET, data_dir)
+    dates = orders[DATE_COLUMN]
+    per_month = dates.dt.strftime('%Y-%m').fillna(UNDATED).value_counts()
+    assert {month: entry['rows'] for month, entry in manifest['months'].items()} == per_month.to_dict()
+    assert list(manifest['months']) == sorted(manifest['months'])
+    for month, entry in manifest['months'].items():
+        if month != UNDATED:
+            in_month = dates[dates.dt.strftime('%Y-%m') == month]
+            assert pd.Timestamp(entry['min']) == in_month.min()
+            assert pd.Timestamp(entry['max']) == in_month.max()
+    assert date_bounds(manifest) == (dates.min(), dates.max())
+
+
+def test_ensure_rewrites_changed_export(store, dirs):
+    data_dir, partition_dir = dirs
+    manifest = ensure_partitions(store, DATASET, data_dir, partition_dir)
+    manifest_path = os.path.join(partition_dir, f"store={store}", f"dataset={DATASET}", "manifest.json")
+    written = os.stat(manifest_path).st_mtime_ns
+    assert ensure_partitions(store, DATASET, data_dir, partition_dir) == manifest
+    assert os.stat(manifest_path).st_mtime_ns == written
+    # Dropping the last rows of the export: the partitions are written again from it
+    path = dataset_path(store, DATASET, data_dir)
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:-100])
+    rewritten = ensure_partitions(store, DATASET, data_dir, partition_dir)
+    assert rewritten['source'] == source_stat(store, DATASET, data_dir)
+    assert sum(entry['rows'] for entry in rewritten['months'].values()) == \
+        sum(entry['rows'] for entry in manifest['months'].values()) - 100
+
+
+def test_months_in_range(store, dirs):
+    manifest = ensure_partitions(store, DATASET, *dirs)
+    months = [month for month in manifest['months'] if month != UNDATED]
+    assert months_in_range(manifest) == list(manifest['months'])
+    first, last = date_bounds(manifest)
+    assert months_in_range(manifest, first, last) == months
+    start, end = pd.Timestamp(months[1] + '-15', tz='UTC'), pd.Timestamp(months[-2] + '-02', tz='UTC')
+    assert months_in_range(manifest, start, end) == months[1:-1]
+    assert months_in_range(manifest, start=start) == months[1:]
+    assert months_in_range(manifest, end=end) == months[:-1]
+
+
+def test_read_range_matches_filter(store, dirs, orders):
+    _, partition_dir = dirs
+    manifest = ensure_partitions(store, DATASET, *dirs)
+    first, last = date_bounds(manifest)
+    start = first + (last - first) / 3
+    end = first + (last - first) * 2 / 3
+    expected = filter_date_range(orders, DATE_COLUMN, start, end).reset_index(drop=True)
+    df = read_partitions(store, DATASET, start, end, partition_dir)
+    assert len(df) == len(expected) > 0
+    assert_same_rows(df, expected)
+
+
+def test_read_all(store, dirs, orders):
+    _, partition_dir = dirs
+    ensure_partitions(store, DATASET, *dirs)
+    df = read_partitions(store, DATASET, partition_dir=partition_dir)
+    assert_same_rows(df, orders.reset_index(drop=True))
+    assert read_partitions('missing', DATASET, partition_dir=partition_dir) is None
@@ -0,0 +1,104 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Quantile_sketch import QuantileSketch, daily_sketches, merge_sketches, sketches_in_range
+from Store_metrics import session_duration_kpis
+
+QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def exact_quantile(values, q):
+    # The value the sketch estimates: the one at rank floor(q * (n - 1)) of the sorted values
+    return np.sort(values)[int(np.floor(q * (len(values) - 1)))]
+
+
+def assert_within_accuracy(sketch, values):
+    for q in QUANTILES:
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= sketch.relative_accuracy * abs(exact) + 1e-3, q
+
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+def test_relative_error_bound(relative_accuracy):
+    values = np.random.default_rng(0).lognormal(mean=4, sigma=1.5, size=20_000)
+    sketch = QuantileSketch(relative_accuracy).add_many(values)
+    assert sketch.count == len(values)
+    assert sketch.mean() == pytest.approx(values.mean())
+    assert_within_accuracy(sketch, values)
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+
+def test_negatives_and_zeros():
+    values = np.array([-3.0, -1.5, -0.2, 0.0, 0.0, 0.5, 2.0, 7.0, 40.0])
+    sketch = QuantileSketch().add_many(values)
+    assert sketch.min == -3
+    assert sketch.quantile(0.0) == -3
+    assert_within_accuracy(sketch, values)
+    histogram = sketch.histogram()
+    assert histogram['Count'].sum() == len(values)
+    assert (histogram['Lower'] <= histogram['Upper']).all()
+    assert histogram['Lower'].is_monotonic_increasing
+
+
+def test_merge_matches_single_sketch():
+    values = np.random.default_rng(1).exponential(60, size=9_000) - 5
+    parts = [QuantileSketch().add_many(part) for part in np.array_split(values, 7)]
+    merged = merge_sketches(parts)
+    single = QuantileSketch().add_many(values)
+    assert merged.counts == single.counts and merged.negative_counts == single.negative_counts
+    assert (merged.count, merged.zero_count, merged.min, merged.max) == \
+        (single.count, single.zero_count, single.min, single.max)
+    assert merged.quantiles() == single.quantiles()
+    with pytest.raises(ValueError):
+        merge_sketches([QuantileSketch(0.05)])
+
+
+def test_empty_sketch():
+    assert QuantileSketch().add_many([None, 'x']).quantile(0.5) is None
+    assert merge_sketches([]).quantile(0.5) is None
+
+
+def test_daily_sketches_in_range(frames):
+    df = frames['Orders_Dataset']
+    sketches = daily_sketches(df, 'Order_Created_At', 'Order_Total_Price')
+    days = sorted(sketches)
+    start, end = days[len(days) // 4], days[len(days) // 2]
+    in_range = df[df['Order_Created_At'].dt.date.between(start, end)]
+    values = in_range['Order_Total_Price'].dropna().to_numpy(dtype=float)
+    merged = merge_sketches(sketches_in_range(sketches, start, end))
+    assert merged.count == len(values)
+    assert merged.total == pytest.approx(values.sum())
+    assert_within_accuracy(merged, values)
+    # The same values added one by one give the same buckets as the vectorized per-day pass
+    assert merged.counts == QuantileSketch().add_many(values).counts
+    # No day in the range: no sketches, and the merge has no quantiles
+    before = days[0] - datetime.timedelta(days=10)
+    assert sketches_in_range(sketches, before, before + datetime.timedelta(days=5)) == []
+    assert merge_sketches(sketches_in_range(sketches, before, before)).quantile(0.5) is None
+
+
+def test_daily_sketches_by_group():
+    df = pd.DataFrame({
+        'Event_Time': pd.to_datetime(['2024-01-01 10:00', '2024-01-01 11:00', '2024-01-02 09:00',
+                                      '2024-01-02 12:00'], utc=True),
+        'Time_On_Page': [10, -2, 0, 30],
+        'Event': ['Home', 'Cart', 'Home', 'Home'],
+    })
+    sketches = daily_sketches(df, 'Event_Time', 'Time_On_Page', by='Event')
+    home = merge_sketches(sketches_in_range(sketches, datetime.date(2024, 1, 1), datetime.date(2024, 1, 2),
+                                            by_value='Home'))
+    assert (home.count, home.min, home.max, home.zero_count) == (3, 0, 30, 1)
+    cart = merge_sketches(sketches_in_range(sketches, datetime.date(2024, 1, 1), datetime.date(2024, 1, 1),
+                                            by_value='Cart'))
+    assert cart.quantile(0.5) == -2 and cart.negative_counts
+
+
+def test_session_durations(frames):
+    sessions = frames['CJ'].groupby(['Customer_IP', 'session'])['Time_On_Page'].sum()
+    sketch = QuantileSketch().add_many(sessions)
+    kpis = session_duration_kpis(frames['CJ'])
+    assert sketch.total == pytest.approx(kpis['total_duration'])
+    assert_within_accuracy(sketch, sessions.to_numpy(dtype=float))
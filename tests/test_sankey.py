@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Store_metrics import JOURNEY_EVENTS, cj_sankey_transitions, prune_sankey, sankey_from_session_events, sankey_step
+
+
+@pytest.fixture(scope='module')
+def transitions(frames):
+    return cj_sankey_transitions(frames['CJ'])
+
+
+@pytest.fixture(scope='module')
+def many_transitions():
+    # Random sessions over every journey event, enough distinct paths for the node and link limits to apply
+    rng = np.random.default_rng(0)
+    visited = pd.DataFrame({event: rng.random(5000) < 0.4 for event in JOURNEY_EVENTS})
+    return sankey_from_session_events(visited)
+
+
+def test_small_sankey_unchanged(transitions):
+    expected = transitions.sort_values(['Source', 'Target']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(prune_sankey(transitions), expected)
+
+
+def test_deep_steps_end_in_more_steps(transitions):
+    pruned = prune_sankey(transitions, max_depth=2)
+    assert (pruned['Source'].map(sankey_step) < 2).all()
+    shallow = transitions[transitions['Source'].map(sankey_step) < 2]
+    assert pruned['Count'].sum() == shallow['Count'].sum()
+    deeper = ~shallow['Target'].str.startswith('Drop-off_') & (shallow['Target'].map(sankey_step) >= 2)
+    assert pruned.loc[pruned['Target'] == 'More steps_2', 'Count'].sum() == shallow.loc[deeper, 'Count'].sum()
+
+
+def test_small_links_go_to_other(transitions):
+    pruned = prune_sankey(transitions, min_flow=2)
+    assert pruned['Count'].sum() == transitions['Count'].sum()
+    kept = pruned[~pruned['Target'].str.startswith(('Drop-off_', 'Other_'))]
+    assert (kept['Count'] >= 2).all()
+    # Drop-offs are kept whatever their size
+    drop_offs = transitions[transitions['Target'].str.startswith('Drop-off_')]
+    pd.testing.assert_frame_equal(pruned[pruned['Target'].str.startswith('Drop-off_')].reset_index(drop=True),
+                                  drop_offs.sort_values(['Source', 'Target']).reset_index(drop=True))
+
+
+def test_limits(many_transitions):
+    pruned = prune_sankey(many_transitions, max_nodes=10, max_links=15)
+    assert len(pruned) <= 15
+    nodes = set(pruned['Source']) | set(pruned['Target'])
+    assert len(nodes - {node for node in nodes if node.startswith('Other_')}) <= 10
+    assert not pruned.duplicated(['Source', 'Target']).any()
+    # Links go one step further, drop-offs stay on their source's step
+    steps = pruned['Target'].map(sankey_step) - pruned['Source'].map(sankey_step)
+    assert (steps == np.where(pruned['Target'].str.startswith('Drop-off_'), 0, 1)).all()
+
+
+def test_largest_links_kept(transitions):
+    pruned = prune_sankey(transitions, max_links=3)
+    assert len(pruned) == 3
+    assert sorted(pruned['Count'], reverse=True) == sorted(transitions['Count'], reverse=True)[:3]
@@ -0,0 +1,56 @@
+import warnings
+
+import pandas as pd
+
+from Store_metrics import (CATEGORY_TOP_K, customers_by_region, most_sold_products, period_labels, revenue_per_period,
+                           top_k_with_other)
+
+
+def test_other_sums_the_tail(frames):
+    product_sales = most_sold_products(frames['Orders_Dataset'])
+    top = top_k_with_other(product_sales, 'Product_Name', 'Product_Quantity', 5)
+    assert len(product_sales) > 6 and len(top) == 6
+    assert top['Product_Name'].iloc[-1] == f"Other ({len(product_sales) - 5} more)"
+    assert top['Product_Quantity'].sum() == product_sales['Product_Quantity'].sum()
+    assert top['Product_Quantity'].iloc[-1] == product_sales['Product_Quantity'].iloc[5:].sum()
+    pd.testing.assert_frame_equal(top.head(5), product_sales.head(5).reset_index(drop=True))
+
+
+def test_short_list_unchanged():
+    df = pd.DataFrame({'Site': ['a', 'b', 'c'], 'Orders': [1, 3, 2]})
+    top = top_k_with_other(df, 'Site', 'Orders', 3)
+    assert top['Site'].tolist() == ['b', 'c', 'a']
+    assert not top['Site'].str.startswith('Other').any()
+
+
+def test_ties_keep_their_order():
+    df = pd.DataFrame({'Site': ['a', 'b', 'c', 'd', 'e'], 'Orders': [2, 5, 2, 2, 1]})
+    top = top_k_with_other(df, 'Site', 'Orders', 2)
+    # Equal counts keep the order they came in, the ones past k go to Other
+    assert top['Site'].tolist() == ['b', 'a', 'Other (3 more)']
+    assert top['Orders'].tolist() == [5, 2, 5]
+
+
+def test_region_aggregate(frames):
+    customers = frames['Customers_Dataset']
+    region = customers_by_region(customers, 'Customer_Country')
+    assert len(region) <= CATEGORY_TOP_K['Customer_Country'] + 1
+    assert region['Unique_Customers'].sum() == \
+        customers.groupby('Customer_Country')['Customer_ID'].nunique().sum()
+
+
+def test_period_labels():
+    dates = pd.Series(pd.to_datetime(['2024-01-31 23:30', '2024-02-01 00:10', '2024-04-01 00:00'], utc=True))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert period_labels(dates, 'M').tolist() == ['2024-01', '2024-02', '2024-04']
+        assert period_labels(dates, 'Q').tolist() == ['2024Q1', '2024Q1', '2024Q2']
+        assert period_labels(dates.dt.tz_localize(None), 'M').tolist() == ['2024-01', '2024-02', '2024-04']
+
+
+def test_revenue_per_period(frames):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        revenue = revenue_per_period(frames['Orders_Dataset'])
+    totals = {period: frame['Order_Total_Price'].sum() for period, frame in revenue.items()}
+    assert len(set(round(total, 6) for total in totals.values())) == 1